@@ -0,0 +1 @@
+"""Служебные команды (запуск: python -m app.commands.<name>)."""
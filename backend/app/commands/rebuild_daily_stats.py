@@ -0,0 +1,65 @@
+"""
+Пересчёт дневных итогов (user_daily_stats) из тренировок и упражнений
+
+Запуск из папки backend:
+    python -m app.commands.rebuild_daily_stats --chunk-size 200
+
+Пользователи обрабатываются порциями, каждая порция - отдельная транзакция,
+поэтому команду можно прервать и запустить повторно.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.database import AsyncSessionLocal, init_db, close_db
+from app.services.daily_stats import DailyStatsService
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_daily_stats(chunk_size: int) -> int:
+    """Пересчитать итоги всех пользователей, вернуть число пользователей"""
+    await init_db()
+
+    processed = 0
+    last_user_id = None
+
+    try:
+        while True:
+            async with AsyncSessionLocal() as session:
+                user_ids = await DailyStatsService.get_user_ids_chunk(
+                    session, last_user_id, chunk_size
+                )
+                if not user_ids:
+                    break
+
+                await DailyStatsService.rebuild_for_users(session, user_ids)
+                await session.commit()
+
+            processed += len(user_ids)
+            last_user_id = user_ids[-1]
+            logger.info(f"✓ Daily stats rebuilt for {processed} users")
+    finally:
+        await close_db()
+
+    return processed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пересчитать user_daily_stats")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=200,
+        help="Сколько пользователей пересчитывать в одной транзакции",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    processed = asyncio.run(rebuild_daily_stats(args.chunk_size))
+    logger.info(f"Done, users processed: {processed}")
+
+
+if __name__ == "__main__":
+    main()
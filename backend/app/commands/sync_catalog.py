@@ -0,0 +1,40 @@
+"""
+Синхронизация зеркала каталога Directus → Postgres
+
+Запуск из папки backend:
+    python -m app.commands.sync_catalog
+
+Забирает изменения с прошлого запуска (курсор в catalog_sync_state).
+Удобно для первичного заполнения и для запуска по cron, если фоновая
+синхронизация в приложении выключена (CATALOG_SYNC_INTERVAL_SECONDS=0).
+"""
+
+import asyncio
+import logging
+
+from app.core.http import close_http_clients
+from app.database import close_db
+from app.services.catalog_sync import CatalogSyncService
+
+logger = logging.getLogger(__name__)
+
+
+async def sync_catalog() -> dict:
+    try:
+        return await CatalogSyncService.sync_all()
+    finally:
+        await close_http_clients()
+        await close_db()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(sync_catalog())
+    if result["skipped"]:
+        logger.info("Catalog sync is already running elsewhere, skipped")
+    else:
+        logger.info(f"Done: {result['resources']}")
+
+
+if __name__ == "__main__":
+    main()
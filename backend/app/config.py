@@ -29,8 +29,52 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: Optional[str] = None
     SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
 
+    # HTTP клиенты к внешним сервисам (общие пулы соединений)
+    HTTP2_ENABLED: bool = False
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 50
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 20
+    SUPABASE_HTTP_TIMEOUT_SECONDS: float = 30.0
+    DIRECTUS_HTTP_MAX_CONNECTIONS: int = 20
+    DIRECTUS_HTTP_MAX_KEEPALIVE: int = 10
+    DIRECTUS_HTTP_TIMEOUT_SECONDS: float = 10.0
+
+    # Кеш directus_id → строка exercises (в памяти процесса)
+    EXERCISE_CACHE_MAX_SIZE: int = 5000
+    EXERCISE_CACHE_TTL_SECONDS: int = 600
+
+    # Кеш каталога Directus (в памяти процесса, stale-while-revalidate)
+    CATALOG_CACHE_MAX_SIZE: int = 1000
+    CATALOG_EXERCISES_TTL_SECONDS: int = 300
+    CATALOG_CATEGORIES_TTL_SECONDS: int = 3600
+    CATALOG_MUSCLE_GROUPS_TTL_SECONDS: int = 3600
+    CATALOG_STALE_TTL_SECONDS: int = 86400
+
+    # Зеркало каталога Directus в Postgres (синхронизация по date_updated)
+    CATALOG_MIRROR_ENABLED: bool = True
+    CATALOG_SYNC_INTERVAL_SECONDS: int = 300
+    CATALOG_SYNC_PAGE_SIZE: int = 200
+
+    # Статистика из дневных итогов user_daily_stats. Пока итоги не
+    # поддерживаются всеми путями записи, статистика считается по сырым
+    # таблицам; включать после rebuild_daily_stats
+    STATISTICS_DAILY_ROLLUPS_ENABLED: bool = False
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
+    STATS_CACHE_TTL_SECONDS: int = 3600
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 30
+
+    # Очередь отложенной записи тренировок (Redis Streams)
+    WRITE_QUEUE_ENABLED: bool = True
+    WRITE_QUEUE_WORKERS: int = 2
+    WRITE_QUEUE_BATCH_SIZE: int = 10
+    WRITE_QUEUE_MAX_ATTEMPTS: int = 5
+    WRITE_QUEUE_RETRY_DELAY_SECONDS: int = 10
+    WRITE_QUEUE_JOB_TIMEOUT_SECONDS: int = 120
+    WRITE_QUEUE_JOB_TTL_SECONDS: int = 86400
 
     # JWT
     SECRET_KEY: str
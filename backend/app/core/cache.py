@@ -0,0 +1,144 @@
+"""
+In-process LRU кеши с TTL
+
+Для небольших справочных данных, которые меняются редко (например,
+соответствие directus_id → строка exercises или каталог Directus). Кеш
+живёт в памяти процесса: у каждого воркера gunicorn свой экземпляр.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """LRU кеш с ограничением размера и временем жизни записей"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Значение или None, если записи нет или она устарела"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Найденные значения по ключам (промахи не попадают в результат)"""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Записать значение, вытесняя самые старые по использованию записи"""
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class StaleWhileRevalidateCache:
+    """
+    LRU кеш с загрузчиком и stale-while-revalidate.
+
+    - моложе ttl: значение отдаётся из памяти;
+    - старше ttl, но в пределах stale_ttl_seconds: отдаётся устаревшее
+      значение, а обновление запускается в фоне;
+    - нет записи или она слишком старая: загрузка с ожиданием.
+    Одновременные загрузки одного ключа объединяются в одну. Если загрузчик
+    вернул None или упал, значение не кешируется, а вызывающий получает
+    последнее известное значение (если оно есть).
+    """
+
+    def __init__(self, max_size: int, stale_ttl_seconds: float):
+        self.max_size = max_size
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Hashable, "asyncio.Task"] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        ttl_seconds: float,
+        loader: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Optional[Any]:
+        """Значение по ключу, при необходимости загруженное через loader"""
+        item = self._data.get(key)
+        if item is not None:
+            fetched_at, value = item
+            age = time.monotonic() - fetched_at
+            if age < ttl_seconds:
+                self._data.move_to_end(key)
+                return value
+            if age < ttl_seconds + self.stale_ttl_seconds:
+                self._refresh(key, loader)
+                self._data.move_to_end(key)
+                return value
+
+        # shield: отмена одного ожидающего не отменяет общую загрузку
+        value = await asyncio.shield(self._refresh(key, loader))
+        if value is None and item is not None:
+            return item[1]
+        return value
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]) -> "asyncio.Task":
+        """Запустить загрузку ключа, если она ещё не идёт"""
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            self._loading[key] = task
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        try:
+            value = await loader()
+        except Exception as e:
+            logger.error(f"Cache loader failed for {key!r}: {e}")
+            return None
+
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Записать свежее значение, вытесняя самые старые по использованию записи"""
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
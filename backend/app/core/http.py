@@ -0,0 +1,74 @@
+"""
+Общие HTTP клиенты приложения (Supabase REST и Directus)
+
+Клиенты создаются один раз в lifespan и переиспользуют keep-alive
+соединения между запросами. Лимиты пула, таймауты и HTTP/2 задаются
+отдельно для каждого upstream в Settings.
+"""
+
+from typing import Dict
+import httpx
+from app.config import settings
+
+SUPABASE = "supabase"
+DIRECTUS = "directus"
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _build_client(max_connections: int, max_keepalive: int, timeout: float) -> httpx.AsyncClient:
+    """Создать клиент с пулом соединений"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS),
+        http2=settings.HTTP2_ENABLED,
+    )
+
+
+def _create(name: str) -> httpx.AsyncClient:
+    if name == SUPABASE:
+        return _build_client(
+            settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+            settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+            settings.SUPABASE_HTTP_TIMEOUT_SECONDS,
+        )
+    return _build_client(
+        settings.DIRECTUS_HTTP_MAX_CONNECTIONS,
+        settings.DIRECTUS_HTTP_MAX_KEEPALIVE,
+        settings.DIRECTUS_HTTP_TIMEOUT_SECONDS,
+    )
+
+
+def _get(name: str) -> httpx.AsyncClient:
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        # Вне lifespan (команды, бенчмарки) клиент создаётся лениво
+        client = _clients[name] = _create(name)
+    return client
+
+
+def get_supabase_client() -> httpx.AsyncClient:
+    """Общий клиент для Supabase REST API"""
+    return _get(SUPABASE)
+
+
+def get_directus_client() -> httpx.AsyncClient:
+    """Общий клиент для Directus API"""
+    return _get(DIRECTUS)
+
+
+def init_http_clients():
+    """Создать клиенты при старте приложения"""
+    for name in (SUPABASE, DIRECTUS):
+        _get(name)
+
+
+async def close_http_clients():
+    """Закрыть клиенты и их пулы соединений"""
+    while _clients:
+        _, client = _clients.popitem()
+        await client.aclose()
@@ -0,0 +1,25 @@
+"""
+Redis клиент приложения (кеш статистики)
+"""
+
+from typing import Optional
+from redis import asyncio as aioredis
+from app.config import settings
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Получить общий Redis клиент (соединения открываются лениво)"""
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close_redis():
+    """Закрыть пул соединений Redis"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -33,11 +33,22 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+def _create_missing_indexes(conn):
+    """create_all пропускает существующие таблицы вместе с их индексами"""
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def init_db():
     """Инициализация БД (создание таблиц)"""
+    # Регистрирует таблицы для Core-запросов в SQLModel.metadata
+    import app.models.tables  # noqa: F401
+
     try:
         async with engine.begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(_create_missing_indexes)
         logger.info("✓ Database initialized")
     except Exception as e:
         logger.warning(f"⚠️ Database initialization skipped: {e}")
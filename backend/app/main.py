@@ -7,7 +7,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.database import init_db, close_db
-from app.routes import auth, workout, exercise, statistics, directus, supabase_workouts, supabase_users
+from app.core.redis import close_redis
+from app.core.http import init_http_clients, close_http_clients
+from app.services.write_queue import start_write_workers, stop_write_workers
+from app.services.catalog_sync import start_catalog_sync, stop_catalog_sync
+from app.routes import auth, workout, exercise, statistics, directus, supabase_workouts, supabase_users, supabase_statistics
 import logging
 
 # Конфигурация логирования
@@ -24,9 +28,16 @@ async def lifespan(app: FastAPI):
     """
     logger.info("🚀 Starting Super Strong Backend")
     await init_db()
+    init_http_clients()
+    start_write_workers()
+    start_catalog_sync()
     yield
     logger.info("🛑 Shutting down Super Strong Backend")
+    await stop_catalog_sync()
+    await stop_write_workers()
+    await close_http_clients()
     await close_db()
+    await close_redis()
 
 
 # Создание FastAPI приложения
@@ -89,3 +100,4 @@ app.include_router(statistics.router)
 app.include_router(directus.router)
 app.include_router(supabase_workouts.router)
 app.include_router(supabase_users.router)
+app.include_router(supabase_statistics.router)
@@ -0,0 +1,181 @@
+"""
+Описание таблиц для SQL-запросов (SQLAlchemy Core)
+
+Pydantic модели в models/ описывают API-контракт и не привязаны к таблицам,
+поэтому агрегирующие запросы строятся по этим описаниям. Таблицы
+регистрируются в SQLModel.metadata и создаются в init_db().
+
+Таблицы, которые создаются миграциями supabase/migrations, описаны через
+table()/column() без metadata - init_db() их не трогает.
+"""
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+    Uuid,
+    column,
+    table,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel
+
+metadata = SQLModel.metadata
+
+
+workout_table = Table(
+    "workout",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Uuid, nullable=False),
+    Column("date", DateTime, nullable=False),
+    Column("total_weight", Float),
+    Column("total_sets", Integer),
+    Column("notes", Text),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("is_deleted", Boolean, nullable=False, default=False),
+    # Тренировки пользователя за период (статистика, история упражнений)
+    Index("ix_workout_user_id_date", "user_id", "date"),
+)
+
+
+exercise_table = Table(
+    "exercise",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("workout_id", Integer, ForeignKey("workout.id"), index=True),
+    Column("exercise_id", String(255), nullable=False),
+    Column("directus_id", String(255)),
+    Column("name", String(255)),
+    Column("category", String(255)),
+    Column("description", Text),
+    Column("weight", Float),
+    Column("sets", Integer),
+    Column("reps", Integer),
+    Column("notes", Text),
+    Column("order", Integer, nullable=False, default=0),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("is_deleted", Boolean, nullable=False, default=False),
+    # История конкретного упражнения: exercise_id -> тренировки
+    Index("ix_exercise_exercise_id_workout_id", "exercise_id", "workout_id"),
+)
+
+
+# Дневные итоги пользователя, поддерживаются инкрементально в WorkoutService
+# и ExerciseService (см. services/daily_stats.py); статистика читает их при
+# STATISTICS_DAILY_ROLLUPS_ENABLED
+user_daily_stats_table = Table(
+    "user_daily_stats",
+    metadata,
+    Column("user_id", Uuid, primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("workout_count", Integer, nullable=False, default=0),
+    Column("exercise_count", Integer, nullable=False, default=0),
+    Column("total_sets", Integer, nullable=False, default=0),
+    Column("total_reps", Integer, nullable=False, default=0),
+    Column("total_weight", Float, nullable=False, default=0),
+    Column("updated_at", DateTime),
+)
+
+
+# Личные рекорды (supabase/migrations/*_personal_records.sql). Обновляются
+# SQL-функцией merge_personal_records: триггером на user_day_workout_exercise_sets
+# и из ExerciseService (services/personal_records.py)
+personal_records_table = table(
+    "personal_records",
+    column("user_id", Uuid),
+    column("exercise_id", String),
+    column("max_weight", Float),
+    column("max_weight_reps", Integer),
+    column("best_e1rm", Float),
+    column("updated_at", DateTime),
+)
+
+
+# Таблицы тренировок Supabase (supabase/migrations/*_init_schema.sql)
+user_days_table = table(
+    "user_days",
+    column("id", Uuid),
+    column("user_id", Uuid),
+    column("date", Date),
+)
+
+user_day_workouts_table = table(
+    "user_day_workouts",
+    column("id", Uuid),
+    column("user_id", Uuid),
+    column("user_day_id", Uuid),
+    column("started_at", DateTime),
+)
+
+user_day_workout_exercises_table = table(
+    "user_day_workout_exercises",
+    column("id", Uuid),
+    column("user_day_workout_id", Uuid),
+    column("exercise_id", Uuid),
+    column("created_at", DateTime),
+)
+
+user_day_workout_exercise_sets_table = table(
+    "user_day_workout_exercise_sets",
+    column("id", Uuid),
+    column("user_day_workout_exercise_id", Uuid),
+    column("reps", Integer),
+    column("weight", Float),
+    column("set_order", Integer),
+)
+
+catalog_exercises_table = table(
+    "exercises",
+    column("id", Uuid),
+    column("directus_id", String),
+    column("name", String),
+    column("category", String),
+    column("description", Text),
+    column("updated_at", DateTime(timezone=True)),
+    # Зеркало каталога Directus (*_catalog_mirror.sql)
+    column("data", JSONB),
+    column("category_directus_id", String),
+    column("directus_date_updated", DateTime(timezone=True)),
+    column("synced_at", DateTime(timezone=True)),
+)
+
+exercise_categories_table = table(
+    "exercise_categories",
+    column("directus_id", String),
+    column("name", String),
+    column("data", JSONB),
+    column("directus_date_updated", DateTime(timezone=True)),
+    column("synced_at", DateTime(timezone=True)),
+)
+
+muscle_groups_table = table(
+    "muscle_groups",
+    column("directus_id", String),
+    column("name", String),
+    column("data", JSONB),
+    column("directus_date_updated", DateTime(timezone=True)),
+    column("synced_at", DateTime(timezone=True)),
+)
+
+catalog_sync_state_table = table(
+    "catalog_sync_state",
+    column("resource", String),
+    column("cursor", DateTime(timezone=True)),
+    column("status", String),
+    column("error", Text),
+    column("items_synced", Integer),
+    column("last_started_at", DateTime(timezone=True)),
+    column("last_finished_at", DateTime(timezone=True)),
+    column("last_success_at", DateTime(timezone=True)),
+)
@@ -2,13 +2,18 @@
 API маршруты для интеграции с Directus
 """
 
-from fastapi import APIRouter, HTTPException, status, Query, Request
+from fastapi import APIRouter, HTTPException, status, Query, Request, Header, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional
 import httpx
 import logging
 
 from app.services.directus import DirectusService
+from app.services.catalog_payload import CatalogPayloadService, PrecomputedPayload
+from app.services.catalog_mirror import CatalogMirrorService
+from app.services.catalog_sync import CatalogSyncService
 from app.config import settings
+from app.core.http import get_directus_client
 
 logger = logging.getLogger(__name__)
 
@@ -17,53 +22,105 @@ router = APIRouter(prefix="/api/v1", tags=["exercises-catalog"])
 
 # ========== ВАЖНО: Специфичные маршруты должны быть ДО параметризованных ==========
 
+def _accepted_encoding(accept_encoding: Optional[str], payload: PrecomputedPayload) -> str:
+    """Лучшая кодировка из Accept-Encoding: br, затем gzip, иначе без сжатия"""
+    accepted = set()
+    for item in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+
+    if payload.br is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return "identity"
+
+
 @router.get("/batch/init")
-async def batch_init_data():
+async def batch_init_data(
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+):
     """
-    Batch endpoint для загрузки упражнений и категорий ПАРАЛЛЕЛЬНО.
+    Batch endpoint для загрузки упражнений и категорий одним запросом.
     Используется при инициализации приложения для быстрой загрузки.
 
+    Ответ собирается и сжимается один раз на версию каталога и отдаётся
+    готовыми байтами (br/gzip по Accept-Encoding) с сильным ETag. Клиент с
+    актуальной версией (If-None-Match) получает 304 без тела.
+
     Returns: {exercises: [...], categories: [...]}
     """
     try:
-        # Загружаем упражнения и категории ОДНОВРЕМЕННО (параллельно)
-        import asyncio
-        exercises_response, categories_response = await asyncio.gather(
-            DirectusService.get_exercises(),
-            DirectusService.get_exercise_categories(),
-            return_exceptions=False
+        payload = await CatalogPayloadService.get_batch_init()
+    except Exception as e:
+        logger.error(f"Batch init error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Ошибка при загрузке данных: {str(e)}",
         )
 
-        # Извлекаем .data из Directus ответов (Directus возвращает {data: [...]})
-        exercises = exercises_response.get("data", []) if exercises_response else []
-        categories = categories_response.get("data", []) if categories_response else []
-
-        # Создаём map категорий ID -> Name для быстрого поиска
-        category_map = {cat.get("id"): cat.get("name") for cat in categories}
-
-        # Трансформируем упражнения - заменяем ID категории на объект с name
-        transformed_exercises = []
-        for exercise in exercises:
-            transformed = exercise.copy()
-            # Если category это ID (число), заменяем на объект {id, name}
-            if isinstance(transformed.get("category"), (int, str)):
-                category_id = transformed.get("category")
-                category_name = category_map.get(category_id, "Без категории")
-                transformed["category"] = {
-                    "id": category_id,
-                    "name": category_name
-                }
-            transformed_exercises.append(transformed)
+    encoding = _accepted_encoding(accept_encoding, payload)
+    headers = {
+        "ETag": payload.etag(encoding),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
 
-        return {
-            "exercises": transformed_exercises,
-            "categories": categories,
-        }
+    # Любая кодировка той же версии считается совпадением
+    if if_none_match:
+        current = {payload.etag(coding) for coding in ("identity", "gzip", "br")}
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or tags & current:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    return Response(
+        content=payload.encoded(encoding),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get("/catalog/sync/status")
+async def catalog_sync_status():
+    """
+    Состояние зеркала каталога Directus → Postgres по коллекциям: курсор
+    (date_updated последнего изменения), статус и время последних запусков.
+    """
+    try:
+        return {"resources": await CatalogMirrorService.get_sync_state()}
     except Exception as e:
-        logger.error(f"Batch init error: {e}")
+        logger.error(f"Catalog sync status error: {e}")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Ошибка при загрузке данных: {str(e)}",
+            detail=f"Не удалось получить состояние синхронизации: {str(e)}",
+        )
+
+
+@router.post("/catalog/sync")
+async def catalog_sync():
+    """
+    Запустить синхронизацию каталога сейчас (только изменения с прошлого
+    запуска). Если синхронизация уже идёт в другом воркере — skipped: true.
+    """
+    try:
+        return await CatalogSyncService.sync_all()
+    except Exception as e:
+        logger.error(f"Catalog sync error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Ошибка синхронизации каталога: {str(e)}",
         )
 
 
@@ -297,6 +354,41 @@ async def get_exercise(exercise_id: str):
 # ========== ПРОКСИ МАРШРУТЫ К DIRECTUS ==========
 # Для совместимости с React фронтенд который использует пути типа /items/exercises
 
+# Заголовки, которые прокси передаёт в обе стороны без изменений
+PROXY_REQUEST_HEADERS = (
+    "content-type",
+    "accept",
+    "accept-encoding",
+    "accept-language",
+    "if-none-match",
+    "if-modified-since",
+)
+PROXY_RESPONSE_HEADERS = (
+    "content-type",
+    "content-encoding",
+    "content-length",
+    "content-language",
+    "etag",
+    "last-modified",
+    "cache-control",
+    "expires",
+    "age",
+    "vary",
+)
+
+
+async def _stream_upstream(upstream: httpx.Response):
+    """
+    Тело ответа Directus как есть; соединение возвращается в пул и при
+    ошибке чтения посреди потока, и при обрыве со стороны клиента
+    """
+    try:
+        async for chunk in upstream.aiter_raw():
+            yield chunk
+    finally:
+        await upstream.aclose()
+
+
 @router.api_route("/items/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_directus_request(
     path: str,
@@ -305,33 +397,35 @@ async def proxy_directus_request(
     """
     Прокси маршрут для перенаправления запросов к Directus API.
     Использование: GET /api/v1/items/exercises?fields=...
+
+    Ответ Directus передаётся потоком через общий пул соединений: байты
+    (в т.ч. сжатые) не декодируются, статус, content-type, ETag и
+    заголовки кеширования сохраняются. Память не зависит от размера ответа.
     """
-    try:
-        # Получить query параметры из запроса
-        query_params = dict(request.query_params) if request.query_params else {}
-
-        # Построить URL для Directus - добавить items перед path
-        directus_url = f"{settings.DIRECTUS_URL}/items/{path}"
-
-        # Создать тело запроса если есть (для POST/PUT)
-        body = None
-        if request.method in ["POST", "PUT", "PATCH"]:
-            body = await request.body()
-
-        # Сделать запрос к Directus
-        async with httpx.AsyncClient(timeout=15) as client:
-            response = await client.request(
-                method=request.method,
-                url=directus_url,
-                params=query_params,
-                content=body,
-                headers={
-                    "Content-Type": "application/json",
-                }
-            )
+    # Построить URL для Directus - добавить items перед path
+    directus_url = f"{settings.DIRECTUS_URL}/items/{path}"
+
+    headers = {
+        name: request.headers[name]
+        for name in PROXY_REQUEST_HEADERS
+        if name in request.headers
+    }
+    headers.setdefault("content-type", "application/json")
+
+    client = get_directus_client()
+    upstream_request = client.build_request(
+        method=request.method,
+        url=directus_url,
+        # multi_items сохраняет повторяющиеся параметры (fields=a&fields=b)
+        params=request.query_params.multi_items(),
+        # Тело (для POST/PUT/PATCH) тоже идёт потоком
+        content=request.stream() if request.method in ["POST", "PUT", "PATCH"] else None,
+        headers=headers,
+        timeout=15,
+    )
 
-            # Вернуть ответ от Directus как есть
-            return response.json()
+    try:
+        upstream = await client.send(upstream_request, stream=True)
     except httpx.HTTPError as e:
         logger.error(f"Directus proxy error: {e}")
         raise HTTPException(
@@ -344,3 +438,13 @@ async def proxy_directus_request(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ошибка при проксировании запроса: {str(e)}",
         )
+
+    return StreamingResponse(
+        _stream_upstream(upstream),
+        status_code=upstream.status_code,
+        headers={
+            name: upstream.headers[name]
+            for name in PROXY_RESPONSE_HEADERS
+            if name in upstream.headers
+        },
+    )
@@ -10,6 +10,7 @@ from app.database import get_session
 from app.services.exercise import ExerciseService
 from app.services.workout import WorkoutService
 from app.services.auth import AuthService
+from app.services.statistics_cache import StatisticsCache
 from app.schemas.exercise import (
     ExerciseCreateRequest,
     ExerciseUpdateRequest,
@@ -76,12 +77,14 @@ async def create_exercise(
             order=request.order,
         )
         await session.commit()
+        await StatisticsCache.flush(session)
 
         return ExerciseResponse.model_validate(exercise)
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
+        StatisticsCache.discard(session)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при создании упражнения: {str(e)}",
@@ -204,11 +207,13 @@ async def update_exercise(
             )
 
         await session.commit()
+        await StatisticsCache.flush(session)
         return ExerciseResponse.model_validate(exercise)
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
+        StatisticsCache.discard(session)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при обновлении упражнения: {str(e)}",
@@ -247,11 +252,13 @@ async def delete_exercise(
             )
 
         await session.commit()
+        await StatisticsCache.flush(session)
         return None
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
+        StatisticsCache.discard(session)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при удалении упражнения: {str(e)}",
@@ -287,11 +294,13 @@ async def reorder_exercises(
             )
 
         await session.commit()
+        await StatisticsCache.flush(session)
         return None
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
+        StatisticsCache.discard(session)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при переупорядочивании упражнений: {str(e)}",
@@ -2,13 +2,25 @@
 API маршруты для статистики тренировок
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 from app.database import get_session
-from app.services.statistics import StatisticsService
+from app.services.statistics import (
+    StatisticsService,
+    SERIES_GRANULARITIES,
+    MAX_SERIES_BUCKETS,
+    TRENDING_MODES,
+    DEFAULT_TRENDING_HALF_LIFE_DAYS,
+)
+from app.services.personal_records import PersonalRecordsService
+from app.services.analytics import (
+    AnalyticsService,
+    MAX_TRAINING_LOAD_DAYS,
+    MAX_TONNAGE_WEEKS,
+)
 from app.services.auth import AuthService
 
 router = APIRouter(prefix="/api/v1/statistics", tags=["statistics"])
@@ -158,10 +170,76 @@ async def get_monthly_statistics(
         )
 
 
+@router.get("/series")
+async def get_statistics_series(
+    start: str,  # YYYY-MM-DD
+    end: str,  # YYYY-MM-DD
+    token: str,
+    granularity: str = "day",
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Получить итоги по периодам (для графиков) одним запросом.
+
+    Требует JWT токена в query параметре `token`
+    Параметры start и end в формате YYYY-MM-DD (включительно)
+    Параметр granularity: day, week или month (по умолчанию day)
+    Первый и последний период обрезаются по [start, end] (partial: true)
+    """
+    try:
+        user_id = await get_current_user_id(token)
+
+        # Парсить даты
+        try:
+            start_date = datetime.strptime(start, "%Y-%m-%d").date()
+            end_date = datetime.strptime(end, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Неверный формат даты. Используйте YYYY-MM-DD",
+            )
+
+        if granularity not in SERIES_GRANULARITIES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="granularity должен быть day, week или month",
+            )
+
+        if end_date < start_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Дата end должна быть не раньше start",
+            )
+
+        if StatisticsService.count_series_buckets(start_date, end_date, granularity) > MAX_SERIES_BUCKETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Слишком много периодов (максимум {MAX_SERIES_BUCKETS})",
+            )
+
+        series = await StatisticsService.get_series(
+            session=session,
+            user_id=user_id,
+            start=start_date,
+            end=end_date,
+            granularity=granularity,
+        )
+
+        return series
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ошибка при получении ряда статистики: {str(e)}",
+        )
+
+
 @router.get("/exercise/{exercise_id}")
 async def get_exercise_statistics(
     exercise_id: str,
     days: int = 30,
+    include_series: bool = False,
     token: str = None,
     session: AsyncSession = Depends(get_session),
 ):
@@ -170,6 +248,7 @@ async def get_exercise_statistics(
 
     Требует JWT токена в query параметре `token`
     Параметр days - за сколько дней считать (по умолчанию 30)
+    Параметр include_series - добавить ряд по сессиям (дата, вес, подходы, повторения)
     """
     try:
         user_id = await get_current_user_id(token)
@@ -179,6 +258,7 @@ async def get_exercise_statistics(
             user_id=user_id,
             exercise_id=exercise_id,
             days=days,
+            include_series=include_series,
         )
 
         return statistics
@@ -194,6 +274,9 @@ async def get_exercise_statistics(
 @router.get("/trending")
 async def get_trending_exercises(
     limit: int = 10,
+    mode: str = "count",
+    window_days: Optional[int] = None,
+    half_life_days: float = DEFAULT_TRENDING_HALF_LIFE_DAYS,
     token: str = None,
     session: AsyncSession = Depends(get_session),
 ):
@@ -201,14 +284,32 @@ async def get_trending_exercises(
     Получить топ упражнений по количеству сессий.
 
     Требует JWT токена в query параметре `token`
+    Параметр mode: count (по количеству сессий) или decay (с затуханием по давности)
+    Параметр window_days - учитывать только последние N дней
+    Параметр half_life_days - период полураспада веса тренировки для mode=decay
     """
     try:
         user_id = await get_current_user_id(token)
 
+        if mode not in TRENDING_MODES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="mode должен быть count или decay",
+            )
+
+        if limit < 1 or (window_days is not None and window_days < 1) or half_life_days <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="limit, window_days и half_life_days должны быть положительными",
+            )
+
         trending = await StatisticsService.get_trending_exercises(
             session=session,
             user_id=user_id,
             limit=limit,
+            mode=mode,
+            window_days=window_days,
+            half_life_days=half_life_days,
         )
 
         return {"trending": trending}
@@ -219,3 +320,155 @@ async def get_trending_exercises(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при получении трендовых упражнений: {str(e)}",
         )
+
+
+@router.get("/records")
+async def get_personal_records(
+    exercise_id: Optional[str] = None,
+    token: str = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Получить личные рекорды пользователя: лучший вес, повторения на нём и
+    оценку 1ПМ (по формуле Эпли) по каждому упражнению.
+
+    Требует JWT токена в query параметре `token`
+    Параметр exercise_id - рекорды только по одному упражнению
+    """
+    try:
+        user_id = await get_current_user_id(token)
+
+        records = await PersonalRecordsService.get_records(
+            session=session,
+            user_id=user_id,
+            exercise_id=exercise_id,
+        )
+
+        return {"records": records}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ошибка при получении личных рекордов: {str(e)}",
+        )
+
+
+@router.get("/analytics/one-rep-max")
+async def get_one_rep_max(
+    exercise_id: Optional[str] = None,
+    token: str = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Оценка 1ПМ (по формуле Эпли) по истории подходов.
+
+    Требует JWT токена в query параметре `token`
+    Без exercise_id - лучшая оценка по каждому упражнению,
+    с exercise_id - лучшая оценка по дням для этого упражнения
+    """
+    try:
+        user_id = await get_current_user_id(token)
+
+        history = await AnalyticsService.load_set_history(session, user_id)
+
+        if exercise_id:
+            return {
+                "exercise_id": exercise_id,
+                "progression": AnalyticsService.one_rep_max_progression(
+                    history.for_exercise(exercise_id)
+                ),
+            }
+
+        return {"exercises": AnalyticsService.best_one_rep_max(history)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ошибка при расчёте 1ПМ: {str(e)}",
+        )
+
+
+@router.get("/analytics/weekly-tonnage")
+async def get_weekly_tonnage(
+    weeks: int = Query(52, ge=1, le=MAX_TONNAGE_WEEKS),
+    token: str = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Тоннаж (вес × повторения) по неделям.
+
+    Требует JWT токена в query параметре `token`
+    Параметр weeks - сколько последних недель вернуть (1..520, по умолчанию 52)
+    """
+    try:
+        user_id = await get_current_user_id(token)
+
+        start = datetime.utcnow().date() - timedelta(weeks=weeks)
+        history = await AnalyticsService.load_set_history(session, user_id, start)
+
+        return {"weeks": AnalyticsService.weekly_tonnage(history)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ошибка при расчёте тоннажа: {str(e)}",
+        )
+
+
+@router.get("/analytics/intensity")
+async def get_intensity_distribution(
+    token: str = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Распределение подходов по зонам интенсивности
+    (доля от лучшего 1ПМ упражнения).
+
+    Требует JWT токена в query параметре `token`
+    """
+    try:
+        user_id = await get_current_user_id(token)
+
+        history = await AnalyticsService.load_set_history(session, user_id)
+
+        return {"zones": AnalyticsService.intensity_distribution(history)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ошибка при расчёте интенсивности: {str(e)}",
+        )
+
+
+@router.get("/analytics/training-load")
+async def get_training_load(
+    days: int = Query(90, ge=1, le=MAX_TRAINING_LOAD_DAYS),
+    token: str = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Тренировочная нагрузка: острая (7 дней), хроническая (28 дней) и ACWR.
+
+    Требует JWT токена в query параметре `token`
+    Параметр days - длина возвращаемого ряда (1..730, по умолчанию 90)
+    """
+    try:
+        user_id = await get_current_user_id(token)
+
+        today = datetime.utcnow().date()
+        # Для хронической нагрузки нужен запас в 28 дней до начала ряда
+        start = today - timedelta(days=days + 28)
+        history = await AnalyticsService.load_set_history(session, user_id, start)
+
+        return AnalyticsService.training_load(history, days=days, until=today)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ошибка при расчёте нагрузки: {str(e)}",
+        )
@@ -0,0 +1,53 @@
+"""
+Supabase Statistics API Routes
+Routes for set-level statistics of workouts saved via Supabase
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from app.services.supabase_statistics import SupabaseStatisticsService
+from app.schemas.supabase_statistics import SetStatisticsResponse
+from datetime import date
+from typing import Optional
+from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/supabase-statistics", tags=["supabase-statistics"])
+
+
+@router.get("/sets", response_model=SetStatisticsResponse)
+async def get_set_statistics(
+    user_id: UUID,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """
+    Volume, set and rep counts and per-exercise maxima for a period.
+    Computed in the database by a single RPC call.
+    """
+    try:
+        if start and end and start > end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start must not be after end"
+            )
+
+        stats = await SupabaseStatisticsService.get_set_statistics(str(user_id), start, end)
+
+        if stats is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to get set statistics"
+            )
+
+        return stats
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get set statistics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get set statistics: {str(e)}"
+        )
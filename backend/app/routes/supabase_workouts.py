@@ -4,15 +4,26 @@ Routes for creating, updating, and deleting workouts via Supabase
 These routes use the Supabase SDK with service role key to bypass RLS
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from app.services.supabase_workouts import SupabaseWorkoutService
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.supabase_workouts import SupabaseWorkoutService, request_content_hash
+from app.services.workout_export import WorkoutExportService, EXPORT_FORMATS
+from app.services.idempotency import IdempotencyService
+from app.services.write_queue import WriteQueueService
+from app.services.statistics_cache import StatisticsCache
 from app.schemas.supabase_workout import (
     SaveWorkoutSessionRequest,
     UpdateWorkoutSessionRequest,
     SaveWorkoutSessionResponse,
     WorkoutSessionResponse,
     DeleteExerciseRequest,
+    WriteJobAcceptedResponse,
+    WriteJobResponse,
+    WriteQueueMetricsResponse,
 )
+from datetime import date
+from typing import Iterable, Optional
+from uuid import UUID
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,12 +31,96 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/supabase-workouts", tags=["supabase-workouts"])
 
 
-@router.post("/session/save", response_model=SaveWorkoutSessionResponse, status_code=status.HTTP_201_CREATED)
-async def save_workout_session(request: SaveWorkoutSessionRequest):
+async def invalidate_statistics(
+    user_id: str,
+    day: Optional[str],
+    exercise_ids: Iterable[str],
+) -> None:
+    """Drop cached statistics for the written day and exercises"""
+    days = [date.fromisoformat(day)] if day else []
+    await StatisticsCache.invalidate(user_id, days, [ex_id for ex_id in exercise_ids if ex_id])
+
+
+def _etag(content_hash: str) -> str:
+    return f'"{content_hash}"'
+
+
+def _etag_matches(if_none_match: Optional[str], content_hash: Optional[str]) -> bool:
+    """If-None-Match check (weak comparison, "*" matches any session)"""
+    if not if_none_match or not content_hash:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == _etag(content_hash) for tag in tags)
+
+
+async def _enqueue_write(kind: str, payload: dict, order_key: Optional[str] = None) -> dict:
+    """
+    Queue a validated write for the background workers.
+    Writes sharing order_key (a session) are applied one at a time, in order.
+    """
+    try:
+        job_id = await WriteQueueService.enqueue(kind, payload, order_key)
+    except Exception as e:
+        logger.error(f"Failed to queue workout write: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to queue workout write: {str(e)}"
+        )
+
+    return WriteJobAcceptedResponse(
+        job_id=job_id,
+        status="queued",
+        status_url=f"{router.prefix}/jobs/{job_id}",
+    ).model_dump()
+
+
+def _accepted(response) -> JSONResponse:
+    """202 for a fresh job; idempotent replays are already responses"""
+    if isinstance(response, JSONResponse):
+        return response
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=response)
+
+
+@router.post(
+    "/session/save",
+    response_model=SaveWorkoutSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": WriteJobAcceptedResponse}},
+)
+async def save_workout_session(
+    request: SaveWorkoutSessionRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    async_mode: bool = Query(False, alias="async")
+):
     """
     Create a new workout session with exercises and sets.
     Handles the complete save operation in one endpoint.
+    Retries carrying the same Idempotency-Key get the first response back.
+    With async=true the write is queued and 202 with a job id is returned;
+    poll GET /jobs/{job_id} for the result.
     """
+    if async_mode:
+        return _accepted(await IdempotencyService.run(
+            "POST:/session/save",
+            idempotency_key,
+            request,
+            status.HTTP_202_ACCEPTED,
+            lambda: _enqueue_write("save", request.model_dump())
+        ))
+
+    return await IdempotencyService.run(
+        "POST:/session/save",
+        idempotency_key,
+        request,
+        status.HTTP_201_CREATED,
+        lambda: _save_workout_session(request)
+    )
+
+
+async def _save_workout_session(
+    request: SaveWorkoutSessionRequest,
+    request_key: Optional[str] = None
+) -> SaveWorkoutSessionResponse:
     try:
         logger.info("Saving workout session", {
             "user_id": request.user_id,
@@ -33,90 +128,29 @@ async def save_workout_session(request: SaveWorkoutSessionRequest):
             "exercise_count": len(request.exercises)
         })
 
-        # Step 1: Create the workout session
-        session = await SupabaseWorkoutService.create_workout_session(
+        # Session, exercises and sets are written by one transactional RPC:
+        # a failure leaves no partial session behind, so retries are safe
+        result = await SupabaseWorkoutService.save_workout_session(
             request.user_id,
             request.user_day_id,
-            request.started_at
+            [exercise.model_dump() for exercise in request.exercises],
+            request.started_at,
+            request_content_hash(request.exercises),
+            request_key
         )
 
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create workout session"
-            )
+        session_id = result["session_id"]
+        total_sets = result["sets_count"]
 
-        session_id = session["id"]
-        total_sets = 0
+        for missing_id in result.get("missing_exercise_ids") or []:
+            logger.warning(f"Exercise not found: {missing_id}")
 
-        # Проверим: существуют ли уже упражнения в этом workout'е
-        existing_exercises = await SupabaseWorkoutService._make_request(
-            "GET",
-            "user_day_workout_exercises",
-            params={"user_day_workout_id": f"eq.{session_id}"}
+        await invalidate_statistics(
+            request.user_id,
+            result.get("date"),
+            [ex.exercise_id for ex in request.exercises],
         )
 
-        logger.info(f"DEBUG: Checking existing exercises for session {session_id}", {
-            "response_type": type(existing_exercises).__name__,
-            "response": existing_exercises
-        })
-
-        has_existing_exercises = existing_exercises and isinstance(existing_exercises, list) and len(existing_exercises) > 0
-
-        if has_existing_exercises:
-            logger.info(f"Workout session {session_id} already has {len(existing_exercises)} exercises, skipping exercise creation")
-            # Просто считаем существующие наборы и возвращаем
-            sets_result = await SupabaseWorkoutService._make_request(
-                "GET",
-                "user_day_workout_exercise_sets",
-                params={"user_day_workout_id": f"eq.{session_id}"}
-            )
-            total_sets = len(sets_result) if sets_result and isinstance(sets_result, list) else 0
-        else:
-            # Step 2: Create exercises and their sets (только если их ещё нет)
-            for exercise_data in request.exercises:
-                try:
-                    # Get the exercise ID from Directus ID
-                    exercise = await SupabaseWorkoutService.get_exercise_by_directus_id(exercise_data.exercise_id)
-
-                    if not exercise:
-                        logger.warning(f"Exercise not found: {exercise_data.exercise_id}")
-                        continue
-
-                    # Create the exercise in the workout
-                    workout_exercise = await SupabaseWorkoutService.create_workout_exercise(
-                        session_id,
-                        exercise["id"]
-                    )
-
-                    if not workout_exercise:
-                        logger.warning(f"Failed to create workout exercise: {exercise_data.exercise_id}")
-                        continue
-
-                    # Create sets for this exercise
-                    for set_index, set_data in enumerate(exercise_data.sets, start=1):
-                        try:
-                            await SupabaseWorkoutService.create_exercise_set(
-                                workout_exercise["id"],
-                                set_data.reps,
-                                float(set_data.weight),
-                                set_index
-                            )
-                            total_sets += 1
-                        except Exception as e:
-                            logger.error(f"Failed to create set for exercise: {e}")
-                            raise HTTPException(
-                                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"Failed to create exercise set: {str(e)}"
-                            )
-
-                except HTTPException:
-                    raise
-                except Exception as e:
-                    logger.error(f"Failed to process exercise {exercise_data.exercise_id}: {e}")
-                    # Continue with other exercises even if one fails
-                    continue
-
         logger.info("Workout session saved successfully", {
             "session_id": session_id,
             "exercise_count": len(request.exercises),
@@ -139,138 +173,162 @@ async def save_workout_session(request: SaveWorkoutSessionRequest):
         )
 
 
-@router.put("/session/{session_id}/exercises", status_code=status.HTTP_200_OK)
+@router.get("/session/{session_id}", response_model=WorkoutSessionResponse)
+async def get_workout_session(
+    session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match")
+):
+    """
+    Get a workout session with its exercises and sets.
+    Session → exercises → sets (with catalog name/category) come from a
+    single upstream request using embedded selects.
+    The content hash is returned as ETag; a matching If-None-Match gets 304
+    after a single primary key lookup of the stored hash.
+    """
+    try:
+        if if_none_match:
+            stored_hash = await SupabaseWorkoutService.get_workout_content_hash(session_id)
+            if _etag_matches(if_none_match, stored_hash):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": _etag(stored_hash)})
+
+        workout_session = await SupabaseWorkoutService.get_workout_session_tree(session_id)
+
+        if not workout_session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workout session not found"
+            )
+
+        # Stored hash may have been cleared by an out-of-band write
+        etag = _etag(workout_session["content_hash"])
+        if _etag_matches(if_none_match, workout_session["content_hash"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        response.headers["ETag"] = etag
+        return workout_session
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get workout session: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get workout session: {str(e)}"
+        )
+
+
+@router.put(
+    "/session/{session_id}/exercises",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": WriteJobAcceptedResponse}},
+)
 async def update_workout_exercises(
     session_id: str,
-    request: UpdateWorkoutSessionRequest
+    request: UpdateWorkoutSessionRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    async_mode: bool = Query(False, alias="async")
 ):
     """
     Update exercises in an existing workout session.
-    Deletes all existing exercises and recreates them with new data.
+    A request whose content hash equals the stored one returns right away
+    (one primary key lookup). Otherwise it is diffed against stored rows
+    (exercises, set order, reps, weight) and only what changed is written:
+    editing one set touches one row.
+    Retries carrying the same Idempotency-Key get the first response back.
+    With async=true the write is queued and 202 with a job id is returned.
+    Queued updates of one session are applied one at a time in the order
+    they were queued; one older than an already applied update is skipped
+    (status superseded).
     """
+    if async_mode:
+        return _accepted(await IdempotencyService.run(
+            f"PUT:/session/{session_id}/exercises",
+            idempotency_key,
+            request,
+            status.HTTP_202_ACCEPTED,
+            lambda: _enqueue_write(
+                "update",
+                {"session_id": session_id, "request": request.model_dump()},
+                order_key=f"session:{session_id}"
+            )
+        ))
+
+    return await IdempotencyService.run(
+        f"PUT:/session/{session_id}/exercises",
+        idempotency_key,
+        request,
+        status.HTTP_200_OK,
+        lambda: _update_workout_exercises(session_id, request)
+    )
+
+
+async def _update_workout_exercises(session_id: str, request: UpdateWorkoutSessionRequest) -> dict:
     try:
         logger.info("Updating workout exercises", {
             "session_id": session_id,
             "exercise_count": len(request.exercises)
         })
 
-        # Step 1: Check if the exercises and sets are already identical to what exists
-        existing_exercises_result = await SupabaseWorkoutService._make_request(
-            "GET",
-            "user_day_workout_exercises",
-            params={"user_day_workout_id": f"eq.{session_id}"}
-        )
-
-        logger.info(f"DEBUG: existing_exercises_result for session {session_id}", {
-            "type": type(existing_exercises_result).__name__,
-            "data": existing_exercises_result
-        })
+        workout_session = await SupabaseWorkoutService.get_workout_session(session_id)
+        if not workout_session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workout session not found"
+            )
 
-        # Build a signature of existing exercises with their sets
-        existing_signature = {}
-        if existing_exercises_result and isinstance(existing_exercises_result, list):
-            for ex in existing_exercises_result:
-                if ex.get("exercise_id"):
-                    ex_id = ex.get("exercise_id")
-                    workout_ex_id = ex.get("id")
-
-                    # Get sets for this exercise
-                    sets_result = await SupabaseWorkoutService._make_request(
-                        "GET",
-                        "user_day_workout_exercise_sets",
-                        params={"user_day_workout_exercise_id": f"eq.{workout_ex_id}"}
-                    )
-
-                    sets_count = len(sets_result) if sets_result and isinstance(sets_result, list) else 0
-                    existing_signature[ex_id] = sets_count
-
-        # Build a signature of exercises we're trying to save
-        new_signature = {}
-        for ex in request.exercises:
-            new_signature[ex.exercise_id] = len(ex.sets)
-
-        logger.info(f"DEBUG: Signature comparison for session {session_id}", {
-            "existing_signature": existing_signature,
-            "new_signature": new_signature,
-            "are_equal": existing_signature == new_signature
-        })
+        content_hash = request_content_hash(request.exercises)
 
-        # If the exercises and their sets are identical, just return (idempotent behavior)
-        if existing_signature == new_signature and len(existing_signature) > 0:
-            logger.info(f"Exercises unchanged, returning existing data", {
+        # Same content as stored: nothing to diff or write (autosave).
+        # A stored hash is only set after a confirmed full write and is
+        # cleared by any later row change, so it always matches the rows
+        if workout_session.get("content_hash") == content_hash:
+            logger.info("Exercises unchanged (content hash), returning existing data", {
                 "session_id": session_id,
-                "exercise_count": len(existing_signature)
+                "exercise_count": len(request.exercises)
             })
 
-            sets_result = await SupabaseWorkoutService._make_request(
-                "GET",
-                "user_day_workout_exercise_sets",
-                params={"user_day_workout_id": f"eq.{session_id}"}
-            )
-            total_sets = len(sets_result) if sets_result and isinstance(sets_result, list) else 0
-
             return {
                 "message": "Workout exercises already up to date",
                 "session_id": session_id,
                 "exercises_count": len(request.exercises),
-                "sets_count": total_sets
+                "sets_count": sum(len(ex.sets) for ex in request.exercises)
             }
 
-        # Step 1: Delete all existing exercises (sets cascade delete) - only if they changed
         try:
-            await SupabaseWorkoutService.delete_all_workout_exercises(session_id)
-            logger.info("Deleted existing exercises", {"session_id": session_id})
+            result = await SupabaseWorkoutService.reconcile_workout_exercises(
+                session_id,
+                request.exercises,
+                content_hash
+            )
         except Exception as e:
-            logger.error(f"Failed to delete existing exercises: {e}")
+            logger.error(f"Failed to reconcile workout exercises: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to delete existing exercises: {str(e)}"
+                detail=f"Failed to update workout exercises: {str(e)}"
             )
 
-        total_sets = 0
-
-        # Step 2: Create new exercises and their sets
-        for exercise_data in request.exercises:
-            try:
-                # Get the exercise ID from Directus ID
-                exercise = await SupabaseWorkoutService.get_exercise_by_directus_id(exercise_data.exercise_id)
-
-                if not exercise:
-                    logger.warning(f"Exercise not found: {exercise_data.exercise_id}")
-                    continue
-
-                # Create the exercise in the workout
-                workout_exercise = await SupabaseWorkoutService.create_workout_exercise(
-                    session_id,
-                    exercise["id"]
-                )
-
-                if not workout_exercise:
-                    logger.warning(f"Failed to create workout exercise: {exercise_data.exercise_id}")
-                    continue
-
-                # Create sets for this exercise
-                for set_index, set_data in enumerate(exercise_data.sets, start=1):
-                    try:
-                        await SupabaseWorkoutService.create_exercise_set(
-                            workout_exercise["id"],
-                            set_data.reps,
-                            float(set_data.weight),
-                            set_index
-                        )
-                        total_sets += 1
-                    except Exception as e:
-                        logger.error(f"Failed to create set for exercise: {e}")
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Failed to create exercise set: {str(e)}"
-                        )
-
-            except HTTPException:
-                raise
-            except Exception as e:
-                logger.error(f"Failed to process exercise {exercise_data.exercise_id}: {e}")
-                continue
+        total_sets = result["sets_count"]
+
+        # Nothing differs from what is stored (idempotent behavior)
+        if not result["changed_exercise_ids"]:
+            logger.info("Exercises unchanged, returning existing data", {
+                "session_id": session_id,
+                "exercise_count": len(request.exercises)
+            })
+
+            return {
+                "message": "Workout exercises already up to date",
+                "session_id": session_id,
+                "exercises_count": len(request.exercises),
+                "sets_count": total_sets
+            }
+
+        await invalidate_statistics(
+            workout_session["user_id"],
+            (workout_session.get("user_days") or {}).get("date"),
+            result["changed_exercise_ids"],
+        )
 
         logger.info("Workout exercises updated successfully", {
             "session_id": session_id,
@@ -295,6 +353,71 @@ async def update_workout_exercises(
         )
 
 
+async def _apply_queued_save(payload: dict, job_id: str) -> dict:
+    """
+    Queue worker handler for async saves.
+    The job id is the RPC request_key: a retry of a job whose save already
+    committed gets the stored session back instead of saving it again.
+    """
+    result = await _save_workout_session(
+        SaveWorkoutSessionRequest(**payload),
+        request_key=f"write_job:{job_id}"
+    )
+    return result.model_dump()
+
+
+async def _apply_queued_update(payload: dict, job_id: str) -> dict:
+    """Queue worker handler for async updates (a full snapshot, safe to repeat)"""
+    return await _update_workout_exercises(
+        payload["session_id"],
+        UpdateWorkoutSessionRequest(**payload["request"])
+    )
+
+
+WriteQueueService.register_handler("save", _apply_queued_save)
+WriteQueueService.register_handler("update", _apply_queued_update)
+
+
+@router.get("/jobs/metrics", response_model=WriteQueueMetricsResponse)
+async def get_write_queue_metrics():
+    """
+    Write queue depth and lag: entries in the stream, delivered but not yet
+    acknowledged (pending), never delivered, and the age of the oldest job.
+    """
+    try:
+        return await WriteQueueService.get_metrics()
+    except Exception as e:
+        logger.error(f"Failed to get write queue metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to get write queue metrics: {str(e)}"
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=WriteJobResponse)
+async def get_write_job(job_id: str):
+    """
+    State of a write queued in async mode: queued, processing, done (with
+    the same body the synchronous endpoint returns) or failed (with error).
+    """
+    try:
+        job = await WriteQueueService.get_job(job_id)
+    except Exception as e:
+        logger.error(f"Failed to get write job: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to get write job: {str(e)}"
+        )
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Write job not found"
+        )
+
+    return job
+
+
 @router.delete("/session/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_workout_session(session_id: str):
     """
@@ -354,3 +477,37 @@ async def delete_exercise_from_session(session_id: str, exercise_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete exercise: {str(e)}"
         )
+
+
+@router.get("/export")
+async def export_workout_history(
+    user_id: UUID,
+    export_format: str = Query("csv", alias="format"),
+):
+    """
+    Stream the user's full training history (workouts → exercises → sets).
+
+    format=csv returns one line per set, format=ndjson one JSON object per
+    workout. Rows are read with a server-side cursor and sent as they
+    arrive, so memory use does not grow with history size.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    logger.info("Exporting workout history", {"user_id": str(user_id), "format": export_format})
+
+    if export_format == "csv":
+        content, media_type = WorkoutExportService.iter_csv(user_id), "text/csv; charset=utf-8"
+    else:
+        content, media_type = WorkoutExportService.iter_ndjson(user_id), "application/x-ndjson"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="workouts-{user_id}.{export_format}"',
+        },
+    )
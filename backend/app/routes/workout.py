@@ -10,6 +10,7 @@ from typing import List
 from app.database import get_session
 from app.services.workout import WorkoutService
 from app.services.auth import AuthService
+from app.services.statistics_cache import StatisticsCache
 from app.schemas.workout import (
     WorkoutCreateRequest,
     WorkoutUpdateRequest,
@@ -66,12 +67,14 @@ async def create_workout(
             notes=request.notes,
         )
         await session.commit()
+        await StatisticsCache.flush(session)
 
         return WorkoutResponse.model_validate(workout)
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
+        StatisticsCache.discard(session)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при создании тренировки: {str(e)}",
@@ -174,11 +177,13 @@ async def update_workout(
             )
 
         await session.commit()
+        await StatisticsCache.flush(session)
         return WorkoutResponse.model_validate(workout)
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
+        StatisticsCache.discard(session)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при обновлении тренировки: {str(e)}",
@@ -212,11 +217,13 @@ async def delete_workout(
             )
 
         await session.commit()
+        await StatisticsCache.flush(session)
         return None
     except HTTPException:
         raise
     except Exception as e:
         await session.rollback()
+        StatisticsCache.discard(session)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ошибка при удалении тренировки: {str(e)}",
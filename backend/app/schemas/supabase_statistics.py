@@ -0,0 +1,37 @@
+"""
+Supabase Statistics Schemas - Response models for set-level statistics
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ExerciseSetStatistics(BaseModel):
+    """Per-exercise totals and maxima"""
+    exercise_id: str  # This is the Directus exercise ID
+    name: Optional[str] = None
+    sets: int
+    reps: int
+    volume: float
+    max_weight: float
+    max_reps: int
+    best_e1rm: float
+
+
+class DaySetStatistics(BaseModel):
+    """Per-day totals"""
+    date: str
+    sets: int
+    reps: int
+    volume: float
+
+
+class SetStatisticsResponse(BaseModel):
+    """Response model for user set statistics over a period"""
+    workout_count: int
+    exercise_count: int
+    total_sets: int
+    total_reps: int
+    total_volume: float
+    exercises: List[ExerciseSetStatistics]
+    days: List[DaySetStatistics]
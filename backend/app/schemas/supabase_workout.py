@@ -3,7 +3,7 @@ Supabase Workout Schemas - Request/Response models for workout operations
 """
 
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 
@@ -55,6 +55,9 @@ class ExerciseResponse(BaseModel):
     exercise_id: str
     created_at: str
     updated_at: str
+    directus_id: Optional[str] = None
+    name: Optional[str] = None
+    category: Optional[str] = None
     sets: Optional[List[ExerciseSetResponse]] = None
 
 
@@ -63,9 +66,11 @@ class WorkoutSessionResponse(BaseModel):
     id: str
     user_id: str
     user_day_id: str
+    date: Optional[str] = None
     started_at: str
     created_at: str
     updated_at: str
+    content_hash: Optional[str] = None
     exercises: Optional[List[ExerciseResponse]] = None
 
 
@@ -74,3 +79,32 @@ class SaveWorkoutSessionResponse(BaseModel):
     session_id: str
     exercises_count: int
     sets_count: int
+
+
+class WriteJobAcceptedResponse(BaseModel):
+    """Response model for a write queued in async mode"""
+    job_id: str
+    status: str
+    status_url: str
+
+
+class WriteJobResponse(BaseModel):
+    """Response model for the state of a queued write"""
+    job_id: str
+    kind: Optional[str] = None
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+class WriteQueueMetricsResponse(BaseModel):
+    """Response model for write queue depth and lag"""
+    depth: int
+    pending: int
+    undelivered: Optional[int] = None
+    consumers: int
+    oldest_job_age_seconds: Optional[float] = None
+    workers_in_process: int
@@ -0,0 +1,229 @@
+"""
+Зеркало каталога Directus в Postgres
+
+Таблицы exercises, exercise_categories и muscle_groups заполняет задача
+синхронизации (catalog_sync). Здесь — запись (upsert) и чтение зеркала.
+Upsert не трогает строки, чьи данные не изменились, и возвращает число
+вставленных или изменённых строк. Чтения возвращают ту же форму, что и Directus API ({data: ...}), чтобы
+DirectusService мог отдавать их вместо ответов Directus. Ресурс, который
+ещё ни разу не синхронизировался, читается как None — тогда запрос идёт
+в Directus.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from dateutil.parser import isoparse
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import engine
+from app.models.tables import (
+    catalog_exercises_table,
+    exercise_categories_table,
+    muscle_groups_table,
+    catalog_sync_state_table,
+)
+
+RESOURCE_EXERCISES = "exercises"
+RESOURCE_CATEGORIES = "categories"
+RESOURCE_MUSCLE_GROUPS = "muscle_groups"
+
+# Ресурс → (коллекция Directus, таблица зеркала)
+RESOURCES = {
+    RESOURCE_CATEGORIES: ("categories", exercise_categories_table),
+    RESOURCE_MUSCLE_GROUPS: ("muscle_groups", muscle_groups_table),
+    RESOURCE_EXERCISES: ("exercises", catalog_exercises_table),
+}
+
+
+def item_updated_at(item: Dict[str, Any]) -> Optional[datetime]:
+    """Время последнего изменения элемента Directus (date_updated или date_created)"""
+    value = item.get("date_updated") or item.get("date_created")
+    return isoparse(value) if value else None
+
+
+def _relation_id(value: Any) -> Optional[str]:
+    """ID связанного элемента: скаляр или развёрнутый объект {id, ...}"""
+    if isinstance(value, dict):
+        value = value.get("id")
+    return str(value) if value is not None else None
+
+
+def _category_id(item: Dict[str, Any]) -> Optional[str]:
+    """Категория упражнения: поле category (или category_id в старых схемах)"""
+    return _relation_id(item.get("category", item.get("category_id")))
+
+
+class CatalogMirrorService:
+    """Запись и чтение зеркала каталога"""
+
+    @staticmethod
+    async def upsert_items(resource: str, items: List[Dict[str, Any]]) -> int:
+        """Вставить или обновить элементы категорий / групп мышц, вернуть число изменённых строк"""
+        _, target = RESOURCES[resource]
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "directus_id": str(item["id"]),
+                "name": item.get("name"),
+                "data": item,
+                "directus_date_updated": item_updated_at(item),
+                "synced_at": now,
+            }
+            for item in items
+        ]
+        if not rows:
+            return 0
+
+        statement = insert(target).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[target.c.directus_id],
+            set_={
+                "name": statement.excluded.name,
+                "data": statement.excluded.data,
+                "directus_date_updated": statement.excluded.directus_date_updated,
+                "synced_at": statement.excluded.synced_at,
+            },
+            where=or_(
+                target.c.name.is_distinct_from(statement.excluded.name),
+                target.c.data.is_distinct_from(statement.excluded.data),
+            ),
+        )
+        async with engine.begin() as conn:
+            result = await conn.execute(statement)
+        return result.rowcount
+
+    @staticmethod
+    async def upsert_exercises(items: List[Dict[str, Any]]) -> int:
+        """
+        Вставить или обновить упражнения по directus_id.
+
+        Строка exercises сохраняет свой id (на неё ссылаются тренировки);
+        category заполняется названием категории из зеркала. Возвращает
+        число вставленных или изменённых строк.
+        """
+        items = [item for item in items if item.get("name")]
+        if not items:
+            return 0
+
+        e = catalog_exercises_table
+        c = exercise_categories_table
+        category_ids = {_category_id(item) for item in items} - {None}
+
+        async with engine.begin() as conn:
+            category_names = dict(
+                (await conn.execute(
+                    select(c.c.directus_id, c.c.name).where(c.c.directus_id.in_(category_ids))
+                )).all()
+            ) if category_ids else {}
+
+            now = datetime.now(timezone.utc)
+            rows = []
+            for item in items:
+                category_id = _category_id(item)
+                rows.append({
+                    "directus_id": str(item["id"]),
+                    "name": item["name"],
+                    "category": category_names.get(category_id),
+                    "description": item.get("description"),
+                    "data": item,
+                    "category_directus_id": category_id,
+                    "directus_date_updated": item_updated_at(item),
+                    "synced_at": now,
+                })
+
+            statement = insert(e).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=[e.c.directus_id],
+                set_={
+                    "name": statement.excluded.name,
+                    "category": statement.excluded.category,
+                    "description": statement.excluded.description,
+                    "data": statement.excluded.data,
+                    "category_directus_id": statement.excluded.category_directus_id,
+                    "directus_date_updated": statement.excluded.directus_date_updated,
+                    "synced_at": statement.excluded.synced_at,
+                    "updated_at": statement.excluded.synced_at,
+                },
+                where=or_(
+                    e.c.name.is_distinct_from(statement.excluded.name),
+                    e.c.category.is_distinct_from(statement.excluded.category),
+                    e.c.description.is_distinct_from(statement.excluded.description),
+                    e.c.data.is_distinct_from(statement.excluded.data),
+                ),
+            )
+            result = await conn.execute(statement)
+        return result.rowcount
+
+    @staticmethod
+    async def get_sync_state() -> List[Dict[str, Any]]:
+        """Состояние синхронизации по ресурсам"""
+        s = catalog_sync_state_table
+        async with engine.connect() as conn:
+            rows = (await conn.execute(select(s).order_by(s.c.resource))).mappings().all()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def save_sync_state(resource: str, **fields) -> None:
+        s = catalog_sync_state_table
+        statement = insert(s).values(resource=resource, **fields)
+        statement = statement.on_conflict_do_update(index_elements=[s.c.resource], set_=fields)
+        async with engine.begin() as conn:
+            await conn.execute(statement)
+
+    @staticmethod
+    async def _is_synced(conn, resource: str) -> bool:
+        s = catalog_sync_state_table
+        synced_at = await conn.scalar(
+            select(s.c.last_success_at).where(s.c.resource == resource)
+        )
+        return synced_at is not None
+
+    @staticmethod
+    async def _read(resource: str, query) -> Optional[List[Dict[str, Any]]]:
+        async with engine.connect() as conn:
+            if not await CatalogMirrorService._is_synced(conn, resource):
+                return None
+            return list((await conn.execute(query)).scalars().all())
+
+    @staticmethod
+    async def list_exercises(
+        limit: Optional[int] = None,
+        offset: int = 0,
+        category_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Упражнения в порядке ID Directus (числовые ID — по значению), как в Directus"""
+        e = catalog_exercises_table
+        query = (
+            select(e.c.data)
+            .where(e.c.data.is_not(None))
+            .order_by(func.length(e.c.directus_id), e.c.directus_id)
+            .offset(offset)
+            .limit(limit)
+        )
+        if category_id is not None:
+            query = query.where(e.c.category_directus_id == str(category_id))
+
+        data = await CatalogMirrorService._read(RESOURCE_EXERCISES, query)
+        return {"data": data} if data is not None else None
+
+    @staticmethod
+    async def get_exercise(directus_id: str) -> Optional[Dict[str, Any]]:
+        """Упражнение по ID Directus; None, если его нет в зеркале"""
+        e = catalog_exercises_table
+        data = await CatalogMirrorService._read(
+            RESOURCE_EXERCISES,
+            select(e.c.data).where(e.c.directus_id == str(directus_id), e.c.data.is_not(None)),
+        )
+        return {"data": data[0]} if data else None
+
+    @staticmethod
+    async def list_items(resource: str) -> Optional[Dict[str, Any]]:
+        """Все категории или группы мышц"""
+        _, target = RESOURCES[resource]
+        data = await CatalogMirrorService._read(
+            resource,
+            select(target.c.data).order_by(func.length(target.c.directus_id), target.c.directus_id),
+        )
+        return {"data": data} if data is not None else None
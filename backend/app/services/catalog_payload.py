@@ -0,0 +1,120 @@
+"""
+Предрасчитанный ответ /batch/init
+
+Ответ (упражнения с подставленными категориями + категории) собирается
+один раз на версию каталога: пока кеш каталога отдаёт те же объекты
+ответов Directus, используется готовый результат. Тело хранится уже
+сериализованным и сжатым (gzip и, если установлен brotli, br), вместе с
+сильным ETag — sha256 от JSON.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli опционален: без него отдаётся gzip
+    brotli = None
+
+from app.services.directus import DirectusService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PrecomputedPayload:
+    """Сериализованный ответ в нескольких кодировках"""
+
+    digest: str
+    identity: bytes
+    gzip: bytes
+    br: Optional[bytes]
+
+    def encoded(self, encoding: str) -> bytes:
+        return {"gzip": self.gzip, "br": self.br}.get(encoding) or self.identity
+
+    def etag(self, encoding: str = "identity") -> str:
+        """Сильный ETag: у каждой кодировки свой (разные байты тела)"""
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.digest}{suffix}"'
+
+
+def build_batch_init(
+    exercises_response: Optional[Dict[str, Any]],
+    categories_response: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Упражнения с категорией {id, name} вместо ID и список категорий"""
+    # Directus возвращает {data: [...]}
+    exercises = exercises_response.get("data", []) if exercises_response else []
+    categories = categories_response.get("data", []) if categories_response else []
+
+    category_map = {cat.get("id"): cat.get("name") for cat in categories}
+
+    transformed_exercises = []
+    for exercise in exercises:
+        category_id = exercise.get("category")
+        # Если category это ID (число или строка), заменяем на объект {id, name}
+        if isinstance(category_id, (int, str)):
+            exercise = {
+                **exercise,
+                "category": {"id": category_id, "name": category_map.get(category_id, "Без категории")},
+            }
+        transformed_exercises.append(exercise)
+
+    return {
+        "exercises": transformed_exercises,
+        "categories": categories,
+    }
+
+
+def precompute(payload: Dict[str, Any]) -> PrecomputedPayload:
+    """Сериализовать и сжать ответ (CPU-работа, выполняется в потоке)"""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    return PrecomputedPayload(
+        digest=hashlib.sha256(body).hexdigest(),
+        identity=body,
+        gzip=gzip.compress(body, compresslevel=9, mtime=0),
+        br=brotli.compress(body, quality=11) if brotli is not None else None,
+    )
+
+
+_batch_init: Optional[Tuple[Any, Any, PrecomputedPayload]] = None
+_batch_init_lock = asyncio.Lock()
+
+
+class CatalogPayloadService:
+    """Готовые ответы по каталогу"""
+
+    @staticmethod
+    async def get_batch_init() -> PrecomputedPayload:
+        """Ответ /batch/init для текущей версии каталога"""
+        global _batch_init
+
+        exercises_response, categories_response = await asyncio.gather(
+            DirectusService.get_exercises(),
+            DirectusService.get_exercise_categories(),
+        )
+
+        async with _batch_init_lock:
+            # Версия каталога = объекты ответов из кеша; обновление кеша даёт новые
+            if (
+                _batch_init is not None
+                and _batch_init[0] is exercises_response
+                and _batch_init[1] is categories_response
+            ):
+                return _batch_init[2]
+
+            payload = await asyncio.to_thread(
+                precompute, build_batch_init(exercises_response, categories_response)
+            )
+            _batch_init = (exercises_response, categories_response, payload)
+            logger.info(
+                f"Batch init payload built: {len(payload.identity)} bytes, "
+                f"gzip {len(payload.gzip)}, br {len(payload.br) if payload.br else '-'}"
+            )
+            return payload
@@ -0,0 +1,190 @@
+"""
+Инкрементальная синхронизация каталога Directus → Postgres
+
+Для каждой коллекции (categories, muscle_groups, exercises — в этом
+порядке, упражнениям нужны названия категорий) задача постранично читает
+items/{collection} из Directus и делает upsert в таблицы зеркала. Курсор —
+самое позднее date_updated/date_created среди полученных элементов;
+следующий запуск запрашивает только элементы, изменённые с этого момента
+(_gte: элементы на границе приходят повторно, upsert идемпотентен). Если в
+коллекции нет этих полей, каждый запуск читает её целиком.
+
+Удаления в Directus не отражаются: строки exercises нужны тренировкам.
+
+Запуски из разных воркеров не пересекаются: задача держит
+pg_try_advisory_lock, остальные в это время пропускают свой запуск.
+Локальные кеши каталога сбрасываются, только если upsert действительно
+изменил строки: повторно полученные без изменений элементы кеш не трогают.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.database import engine
+from app.services.catalog_mirror import (
+    CatalogMirrorService,
+    RESOURCES,
+    RESOURCE_EXERCISES,
+    item_updated_at,
+)
+from app.services.directus import DirectusService, catalog_cache
+from app.services.supabase_workouts import exercise_cache
+
+logger = logging.getLogger(__name__)
+
+# Ключ pg_advisory_lock задачи синхронизации каталога
+SYNC_LOCK_KEY = 720_241_205
+
+_sync_task: Optional[asyncio.Task] = None
+
+
+def _isoformat(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class CatalogSyncService:
+    """Синхронизация зеркала каталога"""
+
+    @staticmethod
+    async def _fetch_page(collection: str, cursor: Optional[datetime], offset: int) -> List[Dict[str, Any]]:
+        params = {
+            "limit": settings.CATALOG_SYNC_PAGE_SIZE,
+            "offset": offset,
+            "sort": "id",
+        }
+        if cursor is not None:
+            since = _isoformat(cursor)
+            params["filter"] = json.dumps({
+                "_or": [
+                    {"date_updated": {"_gte": since}},
+                    {"date_created": {"_gte": since}},
+                ]
+            })
+
+        response = await DirectusService._make_request("GET", f"items/{collection}", params=params)
+        if response is None:
+            raise RuntimeError(f"Directus request failed: items/{collection}")
+        return response.get("data") or []
+
+    @staticmethod
+    async def sync_resource(resource: str, cursor: Optional[datetime]) -> Dict[str, int]:
+        """Синхронизировать одну коллекцию, вернуть число полученных и изменённых элементов"""
+        collection, _ = RESOURCES[resource]
+        started_at = datetime.now(timezone.utc)
+        await CatalogMirrorService.save_sync_state(resource, status="running", last_started_at=started_at)
+
+        synced = 0
+        changed = 0
+        newest = cursor
+        try:
+            offset = 0
+            while True:
+                items = await CatalogSyncService._fetch_page(collection, cursor, offset)
+                if not items:
+                    break
+
+                if resource == RESOURCE_EXERCISES:
+                    changed += await CatalogMirrorService.upsert_exercises(items)
+                else:
+                    changed += await CatalogMirrorService.upsert_items(resource, items)
+
+                synced += len(items)
+                for item in items:
+                    updated_at = item_updated_at(item)
+                    if updated_at is not None and (newest is None or updated_at > newest):
+                        newest = updated_at
+
+                if len(items) < settings.CATALOG_SYNC_PAGE_SIZE:
+                    break
+                offset += len(items)
+        except Exception as e:
+            await CatalogMirrorService.save_sync_state(
+                resource,
+                status="error",
+                error=str(e),
+                last_finished_at=datetime.now(timezone.utc),
+            )
+            raise
+
+        finished_at = datetime.now(timezone.utc)
+        await CatalogMirrorService.save_sync_state(
+            resource,
+            cursor=newest,
+            status="ok",
+            error=None,
+            items_synced=synced,
+            last_finished_at=finished_at,
+            last_success_at=finished_at,
+        )
+        logger.info(f"Catalog {resource} synced: {synced} items, {changed} changed")
+        return {"fetched": synced, "changed": changed}
+
+    @staticmethod
+    async def sync_all() -> Dict[str, Any]:
+        """
+        Синхронизировать все коллекции.
+        Возвращает по коллекциям число полученных и изменённых элементов
+        (ошибка коллекции не останавливает остальные) или skipped, если
+        синхронизация уже идёт.
+        """
+        async with engine.connect() as lock_conn:
+            if not await lock_conn.scalar(select(func.pg_try_advisory_lock(SYNC_LOCK_KEY))):
+                return {"skipped": True, "resources": {}}
+
+            try:
+                cursors = {
+                    state["resource"]: state["cursor"]
+                    for state in await CatalogMirrorService.get_sync_state()
+                }
+
+                results: Dict[str, Any] = {}
+                for resource in RESOURCES:
+                    try:
+                        results[resource] = await CatalogSyncService.sync_resource(
+                            resource, cursors.get(resource)
+                        )
+                    except Exception as e:
+                        logger.error(f"Catalog {resource} sync failed: {e}")
+                        results[resource] = {"error": str(e)}
+            finally:
+                await lock_conn.scalar(select(func.pg_advisory_unlock(SYNC_LOCK_KEY)))
+
+        if any(result.get("changed") for result in results.values()):
+            # Кеши этого процесса; у других воркеров истекут по TTL
+            catalog_cache.clear()
+            exercise_cache.clear()
+
+        return {"skipped": False, "resources": results}
+
+    @staticmethod
+    async def run_periodically() -> None:
+        """Фоновая синхронизация каждые CATALOG_SYNC_INTERVAL_SECONDS"""
+        while True:
+            try:
+                await CatalogSyncService.sync_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Catalog sync error: {e}")
+            await asyncio.sleep(settings.CATALOG_SYNC_INTERVAL_SECONDS)
+
+
+def start_catalog_sync() -> None:
+    """Запустить фоновую синхронизацию (вызывается из lifespan)"""
+    global _sync_task
+    if settings.CATALOG_MIRROR_ENABLED and settings.CATALOG_SYNC_INTERVAL_SECONDS > 0:
+        _sync_task = asyncio.create_task(CatalogSyncService.run_periodically())
+
+
+async def stop_catalog_sync() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        await asyncio.gather(_sync_task, return_exceptions=True)
+        _sync_task = None
@@ -0,0 +1,280 @@
+"""
+Сервис дневных итогов (rollup) для статистики
+
+Таблица user_daily_stats хранит по строке на пользователя и день. Она
+обновляется в той же транзакции, что и запись тренировки/упражнения, поэтому
+статистика читает O(дней) строк вместо сырых тренировок и упражнений.
+
+Пока STATISTICS_DAILY_ROLLUPS_ENABLED выключен, get_period_totals и
+get_daily_rows считают те же итоги одним сгруппированным запросом по сырым
+таблицам: так в статистику попадают записи, обошедшие дельты.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, type_coerce, Date
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime, date, time, timedelta
+from typing import Optional, List
+from uuid import UUID
+
+from app.config import settings
+from app.models.tables import workout_table, exercise_table, user_daily_stats_table
+from app.services.statistics_cache import StatisticsCache
+
+# Колонки итогов, которые меняются дельтами
+ROLLUP_COLUMNS = (
+    "workout_count",
+    "exercise_count",
+    "total_sets",
+    "total_reps",
+    "total_weight",
+)
+
+
+def _exercises_per_workout():
+    """Подзапрос: число активных упражнений и сумма повторений по тренировке"""
+    e = exercise_table
+    return (
+        select(
+            e.c.workout_id,
+            func.count(e.c.id).label("exercise_count"),
+            func.coalesce(func.sum(e.c.reps), 0).label("reps"),
+        )
+        .where(e.c.is_deleted == False)
+        .group_by(e.c.workout_id)
+        .subquery()
+    )
+
+
+def _raw_totals_query(user_id: UUID, start: date, end: date, *group_by):
+    """
+    Итоги за [start, end] по сырым таблицам (те же колонки, что в rollup).
+    Упражнения агрегируются по тренировке в подзапросе, чтобы total_weight и
+    total_sets тренировки не умножались на число упражнений при join.
+    """
+    w = workout_table
+    exercises_per_workout = _exercises_per_workout()
+    return (
+        select(
+            *group_by,
+            func.count(w.c.id).label("workout_count"),
+            func.coalesce(func.sum(exercises_per_workout.c.exercise_count), 0).label("exercise_count"),
+            func.coalesce(func.sum(w.c.total_sets), 0).label("total_sets"),
+            func.coalesce(func.sum(exercises_per_workout.c.reps), 0).label("total_reps"),
+            func.coalesce(func.sum(w.c.total_weight), 0).label("total_weight"),
+        )
+        .select_from(
+            w.outerjoin(
+                exercises_per_workout,
+                exercises_per_workout.c.workout_id == w.c.id,
+            )
+        )
+        .where(
+            (w.c.user_id == user_id)
+            & (w.c.date >= datetime.combine(start, time.min))
+            & (w.c.date < datetime.combine(end + timedelta(days=1), time.min))
+            & (w.c.is_deleted == False)
+        )
+    )
+
+
+class DailyStatsService:
+    """Сервис для поддержки дневных итогов пользователя"""
+
+    @staticmethod
+    async def apply_delta(
+        session: AsyncSession,
+        user_id: UUID,
+        day: date,
+        **deltas,
+    ) -> None:
+        """
+        Прибавить дельты к итогам дня (upsert).
+
+        Вызывается внутри транзакции записи, коммит делает вызывающий код.
+        День помечается для сброса кеша статистики.
+        """
+        values = {column: deltas.get(column) or 0 for column in ROLLUP_COLUMNS}
+        if not any(values.values()):
+            return
+
+        StatisticsCache.mark_dirty(session, user_id, day=day)
+
+        dialect = session.get_bind().dialect.name
+        insert_fn = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        table = user_daily_stats_table
+
+        stmt = insert_fn(table).values(
+            user_id=user_id,
+            day=day,
+            updated_at=datetime.utcnow(),
+            **values,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day],
+            set_={
+                **{column: table.c[column] + stmt.excluded[column] for column in ROLLUP_COLUMNS},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def get_workout_exercise_totals(
+        session: AsyncSession,
+        workout_id: int,
+    ) -> dict:
+        """Количество и сумма повторений активных упражнений тренировки"""
+        e = exercise_table
+        result = await session.execute(
+            select(
+                func.count(e.c.id).label("exercise_count"),
+                func.coalesce(func.sum(e.c.reps), 0).label("total_reps"),
+            ).where((e.c.workout_id == workout_id) & (e.c.is_deleted == False))
+        )
+        row = result.one()
+        return {"exercise_count": row.exercise_count, "total_reps": int(row.total_reps)}
+
+    @staticmethod
+    async def apply_workout(
+        session: AsyncSession,
+        user_id: UUID,
+        workout_date: datetime,
+        total_weight: Optional[float],
+        total_sets: Optional[int],
+        sign: int = 1,
+        exercise_count: int = 0,
+        total_reps: int = 0,
+    ) -> None:
+        """Добавить (sign=1) или вычесть (sign=-1) вклад тренировки в её день"""
+        await DailyStatsService.apply_delta(
+            session,
+            user_id,
+            workout_date.date(),
+            workout_count=sign,
+            total_sets=sign * (total_sets or 0),
+            total_weight=sign * (total_weight or 0),
+            exercise_count=sign * exercise_count,
+            total_reps=sign * total_reps,
+        )
+
+    @staticmethod
+    async def get_period_totals(
+        session: AsyncSession,
+        user_id: UUID,
+        start: date,
+        end: date,
+    ) -> dict:
+        """Сумма дневных итогов за период [start, end]"""
+        if not settings.STATISTICS_DAILY_ROLLUPS_ENABLED:
+            query = _raw_totals_query(user_id, start, end)
+        else:
+            r = user_daily_stats_table
+            query = select(
+                func.coalesce(func.sum(r.c.workout_count), 0).label("workout_count"),
+                func.coalesce(func.sum(r.c.exercise_count), 0).label("exercise_count"),
+                func.coalesce(func.sum(r.c.total_weight), 0).label("total_weight"),
+                func.coalesce(func.sum(r.c.total_sets), 0).label("total_sets"),
+                func.coalesce(func.sum(r.c.total_reps), 0).label("total_reps"),
+            ).where((r.c.user_id == user_id) & (r.c.day >= start) & (r.c.day <= end))
+
+        row = (await session.execute(query)).one()
+
+        return {
+            "workout_count": int(row.workout_count),
+            "total_exercises": int(row.exercise_count),
+            "total_weight": row.total_weight,
+            "total_sets": int(row.total_sets),
+            "total_reps": int(row.total_reps),
+        }
+
+    @staticmethod
+    async def get_daily_rows(
+        session: AsyncSession,
+        user_id: UUID,
+        start: date,
+        end: date,
+    ) -> list:
+        """Дневные итоги за период [start, end], по возрастанию дня"""
+        if not settings.STATISTICS_DAILY_ROLLUPS_ENABLED:
+            day = type_coerce(func.date(workout_table.c.date), Date).label("day")
+            result = await session.execute(
+                _raw_totals_query(user_id, start, end, day).group_by(day).order_by(day)
+            )
+            return result.all()
+
+        r = user_daily_stats_table
+        result = await session.execute(
+            select(
+                r.c.day,
+                r.c.workout_count,
+                r.c.exercise_count,
+                r.c.total_sets,
+                r.c.total_reps,
+                r.c.total_weight,
+            )
+            .where((r.c.user_id == user_id) & (r.c.day >= start) & (r.c.day <= end))
+            .order_by(r.c.day)
+        )
+        return result.all()
+
+    @staticmethod
+    async def rebuild_for_users(
+        session: AsyncSession,
+        user_ids: List[UUID],
+    ) -> None:
+        """
+        Пересчитать итоги пользователей из сырых данных.
+
+        Один DELETE и один INSERT ... SELECT с группировкой по (user_id, day);
+        упражнения предварительно агрегируются по тренировке.
+        """
+        w = workout_table
+        r = user_daily_stats_table
+
+        await session.execute(delete(r).where(r.c.user_id.in_(user_ids)))
+
+        exercises_per_workout = _exercises_per_workout()
+        day = func.date(w.c.date)
+
+        source = (
+            select(
+                w.c.user_id,
+                day,
+                func.count(w.c.id),
+                func.coalesce(func.sum(exercises_per_workout.c.exercise_count), 0),
+                func.coalesce(func.sum(w.c.total_sets), 0),
+                func.coalesce(func.sum(exercises_per_workout.c.reps), 0),
+                func.coalesce(func.sum(w.c.total_weight), 0),
+                func.current_timestamp(),
+            )
+            .select_from(
+                w.outerjoin(
+                    exercises_per_workout,
+                    exercises_per_workout.c.workout_id == w.c.id,
+                )
+            )
+            .where(w.c.user_id.in_(user_ids) & (w.c.is_deleted == False))
+            .group_by(w.c.user_id, day)
+        )
+
+        await session.execute(
+            insert(r).from_select(
+                ["user_id", "day", *ROLLUP_COLUMNS, "updated_at"],
+                source,
+            )
+        )
+
+    @staticmethod
+    async def get_user_ids_chunk(
+        session: AsyncSession,
+        after: Optional[UUID],
+        chunk_size: int,
+    ) -> List[UUID]:
+        """Следующая порция пользователей с тренировками (keyset по user_id)"""
+        w = workout_table
+        query = select(w.c.user_id).distinct().order_by(w.c.user_id).limit(chunk_size)
+        if after is not None:
+            query = query.where(w.c.user_id > after)
+        result = await session.execute(query)
+        return list(result.scalars().all())
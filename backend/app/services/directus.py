@@ -1,20 +1,45 @@
 """
 Сервис для интеграции с Directus API
+
+Чтения каталога идут через кеш в памяти процесса (stale-while-revalidate):
+каталог меняется редко, поэтому ответы отдаются из памяти, а устаревшие
+записи обновляются в фоне. Пока Directus отвечает медленно или с ошибкой,
+отдаётся последнее полученное значение.
+
+Поиск по названию выполняется по локальному индексу (ExerciseSearchIndex),
+который строится из полного каталога упражнений и кешируется вместе с ним.
+
+Если включено зеркало каталога (CATALOG_MIRROR_ENABLED) и ресурс уже
+синхронизирован, данные читаются из Postgres (CatalogMirrorService), а
+Directus остаётся запасным источником.
 """
 
 import httpx
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable
 from app.config import settings
+from app.core.cache import StaleWhileRevalidateCache
+from app.core.http import get_directus_client
+from app.services.catalog_mirror import (
+    CatalogMirrorService,
+    RESOURCE_CATEGORIES,
+    RESOURCE_MUSCLE_GROUPS,
+)
+from app.services.exercise_search import ExerciseSearchIndex
 
 logger = logging.getLogger(__name__)
 
+# Ответы Directus по (endpoint, params); TTL задаётся для каждого ресурса
+catalog_cache = StaleWhileRevalidateCache(
+    settings.CATALOG_CACHE_MAX_SIZE,
+    settings.CATALOG_STALE_TTL_SECONDS,
+)
+
 
 class DirectusService:
     """Сервис для работы с Directus CMS"""
 
     BASE_URL = settings.DIRECTUS_URL
-    TIMEOUT = 10
 
     @staticmethod
     async def _make_request(
@@ -27,10 +52,9 @@ class DirectusService:
         url = f"{DirectusService.BASE_URL}/{endpoint}"
 
         try:
-            async with httpx.AsyncClient(timeout=DirectusService.TIMEOUT) as client:
-                response = await client.request(method, url, **kwargs)
-                response.raise_for_status()
-                return response.json()
+            response = await get_directus_client().request(method, url, **kwargs)
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPError as e:
             logger.error(f"Directus API error: {e}")
             return None
@@ -38,6 +62,38 @@ class DirectusService:
             logger.error(f"Error making request to Directus: {e}")
             return None
 
+    @staticmethod
+    async def _read_mirror(
+        mirror: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        """Прочитать зеркало каталога; None — читать из Directus"""
+        if not settings.CATALOG_MIRROR_ENABLED:
+            return None
+        try:
+            return await mirror()
+        except Exception as e:
+            logger.warning(f"Catalog mirror read failed, using Directus: {e}")
+            return None
+
+    @staticmethod
+    async def _cached_get(
+        endpoint: str,
+        ttl_seconds: float,
+        params: Optional[Dict[str, Any]] = None,
+        mirror: Optional[Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """GET через кеш каталога: из зеркала, если оно есть, иначе к Directus"""
+        key = (endpoint, tuple(sorted((params or {}).items())))
+
+        async def load() -> Optional[Dict[str, Any]]:
+            if mirror is not None:
+                result = await DirectusService._read_mirror(mirror)
+                if result is not None:
+                    return result
+            return await DirectusService._make_request("GET", endpoint, params=params)
+
+        return await catalog_cache.get_or_load(key, ttl_seconds, load)
+
     @staticmethod
     async def get_exercises(
         limit: int = 100,
@@ -46,12 +102,18 @@ class DirectusService:
     ) -> Optional[Dict[str, Any]]:
         """
         Получить список упражнений из Directus API.
+        С search упражнения ищутся по локальному индексу (по релевантности).
 
         Args:
             limit: Максимальное количество упражнений
             offset: Смещение для пагинации
             search: Строка для поиска
         """
+        if search:
+            index = await DirectusService.get_exercise_search_index()
+            if index is not None:
+                return {"data": index.search(search, limit=offset + limit)[offset:]}
+
         # Построить query параметры как строку
         query_params = f"limit={limit}&offset={offset}"
 
@@ -63,9 +125,10 @@ class DirectusService:
         # if settings.DIRECTUS_API_TOKEN:
         #     query_params += f"&access_token={settings.DIRECTUS_API_TOKEN}"
 
-        response = await DirectusService._make_request(
-            "GET",
+        response = await DirectusService._cached_get(
             f"items/exercises?{query_params}",
+            settings.CATALOG_EXERCISES_TTL_SECONDS,
+            mirror=lambda: CatalogMirrorService.list_exercises(limit, offset),
         )
 
         return response
@@ -78,9 +141,10 @@ class DirectusService:
         Args:
             exercise_id: ID упражнения в Directus (UUID)
         """
-        response = await DirectusService._make_request(
-            "GET",
+        response = await DirectusService._cached_get(
             f"items/exercises/{exercise_id}",
+            settings.CATALOG_EXERCISES_TTL_SECONDS,
+            mirror=lambda: CatalogMirrorService.get_exercise(exercise_id),
         )
 
         return response
@@ -88,10 +152,11 @@ class DirectusService:
     @staticmethod
     async def get_exercise_categories() -> Optional[Dict[str, Any]]:
         """Получить категории упражнений"""
-        response = await DirectusService._make_request(
-            "GET",
+        response = await DirectusService._cached_get(
             "items/categories",
+            settings.CATALOG_CATEGORIES_TTL_SECONDS,
             params={"limit": 100},
+            mirror=lambda: CatalogMirrorService.list_items(RESOURCE_CATEGORIES),
         )
 
         return response
@@ -100,10 +165,11 @@ class DirectusService:
     async def get_muscle_groups() -> Optional[Dict[str, Any]]:
         """Получить группы мышц"""
         # Примечание: может не существовать в этом Directus
-        response = await DirectusService._make_request(
-            "GET",
+        response = await DirectusService._cached_get(
             "items/muscle_groups",
+            settings.CATALOG_MUSCLE_GROUPS_TTL_SECONDS,
             params={"limit": 100},
+            mirror=lambda: CatalogMirrorService.list_items(RESOURCE_MUSCLE_GROUPS),
         )
 
         return response
@@ -111,14 +177,19 @@ class DirectusService:
     @staticmethod
     async def search_exercises(query: str) -> Optional[Dict[str, Any]]:
         """
-        Поиск упражнений по названию.
+        Поиск упражнений по названию (локальный индекс; если каталог
+        недоступен — запрос к Directus).
 
         Args:
             query: Строка поиска
         """
-        response = await DirectusService._make_request(
-            "GET",
+        index = await DirectusService.get_exercise_search_index()
+        if index is not None:
+            return {"data": index.search(query, limit=50)}
+
+        response = await DirectusService._cached_get(
             "items/exercises",
+            settings.CATALOG_EXERCISES_TTL_SECONDS,
             params={
                 "filter": f'name[contains],"{query}"',
                 "limit": 50,
@@ -127,6 +198,36 @@ class DirectusService:
 
         return response
 
+    @staticmethod
+    async def get_exercise_search_index() -> Optional[ExerciseSearchIndex]:
+        """
+        Поисковый индекс по всему каталогу упражнений.
+
+        Индекс — значение в кеше каталога: при обновлении каталога строится
+        новый индекс и подменяет старый одной записью в кеше.
+        """
+        return await catalog_cache.get_or_load(
+            ("exercise_search_index",),
+            settings.CATALOG_EXERCISES_TTL_SECONDS,
+            DirectusService._build_exercise_search_index,
+        )
+
+    @staticmethod
+    async def _build_exercise_search_index() -> Optional[ExerciseSearchIndex]:
+        response = await DirectusService._read_mirror(CatalogMirrorService.list_exercises)
+        if response is None:
+            response = await DirectusService._make_request(
+                "GET",
+                "items/exercises",
+                params={"limit": -1, "fields": "*"},
+            )
+        if not response:
+            return None
+
+        index = ExerciseSearchIndex(response.get("data") or [])
+        logger.info(f"Exercise search index built: {len(index)} exercises")
+        return index
+
     @staticmethod
     async def get_exercises_by_muscle_group(
         muscle_group_id: str,
@@ -137,9 +238,9 @@ class DirectusService:
         Args:
             muscle_group_id: ID группы мышц в Directus
         """
-        response = await DirectusService._make_request(
-            "GET",
+        response = await DirectusService._cached_get(
             "items/exercises",
+            settings.CATALOG_EXERCISES_TTL_SECONDS,
             params={
                 "filter": f"muscle_groups_id[in],{muscle_group_id}",
                 "limit": 100,
@@ -158,13 +259,14 @@ class DirectusService:
         Args:
             category_id: ID категории в Directus
         """
-        response = await DirectusService._make_request(
-            "GET",
+        response = await DirectusService._cached_get(
             "items/exercises",
+            settings.CATALOG_EXERCISES_TTL_SECONDS,
             params={
                 "filter": f"category_id[in],{category_id}",
                 "limit": 100,
             },
+            mirror=lambda: CatalogMirrorService.list_exercises(100, category_id=category_id),
         )
 
         return response
@@ -177,9 +279,9 @@ class DirectusService:
         Args:
             exercise_id: ID упражнения в Directus
         """
-        response = await DirectusService._make_request(
-            "GET",
+        response = await DirectusService._cached_get(
             f"items/exercises/{exercise_id}",
+            settings.CATALOG_EXERCISES_TTL_SECONDS,
             params={
                 "fields": "*,muscle_groups_id.*,category_id.*",
             },
@@ -9,6 +9,9 @@ from typing import Optional, List
 
 from app.models.exercise import Exercise
 from app.models.workout import Workout
+from app.services.daily_stats import DailyStatsService
+from app.services.personal_records import PersonalRecordsService
+from app.services.statistics_cache import StatisticsCache
 
 
 class ExerciseService:
@@ -37,6 +40,25 @@ class ExerciseService:
         )
         session.add(exercise)
         await session.flush()
+
+        workout = await session.execute(
+            select(Workout).where(Workout.id == workout_id)
+        )
+        workout_obj = workout.scalar_one_or_none()
+        if workout_obj:
+            await DailyStatsService.apply_delta(
+                session,
+                workout_obj.user_id,
+                workout_obj.date.date(),
+                exercise_count=1,
+                total_reps=reps or 0,
+            )
+            StatisticsCache.mark_dirty(
+                session, workout_obj.user_id, exercise_id=exercise_id
+            )
+            await PersonalRecordsService.record_set(
+                session, workout_obj.user_id, exercise_id, weight, reps
+            )
         return exercise
 
     @staticmethod
@@ -92,6 +114,8 @@ class ExerciseService:
         if not workout_obj or workout_obj.user_id != user_id:
             return None
 
+        old_reps = exercise.reps
+
         if weight is not None:
             exercise.weight = weight
         if sets is not None:
@@ -105,6 +129,19 @@ class ExerciseService:
 
         exercise.updated_at = datetime.utcnow()
         await session.flush()
+
+        await DailyStatsService.apply_delta(
+            session,
+            user_id,
+            workout_obj.date.date(),
+            total_reps=(exercise.reps or 0) - (old_reps or 0),
+        )
+        StatisticsCache.mark_dirty(session, user_id, exercise_id=exercise.exercise_id)
+
+        if weight is not None or reps is not None:
+            await PersonalRecordsService.record_set(
+                session, user_id, exercise.exercise_id, exercise.weight, exercise.reps
+            )
         return exercise
 
     @staticmethod
@@ -134,6 +171,15 @@ class ExerciseService:
         exercise.updated_at = datetime.utcnow()
 
         await session.flush()
+
+        await DailyStatsService.apply_delta(
+            session,
+            user_id,
+            workout_obj.date.date(),
+            exercise_count=-1,
+            total_reps=-(exercise.reps or 0),
+        )
+        StatisticsCache.mark_dirty(session, user_id, exercise_id=exercise.exercise_id)
         return True
 
     @staticmethod
@@ -153,7 +199,7 @@ class ExerciseService:
         if not workout_obj or workout_obj.user_id != user_id:
             return False
 
-        # Обновить порядок
+        # Обновить порядок (на дневные итоги не влияет)
         for item in order_data:
             exercise = await ExerciseService.get_exercise_by_id(
                 session, item["exercise_id"]
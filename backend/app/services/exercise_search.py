@@ -0,0 +1,142 @@
+"""
+Локальный поисковый индекс по названиям упражнений (typeahead)
+
+Строится из каталога Directus один раз на загрузку каталога и живёт в
+кеше каталога: при фоновом обновлении собирается новый индекс и заменяет
+старый целиком, поиск никогда не видит наполовину построенный индекс.
+
+Нормализация: нижний регистр, ё → е, токены из букв и цифр, кириллица
+транслитерируется в латиницу. Поэтому «жим», «zhim» и «Жим» совпадают, а
+«бенч» находит «Bench press».
+
+Поиск по каждому слову запроса:
+- точное совпадение токена (3 балла);
+- префикс токена через trie (2 балла) — для ввода по буквам;
+- нечёткое совпадение по триграммам (сходство 0..1) — для опечаток,
+  только если слово не нашлось как префикс.
+В выдачу попадают упражнения, в которых нашлись все слова запроса;
+сортировка по сумме баллов, затем по длине названия.
+"""
+
+import heapq
+import re
+from typing import Any, Dict, List, Set
+
+TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "h", "ц": "c", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}
+TOKEN_RE = re.compile(r"[0-9a-zа-яё]+")
+
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FIRST_WORD_BONUS = 0.5
+TRIGRAM_THRESHOLD = 0.3
+
+_IDS = ""  # ключ множества упражнений в узле trie (символы токенов непустые)
+
+
+def tokenize(text: str) -> List[str]:
+    """Нормализованные латинские токены строки"""
+    return [
+        "".join(TRANSLIT.get(char, char) for char in token)
+        for token in TOKEN_RE.findall(text.lower())
+    ]
+
+
+def trigrams(token: str) -> Set[str]:
+    """Триграммы токена с отступами, как в pg_trgm"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ExerciseSearchIndex:
+    """Неизменяемый индекс: префиксный trie и триграммы по токенам названий"""
+
+    def __init__(self, exercises: List[Dict[str, Any]]):
+        self.exercises = [exercise for exercise in exercises if exercise.get("name")]
+        self._tokens: List[List[str]] = []
+        self._token_docs: Dict[str, Set[int]] = {}
+        self._trie: Dict[str, Any] = {}
+        self._trigram_tokens: Dict[str, Set[str]] = {}
+
+        for doc_id, exercise in enumerate(self.exercises):
+            tokens = tokenize(exercise["name"])
+            self._tokens.append(tokens)
+            for token in tokens:
+                self._token_docs.setdefault(token, set()).add(doc_id)
+                node = self._trie
+                for char in token:
+                    node = node.setdefault(char, {})
+                    node.setdefault(_IDS, set()).add(doc_id)
+
+        for token in self._token_docs:
+            for trigram in trigrams(token):
+                self._trigram_tokens.setdefault(trigram, set()).add(token)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def _prefix_docs(self, prefix: str) -> Set[int]:
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node.get(_IDS, set())
+
+    def _fuzzy_docs(self, token: str) -> Dict[int, float]:
+        """Упражнения с похожими токенами: сходство Жаккара по триграммам"""
+        query_trigrams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for trigram in query_trigrams:
+            for candidate in self._trigram_tokens.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        scores: Dict[int, float] = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(query_trigrams) + len(trigrams(candidate)) - count)
+            if similarity < TRIGRAM_THRESHOLD:
+                continue
+            for doc_id in self._token_docs[candidate]:
+                scores[doc_id] = max(scores.get(doc_id, 0.0), similarity)
+        return scores
+
+    def _token_scores(self, token: str) -> Dict[int, float]:
+        scores = {doc_id: PREFIX_SCORE for doc_id in self._prefix_docs(token)}
+        if not scores:
+            return self._fuzzy_docs(token)
+        for doc_id in self._token_docs.get(token, ()):
+            scores[doc_id] = EXACT_SCORE
+        return scores
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Упражнения по запросу, лучшие первыми"""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        totals: Dict[int, float] = {}
+        for position, token in enumerate(query_tokens):
+            scores = self._token_scores(token)
+            if position == 0:
+                totals = scores.copy()
+            else:
+                totals = {doc_id: total + scores[doc_id] for doc_id, total in totals.items() if doc_id in scores}
+            if not totals:
+                return []
+
+        first = query_tokens[0]
+        for doc_id in totals:
+            if self._tokens[doc_id][0].startswith(first):
+                totals[doc_id] += FIRST_WORD_BONUS
+
+        ranked = heapq.nsmallest(
+            limit,
+            totals,
+            key=lambda doc_id: (-totals[doc_id], len(self.exercises[doc_id]["name"]), self.exercises[doc_id]["name"]),
+        )
+        return [self.exercises[doc_id] for doc_id in ranked]
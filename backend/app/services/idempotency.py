@@ -0,0 +1,153 @@
+"""
+Идемпотентность записывающих запросов (заголовок Idempotency-Key)
+
+Успешный ответ запоминается по ключу (scope = метод и маршрут) на
+IDEMPOTENCY_TTL_SECONDS, повторный запрос с тем же ключом получает
+сохранённый ответ без повторной записи. Одновременные запросы с одним
+ключом выполняются по очереди: локальный asyncio.Lock внутри процесса и
+Redis lock между воркерами. Если Redis недоступен, ответы хранятся в
+памяти процесса (TTLCache), а блокировка остаётся только локальной.
+
+Вместе с ответом хранится хеш тела запроса: тот же ключ с другим телом
+отклоняется (422), чтобы случайно не вернуть ответ на чужой запрос.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import weakref
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+_local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+_fallback_store = TTLCache(max_size=10000, ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+def _fingerprint(payload: Any) -> str:
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """Хранилище ответов и блокировки по Idempotency-Key"""
+
+    @staticmethod
+    def storage_key(scope: str, key: str) -> str:
+        return f"idempotency:{scope}:{key}"
+
+    @staticmethod
+    async def get(storage_key: str) -> Optional[dict]:
+        """Сохранённый ответ или None"""
+        try:
+            raw = await get_redis().get(storage_key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"Idempotency store read failed, using memory: {e}")
+            return _fallback_store.get(storage_key)
+
+    @staticmethod
+    async def save(storage_key: str, record: dict) -> None:
+        """Запомнить ответ на IDEMPOTENCY_TTL_SECONDS"""
+        try:
+            await get_redis().set(
+                storage_key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.warning(f"Idempotency store write failed, using memory: {e}")
+            _fallback_store.set(storage_key, record)
+
+    @staticmethod
+    async def _acquire_redis_lock(stack: AsyncExitStack, storage_key: str) -> None:
+        """Блокировка между воркерами; без Redis остаётся только локальная"""
+        try:
+            lock = get_redis().lock(
+                f"{storage_key}:lock",
+                timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+                blocking_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+            )
+            acquired = await lock.acquire()
+        except Exception as e:
+            logger.warning(f"Idempotency lock unavailable, using local lock only: {e}")
+            return
+
+        if not acquired:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        stack.push_async_callback(IdempotencyService._release_redis_lock, lock)
+
+    @staticmethod
+    async def _release_redis_lock(lock) -> None:
+        try:
+            await lock.release()
+        except Exception as e:
+            # Истёк timeout блокировки - её уже нет
+            logger.warning(f"Idempotency lock release failed: {e}")
+
+    @staticmethod
+    async def run(
+        scope: str,
+        key: Optional[str],
+        payload: Any,
+        status_code: int,
+        handler: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Выполнить handler не более одного раза на ключ.
+
+        Без ключа handler просто выполняется. Ошибки (HTTPException и пр.) не
+        запоминаются - повтор с тем же ключом выполнит запрос заново.
+        """
+        if not key:
+            return await handler()
+
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters",
+            )
+
+        storage_key = IdempotencyService.storage_key(scope, key)
+        fingerprint = _fingerprint(payload)
+
+        local_lock = _local_locks.get(storage_key)
+        if local_lock is None:
+            local_lock = _local_locks[storage_key] = asyncio.Lock()
+
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(local_lock)
+            await IdempotencyService._acquire_redis_lock(stack, storage_key)
+
+            record = await IdempotencyService.get(storage_key)
+            if record is not None:
+                if record["fingerprint"] != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used with a different request body",
+                    )
+                return JSONResponse(
+                    status_code=record["status_code"],
+                    content=record["body"],
+                    headers={"Idempotent-Replayed": "true"},
+                )
+
+            body = jsonable_encoder(await handler())
+            await IdempotencyService.save(
+                storage_key,
+                {"fingerprint": fingerprint, "status_code": status_code, "body": body},
+            )
+            return body
@@ -0,0 +1,80 @@
+"""
+Сервис личных рекордов пользователя по упражнениям
+
+Рекорды хранятся в personal_records по ключу (user_id, exercise_id) и только
+растут. Слияние делает SQL-функция merge_personal_records (миграция
+supabase/migrations/*_personal_records.sql) - её же вызывает триггер на
+user_day_workout_exercise_sets, так что правила одинаковы для обоих путей записи.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import Optional, List
+from uuid import UUID
+
+from app.models.tables import personal_records_table
+
+
+class PersonalRecordsService:
+    """Сервис для операций с личными рекордами"""
+
+    @staticmethod
+    async def record_set(
+        session: AsyncSession,
+        user_id: UUID,
+        exercise_id: str,
+        weight: Optional[float],
+        reps: Optional[int],
+    ) -> None:
+        """
+        Учесть подход в рекордах (в транзакции вызывающего кода).
+        """
+        if weight is None or not reps:
+            return
+
+        payload = [
+            {
+                "user_id": str(user_id),
+                "exercise_id": exercise_id,
+                "weight": weight,
+                "reps": reps,
+            }
+        ]
+        await session.execute(
+            select(func.merge_personal_records(literal(payload, JSONB)))
+        )
+
+    @staticmethod
+    async def get_records(
+        session: AsyncSession,
+        user_id: UUID,
+        exercise_id: Optional[str] = None,
+    ) -> List[dict]:
+        """Рекорды пользователя (по первичному ключу, без сканирования истории)"""
+        pr = personal_records_table
+        query = (
+            select(
+                pr.c.exercise_id,
+                pr.c.max_weight,
+                pr.c.max_weight_reps,
+                pr.c.best_e1rm,
+                pr.c.updated_at,
+            )
+            .where(pr.c.user_id == user_id)
+            .order_by(pr.c.exercise_id)
+        )
+        if exercise_id is not None:
+            query = query.where(pr.c.exercise_id == exercise_id)
+
+        result = await session.execute(query)
+        return [
+            {
+                "exercise_id": row.exercise_id,
+                "max_weight": float(row.max_weight),
+                "max_weight_reps": row.max_weight_reps,
+                "best_e1rm": float(row.best_e1rm),
+                "updated_at": row.updated_at,
+            }
+            for row in result.all()
+        ]
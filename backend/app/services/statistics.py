@@ -1,14 +1,42 @@
 """
 Сервис для расчёта статистики тренировок
+
+Результаты кешируются в Redis (см. services/statistics_cache.py).
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from sqlalchemy import select, func, literal
+from datetime import datetime, date as date_type, timedelta
 from typing import Optional, List, Dict
+import math
+
+from app.models.tables import workout_table, exercise_table
+from app.services.daily_stats import DailyStatsService
+from app.services.statistics_cache import StatisticsCache, MISS
+
+
+SERIES_GRANULARITIES = ("day", "week", "month")
+TRENDING_MODES = ("count", "decay")
+DEFAULT_TRENDING_HALF_LIFE_DAYS = 14.0
+MAX_SERIES_BUCKETS = 1000
 
-from app.models.workout import Workout
-from app.models.exercise import Exercise
+
+def _bucket_start(day: date_type, granularity: str) -> date_type:
+    """Начало периода (дня, недели с понедельника, месяца), содержащего day"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket_start(start: date_type, granularity: str) -> date_type:
+    """Начало следующего периода"""
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return date_type(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
 
 
 class StatisticsService:
@@ -21,49 +49,23 @@ class StatisticsService:
         date: datetime,
     ) -> Optional[dict]:
         """Получить статистику за день"""
+        cache_key = StatisticsCache.daily_key(user_id, date.date())
+        cached = await StatisticsCache.get(cache_key)
+        if cached is not MISS:
+            return cached
+
         # Начало и конец дня
         start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1) - timedelta(seconds=1)
 
-        # Получить тренировку за этот день
-        workouts_result = await session.execute(
-            select(Workout).where(
-                (Workout.user_id == user_id)
-                & (Workout.date >= start_of_day)
-                & (Workout.date <= end_of_day)
-                & (Workout.is_deleted == False)
-            )
+        totals = await DailyStatsService.get_period_totals(
+            session, user_id, start_of_day.date(), end_of_day.date()
         )
-        workouts = workouts_result.scalars().all()
-
-        if not workouts:
-            return None
-
-        total_weight = sum(w.total_weight or 0 for w in workouts)
-        total_sets = sum(w.total_sets or 0 for w in workouts)
-        total_exercises = 0
-        total_reps = 0
-
-        # Получить все упражнения за этот день
-        for workout in workouts:
-            exercises_result = await session.execute(
-                select(Exercise).where(
-                    (Exercise.workout_id == workout.id)
-                    & (Exercise.is_deleted == False)
-                )
-            )
-            exercises = exercises_result.scalars().all()
-            total_exercises += len(exercises)
-            total_reps += sum(e.reps or 0 for e in exercises)
 
-        return {
-            "date": date.date(),
-            "workout_count": len(workouts),
-            "total_exercises": total_exercises,
-            "total_weight": total_weight,
-            "total_sets": total_sets,
-            "total_reps": total_reps,
-        }
+        statistics = {"date": date.date(), **totals} if totals["workout_count"] else None
+
+        await StatisticsCache.set(cache_key, statistics)
+        return statistics
 
     @staticmethod
     async def get_weekly_statistics(
@@ -72,49 +74,32 @@ class StatisticsService:
         date: datetime,
     ) -> dict:
         """Получить статистику за неделю"""
+        cache_key = StatisticsCache.weekly_key(user_id, date.date())
+        cached = await StatisticsCache.get(cache_key)
+        if cached is not MISS:
+            return cached
+
         # Понедельник текущей недели
         monday = date - timedelta(days=date.weekday())
         monday = monday.replace(hour=0, minute=0, second=0, microsecond=0)
         # Воскресенье текущей недели
         sunday = monday + timedelta(days=7) - timedelta(seconds=1)
 
-        workouts_result = await session.execute(
-            select(Workout).where(
-                (Workout.user_id == user_id)
-                & (Workout.date >= monday)
-                & (Workout.date <= sunday)
-                & (Workout.is_deleted == False)
-            )
+        totals = await DailyStatsService.get_period_totals(
+            session, user_id, monday.date(), sunday.date()
         )
-        workouts = workouts_result.scalars().all()
-
-        total_weight = sum(w.total_weight or 0 for w in workouts)
-        total_sets = sum(w.total_sets or 0 for w in workouts)
-        total_exercises = 0
-        total_reps = 0
-
-        for workout in workouts:
-            exercises_result = await session.execute(
-                select(Exercise).where(
-                    (Exercise.workout_id == workout.id)
-                    & (Exercise.is_deleted == False)
-                )
-            )
-            exercises = exercises_result.scalars().all()
-            total_exercises += len(exercises)
-            total_reps += sum(e.reps or 0 for e in exercises)
+        workout_count = totals["workout_count"]
 
-        return {
+        statistics = {
             "week_start": monday.date(),
             "week_end": sunday.date(),
-            "workout_count": len(workouts),
-            "total_exercises": total_exercises,
-            "total_weight": total_weight,
-            "total_sets": total_sets,
-            "total_reps": total_reps,
-            "average_weight_per_workout": total_weight / len(workouts) if workouts else 0,
+            **totals,
+            "average_weight_per_workout": totals["total_weight"] / workout_count if workout_count else 0,
         }
 
+        await StatisticsCache.set(cache_key, statistics)
+        return statistics
+
     @staticmethod
     async def get_monthly_statistics(
         session: AsyncSession,
@@ -123,6 +108,11 @@ class StatisticsService:
         month: int,
     ) -> dict:
         """Получить статистику за месяц"""
+        cache_key = StatisticsCache.monthly_key(user_id, year, month)
+        cached = await StatisticsCache.get(cache_key)
+        if cached is not MISS:
+            return cached
+
         # Первый день месяца
         start_date = datetime(year, month, 1)
         # Последний день месяца
@@ -131,42 +121,87 @@ class StatisticsService:
         else:
             end_date = datetime(year, month + 1, 1) - timedelta(seconds=1)
 
-        workouts_result = await session.execute(
-            select(Workout).where(
-                (Workout.user_id == user_id)
-                & (Workout.date >= start_date)
-                & (Workout.date <= end_date)
-                & (Workout.is_deleted == False)
-            )
+        totals = await DailyStatsService.get_period_totals(
+            session, user_id, start_date.date(), end_date.date()
         )
-        workouts = workouts_result.scalars().all()
-
-        total_weight = sum(w.total_weight or 0 for w in workouts)
-        total_sets = sum(w.total_sets or 0 for w in workouts)
-        total_exercises = 0
-        total_reps = 0
-
-        for workout in workouts:
-            exercises_result = await session.execute(
-                select(Exercise).where(
-                    (Exercise.workout_id == workout.id)
-                    & (Exercise.is_deleted == False)
-                )
-            )
-            exercises = exercises_result.scalars().all()
-            total_exercises += len(exercises)
-            total_reps += sum(e.reps or 0 for e in exercises)
+        workout_count = totals["workout_count"]
 
-        return {
+        statistics = {
             "year": year,
             "month": month,
-            "workout_count": len(workouts),
-            "total_exercises": total_exercises,
-            "total_weight": total_weight,
-            "total_sets": total_sets,
-            "total_reps": total_reps,
-            "average_weight_per_workout": total_weight / len(workouts) if workouts else 0,
-            "average_exercises_per_workout": total_exercises / len(workouts) if workouts else 0,
+            **totals,
+            "average_weight_per_workout": totals["total_weight"] / workout_count if workout_count else 0,
+            "average_exercises_per_workout": totals["total_exercises"] / workout_count if workout_count else 0,
+        }
+
+        await StatisticsCache.set(cache_key, statistics)
+        return statistics
+
+    @staticmethod
+    def count_series_buckets(start: date_type, end: date_type, granularity: str) -> int:
+        """Сколько периодов попадёт в ряд [start, end]"""
+        first = _bucket_start(start, granularity)
+        last = _bucket_start(end, granularity)
+        if granularity == "week":
+            return (last - first).days // 7 + 1
+        if granularity == "month":
+            return (last.year - first.year) * 12 + last.month - first.month + 1
+        return (last - first).days + 1
+
+    @staticmethod
+    async def get_series(
+        session: AsyncSession,
+        user_id: int,
+        start: date_type,
+        end: date_type,
+        granularity: str = "day",
+    ) -> dict:
+        """
+        Получить ряд итогов по периодам за [start, end].
+
+        Дневные итоги читаются одним запросом и раскладываются по периодам за
+        один проход; периоды без тренировок заполняются нулями. Границы
+        первого и последнего периода обрезаются по [start, end], такие
+        неполные периоды помечены partial.
+        """
+        rows = await DailyStatsService.get_daily_rows(session, user_id, start, end)
+
+        buckets = []
+        bucket_start = _bucket_start(start, granularity)
+        row_index = 0
+
+        while bucket_start <= end:
+            next_start = _next_bucket_start(bucket_start, granularity)
+            period_start = max(bucket_start, start)
+            period_end = min(next_start - timedelta(days=1), end)
+            bucket = {
+                "period_start": period_start,
+                "period_end": period_end,
+                "partial": period_start != bucket_start or period_end != next_start - timedelta(days=1),
+                "workout_count": 0,
+                "total_exercises": 0,
+                "total_weight": 0,
+                "total_sets": 0,
+                "total_reps": 0,
+            }
+
+            while row_index < len(rows) and rows[row_index].day < next_start:
+                row = rows[row_index]
+                bucket["workout_count"] += row.workout_count
+                bucket["total_exercises"] += row.exercise_count
+                bucket["total_weight"] += row.total_weight
+                bucket["total_sets"] += row.total_sets
+                bucket["total_reps"] += row.total_reps
+                row_index += 1
+
+            buckets.append(bucket)
+            bucket_start = next_start
+
+        return {
+            "start": start,
+            "end": end,
+            "granularity": granularity,
+            "buckets": buckets,
         }
 
     @staticmethod
@@ -175,35 +210,42 @@ class StatisticsService:
         user_id: int,
         exercise_id: str,
         days: int = 30,
+        include_series: bool = False,
     ) -> dict:
-        """Получить статистику по конкретному упражнению за период"""
+        """
+        Получить статистику по конкретному упражнению за период.
+
+        Один запрос по истории пользователя (индексы workout(user_id, date) и
+        exercise(exercise_id, workout_id)); с include_series в ответ добавляется
+        ряд по сессиям: дата, вес, подходы, повторения.
+        """
+        cache_key = StatisticsCache.exercise_key(user_id, exercise_id)
+        cache_field = f"days={days}:series={int(include_series)}"
+        cached = await StatisticsCache.get(cache_key, cache_field)
+        if cached is not MISS:
+            return cached
+
         # Дата начала периода
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        exercises_result = await session.execute(
-            select(Exercise).where(
-                (Exercise.exercise_id == exercise_id)
-                & (Exercise.is_deleted == False)
+        w = workout_table
+        e = exercise_table
+        history_result = await session.execute(
+            select(w.c.date, e.c.weight, e.c.sets, e.c.reps)
+            .select_from(e.join(w, w.c.id == e.c.workout_id))
+            .where(
+                (w.c.user_id == user_id)
+                & (w.c.date >= start_date)
+                & (w.c.is_deleted == False)
+                & (e.c.exercise_id == exercise_id)
+                & (e.c.is_deleted == False)
             )
+            .order_by(w.c.date, e.c.order)
         )
-        exercises = exercises_result.scalars().all()
-
-        # Фильтруем по пользователю и дате
-        user_exercises = []
-        for exercise in exercises:
-            workout_result = await session.execute(
-                select(Workout).where(
-                    (Workout.id == exercise.workout_id)
-                    & (Workout.user_id == user_id)
-                    & (Workout.date >= start_date)
-                )
-            )
-            workout = workout_result.scalar_one_or_none()
-            if workout:
-                user_exercises.append(exercise)
+        history = history_result.all()
 
-        if not user_exercises:
-            return {
+        if not history:
+            statistics = {
                 "exercise_id": exercise_id,
                 "total_sessions": 0,
                 "total_weight": 0,
@@ -212,60 +254,97 @@ class StatisticsService:
                 "max_weight": None,
                 "average_weight": 0,
             }
+        else:
+            total_weight = sum(h.weight or 0 for h in history)
+            total_sets = sum(h.sets or 0 for h in history)
+            total_reps = sum(h.reps or 0 for h in history)
+            max_weight = max((h.weight or 0 for h in history), default=0)
+
+            statistics = {
+                "exercise_id": exercise_id,
+                "total_sessions": len(history),
+                "total_weight": total_weight,
+                "total_sets": total_sets,
+                "total_reps": total_reps,
+                "max_weight": max_weight if max_weight > 0 else None,
+                "average_weight": total_weight / len(history),
+            }
 
-        total_weight = sum(e.weight or 0 for e in user_exercises)
-        total_sets = sum(e.sets or 0 for e in user_exercises)
-        total_reps = sum(e.reps or 0 for e in user_exercises)
-        max_weight = max((e.weight or 0 for e in user_exercises), default=0)
+        if include_series:
+            statistics["series"] = [
+                {
+                    "date": h.date,
+                    "weight": h.weight,
+                    "sets": h.sets,
+                    "reps": h.reps,
+                }
+                for h in history
+            ]
 
-        return {
-            "exercise_id": exercise_id,
-            "total_sessions": len(user_exercises),
-            "total_weight": total_weight,
-            "total_sets": total_sets,
-            "total_reps": total_reps,
-            "max_weight": max_weight if max_weight > 0 else None,
-            "average_weight": total_weight / len(user_exercises) if user_exercises else 0,
-        }
+        await StatisticsCache.set(cache_key, statistics, cache_field)
+        return statistics
 
     @staticmethod
     async def get_trending_exercises(
         session: AsyncSession,
         user_id: int,
         limit: int = 10,
+        mode: str = "count",
+        window_days: Optional[int] = None,
+        half_life_days: float = DEFAULT_TRENDING_HALF_LIFE_DAYS,
     ) -> List[dict]:
-        """Получить топ упражнений по количеству сессий"""
-        workouts_result = await session.execute(
-            select(Workout).where(
-                (Workout.user_id == user_id) & (Workout.is_deleted == False)
-            )
-        )
-        workouts = workouts_result.scalars().all()
-        workout_ids = [w.id for w in workouts]
-
-        if not workout_ids:
-            return []
-
-        # Подсчитать упражнения
-        exercise_counts = {}
-        for workout_id in workout_ids:
-            exercises_result = await session.execute(
-                select(Exercise).where(
-                    (Exercise.workout_id == workout_id)
-                    & (Exercise.is_deleted == False)
-                )
+        """
+        Получить топ упражнений пользователя одним запросом (top-k в БД).
+
+        mode="count" - по количеству сессий, mode="decay" - по сумме весов
+        exp(-ln2 * возраст / half_life_days), т.е. недавние тренировки важнее.
+        window_days ограничивает историю последними N днями.
+        """
+        cache_key = StatisticsCache.trending_key(user_id)
+        cache_field = f"limit={limit}:mode={mode}:window={window_days}:half_life={half_life_days}"
+        cached = await StatisticsCache.get(cache_key, cache_field)
+        if cached is not MISS:
+            return cached
+
+        now = datetime.utcnow()
+        w = workout_table
+        e = exercise_table
+
+        session_count = func.count(e.c.id).label("session_count")
+        columns = [e.c.exercise_id, session_count]
+        order_by = [session_count.desc()]
+
+        if mode == "decay":
+            age_days = func.extract("epoch", literal(now) - w.c.date) / 86400.0
+            score = func.sum(
+                func.exp(-math.log(2) * age_days / half_life_days)
+            ).label("score")
+            columns.append(score)
+            order_by = [score.desc(), session_count.desc()]
+
+        query = (
+            select(*columns)
+            .select_from(e.join(w, w.c.id == e.c.workout_id))
+            .where(
+                (w.c.user_id == user_id)
+                & (w.c.is_deleted == False)
+                & (e.c.is_deleted == False)
             )
-            exercises = exercises_result.scalars().all()
-            for exercise in exercises:
-                exercise_counts[exercise.exercise_id] = (
-                    exercise_counts.get(exercise.exercise_id, 0) + 1
-                )
-
-        # Отсортировать и вернуть топ
-        sorted_exercises = sorted(
-            exercise_counts.items(), key=lambda x: x[1], reverse=True
+            .group_by(e.c.exercise_id)
+            .order_by(*order_by, e.c.exercise_id)
+            .limit(limit)
         )
-        return [
-            {"exercise_id": ex_id, "session_count": count}
-            for ex_id, count in sorted_exercises[:limit]
-        ]
+        if window_days is not None:
+            query = query.where(w.c.date >= now - timedelta(days=window_days))
+
+        result = await session.execute(query)
+
+        trending = []
+        for row in result.all():
+            item = {"exercise_id": row.exercise_id, "session_count": row.session_count}
+            if mode == "decay":
+                item["score"] = round(float(row.score), 4)
+            trending.append(item)
+
+        await StatisticsCache.set(cache_key, trending, cache_field)
+        return trending
@@ -0,0 +1,150 @@
+"""
+Кеш результатов StatisticsService в Redis
+
+Ключи (user_id - строка):
+- stats:{user_id}:daily:{YYYY-MM-DD}
+- stats:{user_id}:weekly:{понедельник YYYY-MM-DD}
+- stats:{user_id}:monthly:{YYYY-MM}
+- stats:{user_id}:exercise:{exercise_id} - hash, поле = параметры запроса
+- stats:{user_id}:trending - hash, поле = параметры запроса
+
+Сервисы записи помечают затронутые дни и упражнения в session.info через
+mark_dirty(), а маршрут после commit() вызывает flush() - так кеш
+сбрасывается только для изменённых периодов и только после фиксации данных.
+Ошибки Redis не ломают запросы: чтение считается промахом.
+"""
+
+import json
+import logging
+from datetime import date, timedelta
+from typing import Any, Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Маркер промаха: None - допустимое закешированное значение (день без тренировок)
+MISS = object()
+
+DIRTY_DAYS_KEY = "stats_dirty_days"
+DIRTY_EXERCISES_KEY = "stats_dirty_exercises"
+
+
+class StatisticsCache:
+    """Операции с кешем статистики"""
+
+    @staticmethod
+    def daily_key(user_id: Any, day: date) -> str:
+        return f"stats:{user_id}:daily:{day.isoformat()}"
+
+    @staticmethod
+    def weekly_key(user_id: Any, day: date) -> str:
+        monday = day - timedelta(days=day.weekday())
+        return f"stats:{user_id}:weekly:{monday.isoformat()}"
+
+    @staticmethod
+    def monthly_key(user_id: Any, year: int, month: int) -> str:
+        return f"stats:{user_id}:monthly:{year:04d}-{month:02d}"
+
+    @staticmethod
+    def exercise_key(user_id: Any, exercise_id: str) -> str:
+        return f"stats:{user_id}:exercise:{exercise_id}"
+
+    @staticmethod
+    def trending_key(user_id: Any) -> str:
+        return f"stats:{user_id}:trending"
+
+    @staticmethod
+    async def get(key: str, field: Optional[str] = None) -> Any:
+        """Прочитать значение (один GET/HGET), MISS если нет или Redis недоступен"""
+        try:
+            redis = get_redis()
+            raw = await (redis.hget(key, field) if field else redis.get(key))
+        except Exception as e:
+            logger.warning(f"Statistics cache read failed: {e}")
+            return MISS
+
+        if raw is None:
+            return MISS
+        return json.loads(raw)
+
+    @staticmethod
+    async def set(key: str, value: Any, field: Optional[str] = None) -> None:
+        """Записать значение с TTL"""
+        try:
+            raw = json.dumps(jsonable_encoder(value))
+            redis = get_redis()
+            if field:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(key, field, raw)
+                    pipe.expire(key, settings.STATS_CACHE_TTL_SECONDS)
+                    await pipe.execute()
+            else:
+                await redis.set(key, raw, ex=settings.STATS_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Statistics cache write failed: {e}")
+
+    @staticmethod
+    async def invalidate(
+        user_id: Any,
+        days: Iterable[date] = (),
+        exercise_ids: Iterable[str] = (),
+    ) -> None:
+        """
+        Удалить записи, зависящие от изменённых дней и упражнений.
+
+        Любое изменение меняет и топ упражнений пользователя, поэтому
+        trending сбрасывается всегда.
+        """
+        keys = {StatisticsCache.trending_key(user_id)}
+        for day in days:
+            keys.add(StatisticsCache.daily_key(user_id, day))
+            keys.add(StatisticsCache.weekly_key(user_id, day))
+            keys.add(StatisticsCache.monthly_key(user_id, day.year, day.month))
+        for exercise_id in exercise_ids:
+            keys.add(StatisticsCache.exercise_key(user_id, exercise_id))
+
+        try:
+            await get_redis().delete(*keys)
+        except Exception as e:
+            logger.warning(f"Statistics cache invalidation failed: {e}")
+
+    @staticmethod
+    def mark_dirty(
+        session: AsyncSession,
+        user_id: Any,
+        day: Optional[date] = None,
+        exercise_id: Optional[str] = None,
+    ) -> None:
+        """Запомнить затронутый день/упражнение до commit()"""
+        if day is not None:
+            session.info.setdefault(DIRTY_DAYS_KEY, set()).add((str(user_id), day))
+        if exercise_id is not None:
+            session.info.setdefault(DIRTY_EXERCISES_KEY, set()).add(
+                (str(user_id), exercise_id)
+            )
+
+    @staticmethod
+    async def flush(session: AsyncSession) -> None:
+        """Сбросить кеш для всего, что помечено в сессии (вызывать после commit)"""
+        dirty_days = session.info.pop(DIRTY_DAYS_KEY, set())
+        dirty_exercises = session.info.pop(DIRTY_EXERCISES_KEY, set())
+
+        by_user: dict = {}
+        for user_id, day in dirty_days:
+            by_user.setdefault(user_id, (set(), set()))[0].add(day)
+        for user_id, exercise_id in dirty_exercises:
+            by_user.setdefault(user_id, (set(), set()))[1].add(exercise_id)
+
+        for user_id, (days, exercise_ids) in by_user.items():
+            await StatisticsCache.invalidate(user_id, days, exercise_ids)
+
+    @staticmethod
+    def discard(session: AsyncSession) -> None:
+        """Забыть пометки (после rollback)"""
+        session.info.pop(DIRTY_DAYS_KEY, None)
+        session.info.pop(DIRTY_EXERCISES_KEY, None)
@@ -0,0 +1,37 @@
+"""
+Supabase Statistics Service - set-level statistics computed in Postgres
+The aggregation runs in the user_set_statistics() SQL function and is
+called through PostgREST RPC, so one HTTP round trip returns everything
+"""
+
+from typing import Optional, Dict, Any
+from datetime import date
+import logging
+
+from app.services.supabase_workouts import SupabaseWorkoutService
+
+logger = logging.getLogger(__name__)
+
+
+class SupabaseStatisticsService:
+    """Service for reading statistics of the Supabase workout data"""
+
+    @staticmethod
+    async def get_set_statistics(
+        user_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Totals, per-exercise maxima and per-day volume for a period.
+        Open-ended when start/end are omitted.
+        """
+        return await SupabaseWorkoutService._make_request(
+            "POST",
+            "rpc/user_set_statistics",
+            data={
+                "p_user_id": user_id,
+                "p_start": start.isoformat() if start else None,
+                "p_end": end.isoformat() if end else None,
+            }
+        )
@@ -3,12 +3,13 @@ Supabase Users Service - Backend wrapper for user operations
 Uses REST API directly with httpx for better control and compatibility
 """
 
-import httpx
 from typing import Optional, Dict, Any
 import logging
 from datetime import datetime
 import os
 
+from app.core.http import get_supabase_client
+
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -38,26 +39,26 @@ class SupabaseUserService:
                 "Prefer": "return=representation"
             }
 
-            async with httpx.AsyncClient(timeout=30) as client:
-                if method == "GET":
-                    response = await client.get(url, headers=headers, params=params)
-                elif method == "POST":
-                    response = await client.post(url, headers=headers, json=data)
-                elif method == "PUT":
-                    response = await client.put(url, headers=headers, json=data)
-                elif method == "DELETE":
-                    response = await client.delete(url, headers=headers)
-                else:
-                    raise ValueError(f"Unsupported method: {method}")
-
-                if response.status_code >= 400:
-                    logger.error(f"Supabase REST API error: {response.status_code} - {response.text}")
-                    return None
-
-                if response.status_code == 204:  # No content
-                    return {"success": True}
-
-                return response.json() if response.text else None
+            client = get_supabase_client()
+            if method == "GET":
+                response = await client.get(url, headers=headers, params=params)
+            elif method == "POST":
+                response = await client.post(url, headers=headers, json=data)
+            elif method == "PUT":
+                response = await client.put(url, headers=headers, json=data)
+            elif method == "DELETE":
+                response = await client.delete(url, headers=headers)
+            else:
+                raise ValueError(f"Unsupported method: {method}")
+
+            if response.status_code >= 400:
+                logger.error(f"Supabase REST API error: {response.status_code} - {response.text}")
+                return None
+
+            if response.status_code == 204:  # No content
+                return {"success": True}
+
+            return response.json() if response.text else None
 
         except Exception as e:
             logger.error(f"Error making Supabase REST API request: {e}")
@@ -3,12 +3,17 @@ Supabase Workouts Service - Backend wrapper for Supabase operations
 Uses REST API directly with httpx for better control and compatibility
 """
 
-import httpx
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union, Iterable, Tuple
 import logging
 from datetime import datetime
 import os
+import hashlib
 import json
+import uuid
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.http import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +24,114 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "sb_secret_N7
 # REST API endpoints
 REST_API_BASE = f"{SUPABASE_URL}/rest/v1"
 
+# directus_id → exercises row; the table only changes with the catalog
+exercise_cache = TTLCache(settings.EXERCISE_CACHE_MAX_SIZE, settings.EXERCISE_CACHE_TTL_SECONDS)
+
+
+def _quote_in(values: List[str]) -> str:
+    """Build a PostgREST in.(...) filter value"""
+    return "in.(" + ",".join(json.dumps(value) for value in values) + ")"
+
+
+def _same_set(stored: Dict[str, Any], incoming: Any) -> bool:
+    """Compare a stored set row with an incoming set (weight is DECIMAL(10, 2))"""
+    return (
+        stored["reps"] == incoming.reps
+        and round(float(stored["weight"]), 2) == round(float(incoming.weight), 2)
+    )
+
+
+def workout_content_hash(exercises: Iterable[Tuple[str, Iterable[Tuple[int, Any]]]]) -> str:
+    """
+    Canonical hash of a session's content: (directus_id, [(reps, weight)])
+    per exercise, sets in set order. Exercise order is ignored, like in
+    plan_exercise_changes; weight is normalized to DECIMAL(10, 2).
+    """
+    canonical = sorted(
+        [directus_id or "", [[int(reps), f"{float(weight):.2f}"] for reps, weight in sets]]
+        for directus_id, sets in exercises
+    )
+    return hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+
+
+def request_content_hash(exercises: List[Any]) -> str:
+    """workout_content_hash of incoming exercises (ExerciseWithSetsRequest)"""
+    return workout_content_hash(
+        (exercise.exercise_id, ((set_data.reps, set_data.weight) for set_data in exercise.sets))
+        for exercise in exercises
+    )
+
+
+def plan_exercise_changes(
+    existing: List[Dict[str, Any]],
+    incoming: List[Any]
+) -> Dict[str, Any]:
+    """
+    Diff incoming exercises/sets against stored rows.
+
+    Exercises are matched by Directus ID in order of appearance (the n-th
+    incoming "bench" matches the n-th stored one); sets are matched by
+    set_order. Returns the minimal set of row operations:
+    - new_exercises: incoming exercises without a stored counterpart
+    - delete_exercise_ids: stored exercises no longer present (sets cascade)
+    - upsert_sets: changed or added sets of matched exercises
+    - delete_set_ids: stored sets beyond the new set count
+    - changed_exercise_ids: Directus IDs touched by any of the above
+    """
+    stored_by_directus_id: Dict[str, List[Dict[str, Any]]] = {}
+    for row in existing:
+        directus_id = (row.get("exercises") or {}).get("directus_id")
+        stored_by_directus_id.setdefault(directus_id, []).append(row)
+
+    new_exercises = []
+    upsert_sets = []
+    delete_set_ids = []
+    changed = set()
+
+    for exercise_data in incoming:
+        candidates = stored_by_directus_id.get(exercise_data.exercise_id)
+        if not candidates:
+            new_exercises.append(exercise_data)
+            changed.add(exercise_data.exercise_id)
+            continue
+
+        stored = candidates.pop(0)
+        stored_sets = {
+            row["set_order"]: row
+            for row in stored.get("user_day_workout_exercise_sets") or []
+        }
+
+        for set_order, set_data in enumerate(exercise_data.sets, start=1):
+            stored_set = stored_sets.pop(set_order, None)
+            if stored_set is not None and _same_set(stored_set, set_data):
+                continue
+            upsert_sets.append({
+                "id": stored_set["id"] if stored_set else str(uuid.uuid4()),
+                "user_day_workout_exercise_id": stored["id"],
+                "reps": set_data.reps,
+                "weight": float(set_data.weight),
+                "set_order": set_order
+            })
+            changed.add(exercise_data.exercise_id)
+
+        if stored_sets:
+            delete_set_ids.extend(row["id"] for row in stored_sets.values())
+            changed.add(exercise_data.exercise_id)
+
+    delete_exercise_ids = []
+    for directus_id, rows in stored_by_directus_id.items():
+        for row in rows:
+            delete_exercise_ids.append(row["id"])
+            changed.add(directus_id)
+
+    return {
+        "new_exercises": new_exercises,
+        "delete_exercise_ids": delete_exercise_ids,
+        "upsert_sets": upsert_sets,
+        "delete_set_ids": delete_set_ids,
+        "changed_exercise_ids": [ex_id for ex_id in changed if ex_id],
+    }
+
 
 class SupabaseWorkoutService:
     """Service for managing workouts via Supabase REST API"""
@@ -27,38 +140,44 @@ class SupabaseWorkoutService:
     async def _make_request(
         method: str,
         endpoint: str,
-        data: Optional[Dict[str, Any]] = None,
-        params: Optional[Dict[str, Any]] = None
+        data: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        prefer: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
-        """Make a request to Supabase REST API"""
+        """
+        Make a request to Supabase REST API (a list body is a bulk insert).
+        `prefer` adds PostgREST preferences, e.g. resolution=merge-duplicates for upserts.
+        """
         try:
             url = f"{REST_API_BASE}/{endpoint}"
             headers = {
                 "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
                 "Content-Type": "application/json",
-                "Prefer": "return=representation"
+                "Prefer": f"return=representation,{prefer}" if prefer else "return=representation"
             }
 
-            async with httpx.AsyncClient(timeout=30) as client:
-                if method == "GET":
-                    response = await client.get(url, headers=headers, params=params)
-                elif method == "POST":
-                    response = await client.post(url, headers=headers, json=data)
-                elif method == "PUT":
-                    response = await client.put(url, headers=headers, json=data)
-                elif method == "DELETE":
-                    response = await client.delete(url, headers=headers, params=params)
-                else:
-                    raise ValueError(f"Unsupported method: {method}")
+            client = get_supabase_client()
+            if method == "GET":
+                response = await client.get(url, headers=headers, params=params)
+            elif method == "POST":
+                response = await client.post(url, headers=headers, json=data)
+            elif method == "PUT":
+                response = await client.put(url, headers=headers, json=data)
+            elif method == "PATCH":
+                response = await client.patch(url, headers=headers, params=params, json=data)
+            elif method == "DELETE":
+                response = await client.delete(url, headers=headers, params=params)
+            else:
+                raise ValueError(f"Unsupported method: {method}")
 
-                if response.status_code >= 400:
-                    logger.error(f"Supabase REST API error: {response.status_code} - {response.text}")
-                    return None
+            if response.status_code >= 400:
+                logger.error(f"Supabase REST API error: {response.status_code} - {response.text}")
+                return None
 
-                if response.status_code == 204:  # No content
-                    return {"success": True}
+            if response.status_code == 204:  # No content
+                return {"success": True}
 
-                return response.json() if response.text else None
+            return response.json() if response.text else None
 
         except Exception as e:
             logger.error(f"Error making Supabase REST API request: {e}")
@@ -148,22 +267,199 @@ class SupabaseWorkoutService:
             raise
 
     @staticmethod
-    async def get_exercise_by_directus_id(directus_id: str) -> Optional[Dict[str, Any]]:
-        """Get exercise by Directus ID"""
+    async def save_workout_session(
+        user_id: str,
+        user_day_id: str,
+        exercises: List[Dict[str, Any]],
+        started_at: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        request_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a session with all its exercises and sets in one RPC call.
+        The save_workout_session() SQL function runs in a single transaction,
+        so a failure leaves nothing behind. content_hash is stored when every
+        exercise was resolved. A repeated request_key creates nothing and
+        returns the session saved under it (replayed: true). Returns
+        session_id, date, exercises_count, sets_count and missing_exercise_ids.
+        """
+        try:
+            result = await SupabaseWorkoutService._make_request(
+                "POST",
+                "rpc/save_workout_session",
+                data={
+                    "p_session": {
+                        "user_id": user_id,
+                        "user_day_id": user_day_id,
+                        "started_at": started_at,
+                        "exercises": exercises,
+                        "content_hash": content_hash,
+                        "request_key": request_key
+                    }
+                }
+            )
+
+            if not result or not isinstance(result, dict) or "session_id" not in result:
+                raise RuntimeError("Failed to save workout session: invalid response format")
+
+            logger.info(f"Workout session saved: {result['session_id']}")
+            return result
+        except Exception as e:
+            logger.error(f"Error saving workout session: {e}")
+            raise
+
+    @staticmethod
+    async def get_workout_session(workout_session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a workout session with the date of its user day and content hash.
+        Returns None for an unknown session and raises if the request failed.
+        """
+        result = await SupabaseWorkoutService._make_request(
+            "GET",
+            "user_day_workouts",
+            params={
+                "id": f"eq.{workout_session_id}",
+                "select": "id,user_id,user_day_id,started_at,content_hash,user_days(date)"
+            }
+        )
+
+        if result is None:
+            raise RuntimeError("Failed to load workout session")
+        if isinstance(result, list) and len(result) > 0:
+            return result[0]
+        return None
+
+    @staticmethod
+    async def get_workout_session_tree(workout_session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a session with its exercises (incl. catalog name/category) and
+        sets in one request using PostgREST embedded selects.
+        Exercises are ordered by creation, sets by set_order. content_hash is
+        computed from the loaded rows, so it is set even when the stored one
+        was cleared.
+        """
+        result = await SupabaseWorkoutService._make_request(
+            "GET",
+            "user_day_workouts",
+            params={
+                "id": f"eq.{workout_session_id}",
+                "select": "id,user_id,user_day_id,started_at,created_at,updated_at,user_days(date),"
+                          "user_day_workout_exercises(id,user_day_workout_id,exercise_id,created_at,updated_at,"
+                          "exercises(id,directus_id,name,category),"
+                          "user_day_workout_exercise_sets(id,user_day_workout_exercise_id,reps,weight,set_order,created_at,updated_at))",
+                "user_day_workout_exercises.order": "created_at,id",
+                "user_day_workout_exercises.user_day_workout_exercise_sets.order": "set_order"
+            }
+        )
+
+        if result is None:
+            raise RuntimeError("Failed to load workout session")
+        if not isinstance(result, list) or not result:
+            return None
+
+        row = result[0]
+        exercises = []
+        for exercise in row.get("user_day_workout_exercises") or []:
+            catalog = exercise.get("exercises") or {}
+            if catalog.get("directus_id"):
+                # Rows seen here are cheap to keep for directus_id resolution
+                exercise_cache.set(catalog["directus_id"], catalog)
+
+            exercises.append({
+                "id": exercise["id"],
+                "user_day_workout_id": exercise["user_day_workout_id"],
+                "exercise_id": exercise["exercise_id"],
+                "created_at": exercise["created_at"],
+                "updated_at": exercise["updated_at"],
+                "directus_id": catalog.get("directus_id"),
+                "name": catalog.get("name"),
+                "category": catalog.get("category"),
+                "sets": exercise.get("user_day_workout_exercise_sets") or []
+            })
+
+        return {
+            "id": row["id"],
+            "user_id": row["user_id"],
+            "user_day_id": row["user_day_id"],
+            "date": (row.get("user_days") or {}).get("date"),
+            "started_at": row["started_at"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "content_hash": workout_content_hash(
+                (exercise["directus_id"], ((s["reps"], s["weight"]) for s in exercise["sets"]))
+                for exercise in exercises
+            ),
+            "exercises": exercises
+        }
+
+    @staticmethod
+    async def get_workout_content_hash(workout_session_id: str) -> Optional[str]:
+        """Stored content hash of a session (primary key lookup); None if cleared"""
+        result = await SupabaseWorkoutService._make_request(
+            "GET",
+            "user_day_workouts",
+            params={
+                "id": f"eq.{workout_session_id}",
+                "select": "content_hash"
+            }
+        )
+
+        if result is None:
+            raise RuntimeError("Failed to load workout content hash")
+        return result[0]["content_hash"] if isinstance(result, list) and result else None
+
+    @staticmethod
+    async def get_user_day(user_day_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user day by ID"""
         try:
             result = await SupabaseWorkoutService._make_request(
                 "GET",
-                "exercises",
-                params={"directus_id": f"eq.{directus_id}"}
+                "user_days",
+                params={"id": f"eq.{user_day_id}", "select": "id,user_id,date"}
             )
 
             if result and isinstance(result, list) and len(result) > 0:
                 return result[0]
             return None
         except Exception as e:
-            logger.error(f"Error getting exercise by directus_id: {e}")
+            logger.error(f"Error getting user day: {e}")
             return None
 
+    @staticmethod
+    async def get_exercise_by_directus_id(directus_id: str) -> Optional[Dict[str, Any]]:
+        """Get exercise by Directus ID (served from the resolution cache when possible)"""
+        exercises = await SupabaseWorkoutService.get_exercises_by_directus_ids([directus_id])
+        return exercises.get(directus_id)
+
+    @staticmethod
+    async def get_exercises_by_directus_ids(directus_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve several Directus IDs to exercise rows, keyed by directus_id.
+        Cached rows cost no request; all misses are fetched in one
+        directus_id=in.(...) query and cached. Unknown IDs are not cached.
+        """
+        unique_ids = list(dict.fromkeys(directus_ids))
+        found = exercise_cache.get_many(unique_ids)
+        missing = [directus_id for directus_id in unique_ids if directus_id not in found]
+        if not missing:
+            return found
+
+        try:
+            result = await SupabaseWorkoutService._make_request(
+                "GET",
+                "exercises",
+                params={"directus_id": _quote_in(missing)}
+            )
+
+            if result and isinstance(result, list):
+                for exercise in result:
+                    exercise_cache.set(exercise["directus_id"], exercise)
+                    found[exercise["directus_id"]] = exercise
+            return found
+        except Exception as e:
+            logger.error(f"Error getting exercises by directus_ids: {e}")
+            return found
+
     @staticmethod
     async def create_workout_exercise(
         workout_session_id: str,
@@ -221,27 +517,211 @@ class SupabaseWorkoutService:
             raise
 
     @staticmethod
-    async def delete_workout_exercise(exercise_id: str) -> bool:
-        """Delete an exercise from a workout session"""
+    async def create_workout_exercises_with_sets(
+        workout_session_id: str,
+        exercises: List[Any]
+    ) -> int:
+        """
+        Create exercises and their sets in a constant number of requests.
+
+        One GET resolves all Directus IDs, one array POST inserts the workout
+        exercises and a second array POST inserts every set. Exercises whose
+        Directus ID is unknown are skipped. Returns the number of sets created.
+        """
         try:
-            # Check if exercise exists
-            result = await SupabaseWorkoutService._make_request(
-                "GET",
+            catalog = await SupabaseWorkoutService.get_exercises_by_directus_ids(
+                [exercise_data.exercise_id for exercise_data in exercises]
+            )
+
+            known_exercises = []
+            for exercise_data in exercises:
+                if exercise_data.exercise_id in catalog:
+                    known_exercises.append(exercise_data)
+                else:
+                    logger.warning(f"Exercise not found: {exercise_data.exercise_id}")
+
+            if not known_exercises:
+                return 0
+
+            workout_exercises = await SupabaseWorkoutService._make_request(
+                "POST",
                 "user_day_workout_exercises",
-                params={"id": f"eq.{exercise_id}"}
+                data=[
+                    {
+                        "user_day_workout_id": workout_session_id,
+                        "exercise_id": catalog[exercise_data.exercise_id]["id"]
+                    }
+                    for exercise_data in known_exercises
+                ]
             )
 
-            if not result or (isinstance(result, list) and len(result) == 0):
-                logger.warning(f"Exercise not found: {exercise_id}")
-                return False
+            if not isinstance(workout_exercises, list) or len(workout_exercises) != len(known_exercises):
+                raise RuntimeError("Failed to create workout exercises: invalid response format")
+
+            # PostgREST returns inserted rows in the order of the request body
+            sets = [
+                {
+                    "user_day_workout_exercise_id": workout_exercise["id"],
+                    "reps": set_data.reps,
+                    "weight": float(set_data.weight),
+                    "set_order": set_index
+                }
+                for workout_exercise, exercise_data in zip(workout_exercises, known_exercises)
+                for set_index, set_data in enumerate(exercise_data.sets, start=1)
+            ]
+
+            if not sets:
+                return 0
+
+            created_sets = await SupabaseWorkoutService._make_request(
+                "POST",
+                "user_day_workout_exercise_sets",
+                data=sets
+            )
+
+            if not isinstance(created_sets, list):
+                raise RuntimeError("Failed to create exercise sets: invalid response format")
+
+            logger.info(f"Created {len(workout_exercises)} workout exercises and {len(created_sets)} sets")
+            return len(created_sets)
+        except Exception as e:
+            logger.error(f"Error creating workout exercises with sets: {e}")
+            raise
+
+    @staticmethod
+    async def get_workout_exercises_with_sets(workout_session_id: str) -> List[Dict[str, Any]]:
+        """Get the exercises of a session with their Directus IDs and sets in one request"""
+        result = await SupabaseWorkoutService._make_request(
+            "GET",
+            "user_day_workout_exercises",
+            params={
+                "user_day_workout_id": f"eq.{workout_session_id}",
+                "select": "id,exercise_id,exercises(directus_id),"
+                          "user_day_workout_exercise_sets(id,reps,weight,set_order)",
+                "order": "created_at,id"
+            }
+        )
+
+        if result is None:
+            raise RuntimeError("Failed to load workout exercises")
+        return result if isinstance(result, list) else []
 
-            # Delete the exercise
-            await SupabaseWorkoutService._make_request(
-                "DELETE",
+    @staticmethod
+    async def reconcile_workout_exercises(
+        workout_session_id: str,
+        exercises: List[Any],
+        content_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Bring the stored exercises/sets of a session in line with `exercises`
+        touching only rows that differ.
+
+        At most: one GET of the current state, one bulk insert path for new
+        exercises, one upsert for changed/added sets and one filtered DELETE
+        each for removed sets and removed exercises; then one PATCH storing
+        content_hash once the rows match it. Any failed step raises, and the
+        hash is only stored after every write succeeded. Returns the
+        operation counts, the resulting sets_count and changed_exercise_ids.
+        """
+        try:
+            existing = await SupabaseWorkoutService.get_workout_exercises_with_sets(workout_session_id)
+            plan = plan_exercise_changes(existing, exercises)
+
+            # Every step raises on failure, so the hash below is only stored
+            # once all row operations have gone through
+            if plan["delete_exercise_ids"]:
+                await SupabaseWorkoutService._delete_rows(
+                    "user_day_workout_exercises",
+                    {"id": _quote_in(plan["delete_exercise_ids"])}
+                )
+
+            if plan["delete_set_ids"]:
+                await SupabaseWorkoutService._delete_rows(
+                    "user_day_workout_exercise_sets",
+                    {"id": _quote_in(plan["delete_set_ids"])}
+                )
+
+            if plan["upsert_sets"]:
+                upserted = await SupabaseWorkoutService._make_request(
+                    "POST",
+                    "user_day_workout_exercise_sets",
+                    data=plan["upsert_sets"],
+                    prefer="resolution=merge-duplicates"
+                )
+                if not isinstance(upserted, list):
+                    raise RuntimeError("Failed to upsert exercise sets: invalid response format")
+
+            # Sets of matched exercises now mirror the request exactly
+            sets_count = sum(len(ex.sets) for ex in exercises) - sum(
+                len(ex.sets) for ex in plan["new_exercises"]
+            )
+            if plan["new_exercises"]:
+                sets_count += await SupabaseWorkoutService.create_workout_exercises_with_sets(
+                    workout_session_id,
+                    plan["new_exercises"]
+                )
+
+            # Unknown Directus IDs are skipped: the rows then differ from the hash.
+            # The writes above cleared the stored hash (triggers); if this PATCH
+            # fails it stays NULL and the next update diffs the rows again
+            if content_hash and sets_count == sum(len(ex.sets) for ex in exercises):
+                updated = await SupabaseWorkoutService._make_request(
+                    "PATCH",
+                    "user_day_workouts",
+                    data={"content_hash": content_hash},
+                    params={"id": f"eq.{workout_session_id}", "select": "id"}
+                )
+                if not isinstance(updated, list) or len(updated) != 1:
+                    raise RuntimeError("Failed to store workout content hash")
+
+            logger.info(f"Workout exercises reconciled: {workout_session_id}", {
+                "exercises_inserted": len(plan["new_exercises"]),
+                "exercises_deleted": len(plan["delete_exercise_ids"]),
+                "sets_upserted": len(plan["upsert_sets"]),
+                "sets_deleted": len(plan["delete_set_ids"])
+            })
+
+            return {
+                "exercises_inserted": len(plan["new_exercises"]),
+                "exercises_deleted": len(plan["delete_exercise_ids"]),
+                "sets_upserted": len(plan["upsert_sets"]),
+                "sets_deleted": len(plan["delete_set_ids"]),
+                "sets_count": sets_count,
+                "changed_exercise_ids": plan["changed_exercise_ids"],
+            }
+        except Exception as e:
+            logger.error(f"Error reconciling workout exercises: {e}")
+            raise
+
+    @staticmethod
+    async def _delete_rows(endpoint: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Single filtered DELETE; return=representation reports the deleted rows,
+        so existence is checked without a preceding GET
+        """
+        result = await SupabaseWorkoutService._make_request(
+            "DELETE",
+            endpoint,
+            params={**params, "select": "id"}
+        )
+
+        if result is None:
+            raise RuntimeError(f"Failed to delete from {endpoint}")
+        return result if isinstance(result, list) else []
+
+    @staticmethod
+    async def delete_workout_exercise(exercise_id: str) -> bool:
+        """Delete an exercise from a workout session (sets cascade)"""
+        try:
+            deleted = await SupabaseWorkoutService._delete_rows(
                 "user_day_workout_exercises",
-                params={"id": f"eq.{exercise_id}"}
+                {"id": f"eq.{exercise_id}"}
             )
 
+            if not deleted:
+                logger.warning(f"Exercise not found: {exercise_id}")
+                return False
+
             logger.info(f"Workout exercise deleted: {exercise_id}")
             return True
         except Exception as e:
@@ -250,29 +730,14 @@ class SupabaseWorkoutService:
 
     @staticmethod
     async def delete_all_workout_exercises(workout_session_id: str) -> bool:
-        """Delete all exercises from a workout session"""
+        """Delete all exercises from a workout session in one request (sets cascade)"""
         try:
-            # Get all exercises first
-            exercises = await SupabaseWorkoutService._make_request(
-                "GET",
+            deleted = await SupabaseWorkoutService._delete_rows(
                 "user_day_workout_exercises",
-                params={"user_day_workout_id": f"eq.{workout_session_id}", "select": "id"}
+                {"user_day_workout_id": f"eq.{workout_session_id}"}
             )
 
-            if not exercises or (isinstance(exercises, list) and len(exercises) == 0):
-                logger.info(f"No exercises to delete for workout session: {workout_session_id}")
-                return True
-
-            # Delete each exercise
-            if isinstance(exercises, list):
-                for exercise in exercises:
-                    await SupabaseWorkoutService._make_request(
-                        "DELETE",
-                        "user_day_workout_exercises",
-                        params={"id": f"eq.{exercise['id']}"}
-                    )
-
-            logger.info(f"All exercises deleted for workout session: {workout_session_id}")
+            logger.info(f"Deleted {len(deleted)} exercises for workout session: {workout_session_id}")
             return True
         except Exception as e:
             logger.error(f"Error deleting all workout exercises: {e}")
@@ -280,18 +745,20 @@ class SupabaseWorkoutService:
 
     @staticmethod
     async def delete_workout_session(workout_session_id: str) -> bool:
-        """Delete a workout session (including all exercises and sets)"""
+        """
+        Delete a workout session in one request.
+        Exercises and sets go with it via ON DELETE CASCADE.
+        """
         try:
-            # Delete all exercises first (cascade will handle sets)
-            await SupabaseWorkoutService.delete_all_workout_exercises(workout_session_id)
-
-            # Delete the workout session itself
-            await SupabaseWorkoutService._make_request(
-                "DELETE",
+            deleted = await SupabaseWorkoutService._delete_rows(
                 "user_day_workouts",
-                params={"id": f"eq.{workout_session_id}"}
+                {"id": f"eq.{workout_session_id}"}
             )
 
+            if not deleted:
+                logger.warning(f"Workout session not found: {workout_session_id}")
+                return False
+
             logger.info(f"Workout session deleted: {workout_session_id}")
             return True
         except Exception as e:
@@ -9,6 +9,9 @@ from typing import Optional, List
 
 from app.models.workout import Workout
 from app.models.exercise import Exercise
+from app.models.tables import exercise_table
+from app.services.daily_stats import DailyStatsService
+from app.services.statistics_cache import StatisticsCache
 
 
 class WorkoutService:
@@ -33,6 +36,10 @@ class WorkoutService:
         )
         session.add(workout)
         await session.flush()
+
+        await DailyStatsService.apply_workout(
+            session, user_id, date, total_weight, total_sets
+        )
         return workout
 
     @staticmethod
@@ -98,6 +105,10 @@ class WorkoutService:
         if not workout or workout.user_id != user_id:
             return None
 
+        old_date = workout.date
+        old_total_weight = workout.total_weight
+        old_total_sets = workout.total_sets
+
         if date is not None:
             workout.date = date
         if total_weight is not None:
@@ -109,6 +120,38 @@ class WorkoutService:
 
         workout.updated_at = datetime.utcnow()
         await session.flush()
+
+        # Перенести вклад тренировки в дневные итоги
+        if workout.date.date() != old_date.date():
+            exercise_totals = await DailyStatsService.get_workout_exercise_totals(
+                session, workout_id
+            )
+            await DailyStatsService.apply_workout(
+                session, user_id, old_date, old_total_weight, old_total_sets,
+                sign=-1, **exercise_totals,
+            )
+            await DailyStatsService.apply_workout(
+                session, user_id, workout.date, workout.total_weight, workout.total_sets,
+                **exercise_totals,
+            )
+
+            # Статистика упражнений считается по дате тренировки
+            exercise_ids = await session.execute(
+                select(exercise_table.c.exercise_id).where(
+                    (exercise_table.c.workout_id == workout_id)
+                    & (exercise_table.c.is_deleted == False)
+                )
+            )
+            for exercise_id in exercise_ids.scalars().all():
+                StatisticsCache.mark_dirty(session, user_id, exercise_id=exercise_id)
+        else:
+            await DailyStatsService.apply_delta(
+                session,
+                user_id,
+                workout.date.date(),
+                total_weight=(workout.total_weight or 0) - (old_total_weight or 0),
+                total_sets=(workout.total_sets or 0) - (old_total_sets or 0),
+            )
         return workout
 
     @staticmethod
@@ -123,6 +166,14 @@ class WorkoutService:
         if not workout or workout.user_id != user_id:
             return False
 
+        exercise_totals = await DailyStatsService.get_workout_exercise_totals(
+            session, workout_id
+        )
+        await DailyStatsService.apply_workout(
+            session, user_id, workout.date, workout.total_weight, workout.total_sets,
+            sign=-1, **exercise_totals,
+        )
+
         workout.is_deleted = True
         workout.updated_at = datetime.utcnow()
 
@@ -132,6 +183,7 @@ class WorkoutService:
         )
         for exercise in exercises.scalars().all():
             exercise.is_deleted = True
+            StatisticsCache.mark_dirty(session, user_id, exercise_id=exercise.exercise_id)
 
         await session.flush()
         return True
@@ -0,0 +1,156 @@
+"""
+Workout Export Service - streams a user's full training history
+
+Rows are read from the Supabase tables with a server-side cursor
+(AsyncConnection.stream + yield_per), so memory stays bounded by one batch
+no matter how long the history is. Output is produced chunk by chunk for a
+StreamingResponse:
+- CSV: one line per set
+- NDJSON: one JSON object per workout with its exercises and sets
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.database import engine
+from app.models.tables import (
+    user_days_table,
+    user_day_workouts_table,
+    user_day_workout_exercises_table,
+    user_day_workout_exercise_sets_table,
+    catalog_exercises_table,
+)
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_BATCH_SIZE = 1000
+
+CSV_COLUMNS = [
+    "date",
+    "workout_id",
+    "started_at",
+    "exercise_id",
+    "exercise_name",
+    "set_order",
+    "reps",
+    "weight",
+]
+
+
+def _history_query(user_id: UUID):
+    """Workouts → exercises → sets of one user, in chronological order"""
+    d = user_days_table
+    w = user_day_workouts_table
+    we = user_day_workout_exercises_table
+    s = user_day_workout_exercise_sets_table
+    e = catalog_exercises_table
+
+    return (
+        select(
+            d.c.date,
+            w.c.id.label("workout_id"),
+            w.c.started_at,
+            we.c.id.label("workout_exercise_id"),
+            e.c.directus_id.label("exercise_id"),
+            e.c.name.label("exercise_name"),
+            s.c.set_order,
+            s.c.reps,
+            s.c.weight,
+        )
+        .select_from(
+            w.join(d, d.c.id == w.c.user_day_id)
+            .join(we, we.c.user_day_workout_id == w.c.id)
+            .join(e, e.c.id == we.c.exercise_id)
+            .join(s, s.c.user_day_workout_exercise_id == we.c.id)
+        )
+        .where(w.c.user_id == user_id)
+        .order_by(d.c.date, w.c.started_at, w.c.id, we.c.created_at, we.c.id, s.c.set_order)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+class WorkoutExportService:
+    """Service for streaming workout history exports"""
+
+    @staticmethod
+    async def _iter_batches(user_id: UUID) -> AsyncIterator[list]:
+        """Yield history rows in batches from a server-side cursor"""
+        async with engine.connect() as conn:
+            result = await conn.stream(_history_query(user_id))
+            async for batch in result.partitions():
+                yield batch
+
+    @staticmethod
+    async def iter_csv(user_id: UUID) -> AsyncIterator[str]:
+        """CSV export, one line per set; the header is sent before the query runs"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(CSV_COLUMNS)
+        yield buffer.getvalue()
+
+        async for batch in WorkoutExportService._iter_batches(user_id):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                (
+                    row.date.isoformat(),
+                    row.workout_id,
+                    row.started_at.isoformat() if row.started_at else "",
+                    row.exercise_id,
+                    row.exercise_name,
+                    row.set_order,
+                    row.reps,
+                    row.weight,
+                )
+                for row in batch
+            )
+            yield buffer.getvalue()
+
+    @staticmethod
+    async def iter_ndjson(user_id: UUID) -> AsyncIterator[str]:
+        """
+        NDJSON export, one line per workout.
+
+        Rows arrive ordered by workout, so only the workout being assembled
+        is kept in memory; it is emitted as soon as the next one starts.
+        """
+        workout: Optional[dict] = None
+
+        async for batch in WorkoutExportService._iter_batches(user_id):
+            lines = []
+            for row in batch:
+                if workout is None or workout["id"] != str(row.workout_id):
+                    if workout is not None:
+                        lines.append(json.dumps(workout, ensure_ascii=False))
+                    workout = {
+                        "id": str(row.workout_id),
+                        "date": row.date.isoformat(),
+                        "started_at": row.started_at.isoformat() if row.started_at else None,
+                        "exercises": [],
+                    }
+
+                exercises = workout["exercises"]
+                if not exercises or exercises[-1]["id"] != str(row.workout_exercise_id):
+                    exercises.append({
+                        "id": str(row.workout_exercise_id),
+                        "exercise_id": row.exercise_id,
+                        "name": row.exercise_name,
+                        "sets": [],
+                    })
+
+                exercises[-1]["sets"].append({
+                    "set_order": row.set_order,
+                    "reps": row.reps,
+                    "weight": row.weight,
+                })
+
+            if lines:
+                yield "\n".join(lines) + "\n"
+
+        if workout is not None:
+            yield json.dumps(workout, ensure_ascii=False) + "\n"
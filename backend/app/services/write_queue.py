@@ -0,0 +1,372 @@
+"""
+Очередь отложенной записи тренировок (write-behind) на Redis Streams
+
+В асинхронном режиме запрос валидируется, добавляется в стрим
+`workout_writes` и сразу подтверждается ответом 202 с job id. Воркеры
+(корутины, запускаются в lifespan) читают стрим через consumer group по
+WRITE_QUEUE_BATCH_SIZE записей за обращение к Redis; каждая задача
+применяется отдельным вызовом зарегистрированного обработчика.
+
+- Состояние задачи хранится в хеше `workout_job:{job_id}` (queued →
+  processing → done | failed) и живёт WRITE_QUEUE_JOB_TTL_SECONDS.
+- Обработчик получает payload и job id. Задача может выполниться повторно
+  (таймаут или падение воркера после записи, но до XACK), поэтому запись
+  в обработчике должна быть идемпотентной по job id.
+- Упавшая задача остаётся в pending группы и через
+  WRITE_QUEUE_RETRY_DELAY_SECONDS забирается повторно (XAUTOCLAIM), всего
+  не больше WRITE_QUEUE_MAX_ATTEMPTS попыток. Так же подбираются записи
+  упавшего воркера. Пока задача выполняется, её держит lease-ключ на
+  WRITE_QUEUE_JOB_TIMEOUT_SECONDS: второй воркер её не возьмёт.
+- HTTPException с кодом 4xx из обработчика — ошибка без повторов.
+- Задачи с одинаковым order_key (обновления одной сессии) выполняются по
+  одной и в порядке стрима: их держит lock-ключ `workout_write_order:{key}`,
+  а ID последней применённой записи хранится рядом. Задача старше уже
+  применённой не выполняется (superseded) — более новый снимок её заменил.
+  Задача, чей ключ занят другим воркером, остаётся в pending и забирается
+  повторно через WRITE_QUEUE_RETRY_DELAY_SECONDS.
+- Выполненные и проваленные записи подтверждаются и удаляются из стрима,
+  поэтому длина стрима равна глубине очереди.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "workout_writes"
+GROUP_NAME = "workout_writers"
+JOB_KEY_PREFIX = "workout_job:"
+ORDER_KEY_PREFIX = "workout_write_order:"
+
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_SUPERSEDED = "superseded"
+
+TERMINAL_STATUSES = (JOB_DONE, JOB_FAILED, JOB_SUPERSEDED)
+
+Handler = Callable[[Dict[str, Any], str], Awaitable[Any]]
+
+_handlers: Dict[str, Handler] = {}
+_worker_tasks: List[asyncio.Task] = []
+
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_KEY_PREFIX}{job_id}"
+
+
+def _lease_key(job_id: str) -> str:
+    return f"{JOB_KEY_PREFIX}{job_id}:lease"
+
+
+def _order_lock_key(order_key: str) -> str:
+    return f"{ORDER_KEY_PREFIX}{order_key}:lock"
+
+
+def _order_applied_key(order_key: str) -> str:
+    return f"{ORDER_KEY_PREFIX}{order_key}:applied"
+
+
+def _entry_seq(entry_id: str) -> Tuple[int, int]:
+    """ID записи стрима (ms-seq) как сравнимая пара"""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _group_by_order_key(batch: list) -> List[list]:
+    """
+    Разбить пачку на цепочки: записи с общим order_key — одна цепочка в
+    порядке стрима, записи без ключа — каждая отдельно
+    """
+    chains: Dict[str, list] = {}
+    singles = []
+    for entry_id, fields in batch:
+        order_key = fields.get("order_key")
+        if order_key:
+            chains.setdefault(order_key, []).append((entry_id, fields))
+        else:
+            singles.append([(entry_id, fields)])
+    return list(chains.values()) + singles
+
+
+class WriteQueueService:
+    """Постановка записей тренировок в очередь и воркеры очереди"""
+
+    @staticmethod
+    def register_handler(kind: str, handler: Handler) -> None:
+        """Зарегистрировать корутину handler(payload, job_id), применяющую задачи данного типа"""
+        _handlers[kind] = handler
+
+    @staticmethod
+    async def enqueue(kind: str, payload: Dict[str, Any], order_key: Optional[str] = None) -> str:
+        """
+        Поставить запись в очередь и вернуть job id.
+        Записи с одним order_key применяются по одной в порядке постановки.
+        """
+        if kind not in _handlers:
+            raise ValueError(f"Unknown write kind: {kind}")
+
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        redis = get_redis()
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_job_key(job_id), mapping={
+                "status": JOB_QUEUED,
+                "kind": kind,
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now,
+            })
+            pipe.expire(_job_key(job_id), settings.WRITE_QUEUE_JOB_TTL_SECONDS)
+            pipe.xadd(
+                STREAM_KEY,
+                {
+                    "job_id": job_id,
+                    "kind": kind,
+                    "payload": json.dumps(payload),
+                    "order_key": order_key or "",
+                    "enqueued_at": now,
+                },
+            )
+            await pipe.execute()
+
+        logger.info(f"Workout write queued: {job_id} ({kind})")
+        return job_id
+
+    @staticmethod
+    async def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+        """Состояние задачи для эндпоинта статуса"""
+        job = await get_redis().hgetall(_job_key(job_id))
+        if not job:
+            return None
+
+        return {
+            "job_id": job_id,
+            "kind": job.get("kind"),
+            "status": job.get("status"),
+            "attempts": int(job.get("attempts", 0)),
+            "result": json.loads(job["result"]) if job.get("result") else None,
+            "error": job.get("error"),
+            "created_at": float(job["created_at"]),
+            "updated_at": float(job["updated_at"]),
+        }
+
+    @staticmethod
+    async def get_metrics() -> Dict[str, Any]:
+        """Глубина очереди, pending записи и возраст самой старой задачи"""
+        redis = get_redis()
+        await WriteQueueService._ensure_group()
+
+        depth = await redis.xlen(STREAM_KEY)
+        pending = await redis.xpending(STREAM_KEY, GROUP_NAME)
+        oldest = await redis.xrange(STREAM_KEY, count=1)
+        groups = await redis.xinfo_groups(STREAM_KEY)
+        group = next((g for g in groups if g.get("name") == GROUP_NAME), {})
+
+        oldest_age = None
+        if oldest:
+            _, fields = oldest[0]
+            oldest_age = round(time.time() - float(fields["enqueued_at"]), 3)
+
+        return {
+            "depth": depth,
+            "pending": pending.get("pending", 0),
+            "undelivered": group.get("lag"),
+            "consumers": group.get("consumers", 0),
+            "oldest_job_age_seconds": oldest_age,
+            "workers_in_process": sum(1 for task in _worker_tasks if not task.done()),
+        }
+
+    @staticmethod
+    async def _ensure_group() -> None:
+        try:
+            await get_redis().xgroup_create(STREAM_KEY, GROUP_NAME, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    @staticmethod
+    async def _update_job(job_id: str, **fields) -> None:
+        await get_redis().hset(_job_key(job_id), mapping={**fields, "updated_at": time.time()})
+
+    @staticmethod
+    async def _finish(entry_id: str, job_id: str, applied_order_key: Optional[str] = None, **fields) -> None:
+        """
+        Записать итог задачи и удалить запись из стрима.
+        applied_order_key — запомнить запись как последнюю применённую по ключу.
+        """
+        redis = get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_job_key(job_id), mapping={**fields, "updated_at": time.time()})
+            if applied_order_key:
+                pipe.set(
+                    _order_applied_key(applied_order_key),
+                    entry_id,
+                    ex=settings.WRITE_QUEUE_JOB_TTL_SECONDS,
+                )
+            pipe.xack(STREAM_KEY, GROUP_NAME, entry_id)
+            pipe.xdel(STREAM_KEY, entry_id)
+            await pipe.execute()
+
+    @staticmethod
+    async def _process(entry_id: str, fields: Dict[str, str]) -> None:
+        """Выполнить одну задачу; при ошибке запись остаётся в pending до повтора"""
+        job_id = fields["job_id"]
+        redis = get_redis()
+
+        order_key = fields.get("order_key")
+
+        # Задачу уже выполняет другой воркер
+        if not await redis.set(
+            _lease_key(job_id), "1", nx=True, ex=settings.WRITE_QUEUE_JOB_TIMEOUT_SECONDS
+        ):
+            return
+
+        try:
+            # Ключ занят задачей другого воркера: эта останется в pending
+            if order_key and not await redis.set(
+                _order_lock_key(order_key), job_id, nx=True, ex=settings.WRITE_QUEUE_JOB_TIMEOUT_SECONDS
+            ):
+                return
+
+            try:
+                await WriteQueueService._run_job(entry_id, job_id, fields)
+            finally:
+                if order_key:
+                    await redis.delete(_order_lock_key(order_key))
+        finally:
+            await redis.delete(_lease_key(job_id))
+
+    @staticmethod
+    async def _run_job(entry_id: str, job_id: str, fields: Dict[str, str]) -> None:
+        redis = get_redis()
+        order_key = fields.get("order_key")
+
+        # Повторная доставка уже завершённой задачи
+        if await redis.hget(_job_key(job_id), "status") in TERMINAL_STATUSES:
+            await redis.xack(STREAM_KEY, GROUP_NAME, entry_id)
+            return
+
+        # По ключу уже применена более новая запись
+        if order_key:
+            applied = await redis.get(_order_applied_key(order_key))
+            if applied and _entry_seq(applied) >= _entry_seq(entry_id):
+                await WriteQueueService._finish(entry_id, job_id, status=JOB_SUPERSEDED, error="")
+                logger.info(f"Workout write superseded by a newer one: {job_id}")
+                return
+
+        attempts = await redis.hincrby(_job_key(job_id), "attempts", 1)
+        await WriteQueueService._update_job(job_id, status=JOB_PROCESSING)
+
+        try:
+            handler = _handlers[fields["kind"]]
+            result = await asyncio.wait_for(
+                handler(json.loads(fields["payload"]), job_id),
+                timeout=settings.WRITE_QUEUE_JOB_TIMEOUT_SECONDS,
+            )
+            await WriteQueueService._finish(
+                entry_id,
+                job_id,
+                applied_order_key=order_key,
+                status=JOB_DONE,
+                result=json.dumps(result),
+                error="",
+            )
+            logger.info(f"Workout write applied: {job_id}")
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e) or type(e).__name__
+            permanent = isinstance(e, HTTPException) and e.status_code < 500
+
+            if permanent or attempts >= settings.WRITE_QUEUE_MAX_ATTEMPTS:
+                await WriteQueueService._finish(entry_id, job_id, status=JOB_FAILED, error=str(error))
+                logger.error(f"Workout write failed permanently: {job_id}: {error}")
+            else:
+                # Без XACK: запись заберётся повторно после задержки
+                await WriteQueueService._update_job(job_id, status=JOB_QUEUED, error=str(error))
+                logger.warning(f"Workout write failed (attempt {attempts}), will retry: {job_id}: {error}")
+
+    @staticmethod
+    async def _read_batch(consumer: str) -> list:
+        """Сначала зависшие pending записи (повторы, упавшие воркеры), затем новые"""
+        redis = get_redis()
+        _, claimed, *_ = await redis.xautoclaim(
+            STREAM_KEY,
+            GROUP_NAME,
+            consumer,
+            min_idle_time=settings.WRITE_QUEUE_RETRY_DELAY_SECONDS * 1000,
+            start_id="0-0",
+            count=settings.WRITE_QUEUE_BATCH_SIZE,
+        )
+        # Удалённые из стрима pending записи возвращаются без полей
+        claimed = [(entry_id, fields) for entry_id, fields in claimed if fields]
+        if claimed:
+            return claimed
+
+        response = await redis.xreadgroup(
+            GROUP_NAME,
+            consumer,
+            {STREAM_KEY: ">"},
+            count=settings.WRITE_QUEUE_BATCH_SIZE,
+            block=1000,
+        )
+        return response[0][1] if response else []
+
+    @staticmethod
+    async def _process_chain(chain: list) -> None:
+        """Записи одного order_key — строго по очереди"""
+        for entry_id, fields in chain:
+            await WriteQueueService._process(entry_id, fields)
+
+    @staticmethod
+    async def run_worker(consumer: str) -> None:
+        """
+        Цикл воркера: прочитать пачку, выполнить задачи (разные order_key —
+        параллельно, один ключ — по порядку), повторить
+        """
+        logger.info(f"Workout write worker started: {consumer}")
+        while True:
+            try:
+                await WriteQueueService._ensure_group()
+                batch = await WriteQueueService._read_batch(consumer)
+                if batch:
+                    await asyncio.gather(
+                        *(WriteQueueService._process_chain(chain) for chain in _group_by_order_key(batch))
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Workout write worker error: {e}")
+                await asyncio.sleep(1)
+
+
+def start_write_workers() -> None:
+    """Запустить воркеры очереди в этом процессе (вызывается из lifespan)"""
+    if not settings.WRITE_QUEUE_ENABLED:
+        return
+
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    for index in range(settings.WRITE_QUEUE_WORKERS):
+        _worker_tasks.append(
+            asyncio.create_task(WriteQueueService.run_worker(f"{prefix}-{index}"))
+        )
+
+
+async def stop_write_workers() -> None:
+    """Остановить воркеры; незавершённые записи остаются в pending и будут подобраны позже"""
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
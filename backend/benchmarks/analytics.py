@@ -0,0 +1,165 @@
+"""
+Бенчмарк: векторная аналитика (NumPy) против циклов Python
+
+Запуск из папки backend:
+    python -m benchmarks.analytics
+
+Генерирует синтетическую историю подходов за 5 лет (~100 тыс. подходов) и
+сравнивает AnalyticsService с наивным построчным расчётом тех же метрик.
+База данных не нужна: история собирается через SetHistory.from_columns.
+"""
+
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+# Настройки приложения обязательны при импорте сервисов
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.analytics import AnalyticsService, SetHistory
+
+YEARS = 5
+WORKOUTS_PER_WEEK = 5
+EXERCISES = [f"ex-{i}" for i in range(40)]
+EXERCISES_PER_WORKOUT = 15
+SETS_PER_EXERCISE = 5
+REPEATS = 5
+
+
+def generate_history() -> tuple:
+    """Синтетическая история: дни, упражнения, веса, повторения"""
+    rng = random.Random(42)
+    start = date(2020, 1, 6)
+    days, exercise_ids, weights, reps = [], [], [], []
+
+    for week in range(YEARS * 52):
+        for workout in range(WORKOUTS_PER_WEEK):
+            day = start + timedelta(weeks=week, days=workout)
+            for exercise_id in rng.sample(EXERCISES, EXERCISES_PER_WORKOUT):
+                base = 40 + week * 0.1
+                for _ in range(SETS_PER_EXERCISE):
+                    days.append(day)
+                    exercise_ids.append(exercise_id)
+                    weights.append(round(base + rng.uniform(-10, 20), 1))
+                    reps.append(rng.randint(1, 12))
+
+    order = sorted(range(len(days)), key=days.__getitem__)
+    return tuple([column[i] for i in order] for column in (days, exercise_ids, weights, reps))
+
+
+def e1rm(weight: float, rep_count: int) -> float:
+    return weight if rep_count <= 1 else weight * (1 + rep_count / 30)
+
+
+def loop_best_one_rep_max(rows) -> dict:
+    best = defaultdict(float)
+    for _, exercise_id, weight, rep_count in rows:
+        best[exercise_id] = max(best[exercise_id], e1rm(weight, rep_count))
+    return best
+
+
+def loop_weekly_tonnage(rows) -> dict:
+    tonnage = defaultdict(float)
+    for day, _, weight, rep_count in rows:
+        tonnage[day - timedelta(days=day.weekday())] += weight * rep_count
+    return tonnage
+
+
+def loop_intensity_distribution(rows) -> list:
+    best = loop_best_one_rep_max(rows)
+    bounds = [0.6, 0.7, 0.8, 0.9]
+    counts = [0] * (len(bounds) + 1)
+    for _, exercise_id, weight, _ in rows:
+        relative = weight / best[exercise_id]
+        counts[sum(relative >= bound for bound in bounds)] += 1
+    return counts
+
+
+def loop_training_load(rows, days: int = 90) -> list:
+    daily = defaultdict(float)
+    for day, _, weight, rep_count in rows:
+        daily[day] += weight * rep_count
+    last = rows[-1][0]
+    series = []
+    for offset in range(days - 1, -1, -1):
+        day = last - timedelta(days=offset)
+        acute = sum(daily.get(day - timedelta(days=i), 0.0) for i in range(7)) / 7
+        chronic = sum(daily.get(day - timedelta(days=i), 0.0) for i in range(28)) / 28
+        series.append(acute / chronic if chronic else None)
+    return series
+
+
+def measure(fn, *args) -> float:
+    """Лучшее время из REPEATS запусков, мс"""
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    columns = generate_history()
+    rows = list(zip(*columns))
+    history = SetHistory.from_columns(*columns)
+    print(f"sets: {len(history)}, days: {len(set(columns[0]))}")
+
+    # Сверка результатов векторного и построчного расчёта
+    vector_best = {
+        item["exercise_id"]: item["best_e1rm"]
+        for item in AnalyticsService.best_one_rep_max(history)
+    }
+    loop_best = loop_best_one_rep_max(rows)
+    assert all(abs(vector_best[k] - round(v, 2)) < 0.01 for k, v in loop_best.items())
+
+    vector_tonnage = sum(w["tonnage"] for w in AnalyticsService.weekly_tonnage(history))
+    assert abs(vector_tonnage - sum(loop_weekly_tonnage(rows).values())) < 1
+
+    vector_zones = [z["sets"] for z in AnalyticsService.intensity_distribution(history)]
+    assert vector_zones == loop_intensity_distribution(rows)
+
+    cases = [
+        ("build arrays", lambda: SetHistory.from_columns(*columns), None),
+        (
+            "best e1RM",
+            lambda: AnalyticsService.best_one_rep_max(history),
+            lambda: loop_best_one_rep_max(rows),
+        ),
+        (
+            "e1RM progression",
+            lambda: AnalyticsService.one_rep_max_progression(history.for_exercise("ex-0")),
+            None,
+        ),
+        (
+            "weekly tonnage",
+            lambda: AnalyticsService.weekly_tonnage(history),
+            lambda: loop_weekly_tonnage(rows),
+        ),
+        (
+            "intensity",
+            lambda: AnalyticsService.intensity_distribution(history),
+            lambda: loop_intensity_distribution(rows),
+        ),
+        (
+            "ACWR (90 days)",
+            lambda: AnalyticsService.training_load(history, days=90),
+            lambda: loop_training_load(rows, days=90),
+        ),
+    ]
+
+    print(f"{'metric':>18} {'numpy, ms':>10} {'loops, ms':>10} {'speedup':>8}")
+    for name, vector_fn, loop_fn in cases:
+        vector_ms = measure(vector_fn)
+        if loop_fn is None:
+            print(f"{name:>18} {vector_ms:>10.2f} {'-':>10} {'-':>8}")
+            continue
+        loop_ms = measure(loop_fn)
+        print(f"{name:>18} {vector_ms:>10.2f} {loop_ms:>10.2f} {loop_ms / vector_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
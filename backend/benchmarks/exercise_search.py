@@ -0,0 +1,82 @@
+"""
+Бенчмарк: локальный поисковый индекс упражнений
+
+Запуск из папки backend:
+    python -m benchmarks.exercise_search
+
+Строит ExerciseSearchIndex по синтетическому каталогу (названия из
+сочетаний слов, русские и английские) и измеряет время ответа на запросы
+в режиме typeahead: каждый префикс запроса по мере набора, плюс запросы с
+опечатками. Для сравнения — линейный поиск подстроки по всем названиям
+(то, что делает _icontains, но без сети).
+"""
+
+import os
+import random
+import statistics
+import time
+
+# Настройки приложения обязательны при импорте сервисов
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.exercise_search import ExerciseSearchIndex
+
+CATALOG_SIZE = 1500
+MOVEMENTS = ["Жим", "Тяга", "Приседания", "Выпады", "Разведение", "Сгибание", "Разгибание",
+             "Подъём", "Bench press", "Row", "Squat", "Lunge", "Curl", "Extension", "Raise"]
+EQUIPMENT = ["штанги", "гантелей", "гири", "в тренажёре", "на блоке", "в смите",
+             "barbell", "dumbbell", "cable", "machine", "kettlebell"]
+VARIANTS = ["лёжа", "сидя", "стоя", "на наклонной скамье", "узким хватом", "широким хватом",
+            "одной рукой", "incline", "decline", "seated", "standing", "single arm"]
+QUERIES = ["жим штанги лежа", "тяга гантелей", "bench press incline", "приседания в смите",
+           "curl dumbbell", "разведение гантелей сидя"]
+TYPO_QUERIES = ["жым штанги", "присидания", "dumbel curl", "разгибане на блоке"]
+
+
+def generate_catalog() -> list:
+    rng = random.Random(42)
+    names = set()
+    while len(names) < CATALOG_SIZE:
+        names.add(f"{rng.choice(MOVEMENTS)} {rng.choice(EQUIPMENT)} {rng.choice(VARIANTS)}")
+    return [{"id": i, "name": name} for i, name in enumerate(sorted(names))]
+
+
+def timings(search, queries, repeats: int = 20) -> list:
+    """Время каждого запроса в микросекундах"""
+    result = []
+    for _ in range(repeats):
+        for query in queries:
+            started = time.perf_counter()
+            search(query)
+            result.append((time.perf_counter() - started) * 1e6)
+    return result
+
+
+def report(label: str, values: list) -> None:
+    values = sorted(values)
+    p99 = values[int(len(values) * 0.99) - 1]
+    print(f"{label:<28} {statistics.mean(values):>10.1f} {values[len(values) // 2]:>10.1f} {p99:>10.1f}")
+
+
+def main() -> None:
+    catalog = generate_catalog()
+
+    started = time.perf_counter()
+    index = ExerciseSearchIndex(catalog)
+    print(f"index build: {len(index)} exercises in {(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+    keystrokes = [query[:length] for query in QUERIES for length in range(1, len(query) + 1)]
+
+    def linear_scan(query: str) -> list:
+        needle = query.lower()
+        return [exercise for exercise in catalog if needle in exercise["name"].lower()][:50]
+
+    print(f"{'queries, µs':<28} {'mean':>10} {'median':>10} {'p99':>10}")
+    report("index, typeahead prefixes", timings(index.search, keystrokes))
+    report("index, typos", timings(index.search, TYPO_QUERIES))
+    report("linear substring scan", timings(linear_scan, keystrokes))
+
+
+if __name__ == "__main__":
+    main()
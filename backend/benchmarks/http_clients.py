@@ -0,0 +1,102 @@
+"""
+Бенчмарк: клиент httpx на каждый запрос против общего пула соединений
+
+Запуск из папки backend:
+    python -m benchmarks.http_clients
+
+Поднимает локальный upstream (uvicorn на 127.0.0.1) с JSON ответом и
+делает одинаковое число запросов с заданной конкурентностью:
+- "per-call": новый httpx.AsyncClient на каждый запрос (как было раньше)
+- "pooled": общий клиент из app.core.http (keep-alive соединения)
+Выводит запросы в секунду. Без TLS выигрыш меньше, чем в проде: там
+каждое новое соединение дополнительно платит TLS handshake.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+
+# Настройки приложения обязательны при импорте модулей app
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx
+import uvicorn
+
+from app.core.http import get_supabase_client, close_http_clients
+
+REQUESTS = 2000
+CONCURRENCY = [1, 10, 50]
+
+
+async def upstream(scope, receive, send):
+    """Минимальный ASGI upstream: короткий JSON ответ"""
+    if scope["type"] != "http":
+        return
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": b'[{"id": 1}]'})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def per_call_request(url: str) -> None:
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.get(url)
+        response.json()
+
+
+async def pooled_request(url: str) -> None:
+    response = await get_supabase_client().get(url)
+    response.json()
+
+
+async def run(request_fn, url: str, concurrency: int) -> float:
+    """Запросов в секунду при заданной конкурентности"""
+    remaining = REQUESTS
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await request_fn(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return REQUESTS / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(upstream, host="127.0.0.1", port=port, log_level="error", access_log=False)
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    url = f"http://127.0.0.1:{port}/rest/v1/exercises"
+    print(f"{'concurrency':>12} {'per-call, rps':>14} {'pooled, rps':>12} {'speedup':>8}")
+    try:
+        for concurrency in CONCURRENCY:
+            per_call = await run(per_call_request, url, concurrency)
+            pooled = await run(pooled_request, url, concurrency)
+            print(f"{concurrency:>12} {per_call:>14.0f} {pooled:>12.0f} {pooled / per_call:>7.1f}x")
+    finally:
+        await close_http_clients()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main())
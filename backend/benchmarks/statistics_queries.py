@@ -0,0 +1,141 @@
+"""
+Бенчмарк: количество SQL-запросов StatisticsService в зависимости от числа тренировок
+
+Запуск из папки backend:
+    python -m benchmarks.statistics_queries
+
+Использует in-memory SQLite (aiosqlite), поэтому Postgres не нужен.
+Для сравнения рядом считается прежний подход (запрос тренировок + по запросу
+упражнений на каждую тренировку). Статистика читается из user_daily_stats,
+которые после заполнения пересчитываются DailyStatsService.rebuild_for_users.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Настройки приложения обязательны при импорте сервисов
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("STATISTICS_DAILY_ROLLUPS_ENABLED", "true")
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.tables import metadata, workout_table, exercise_table
+from app.services.daily_stats import DailyStatsService
+from app.services.statistics import StatisticsService
+
+# Redis в бенчмарке не нужен: кеш статистики деградирует до промахов
+logging.getLogger("app.services.statistics_cache").setLevel(logging.ERROR)
+
+WORKOUT_COUNTS = [1, 10, 50, 200]
+EXERCISES_PER_WORKOUT = 6
+
+
+class QueryCounter:
+    """Считает выполненные SQL-запросы на engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+
+async def seed(session: AsyncSession, user_id: uuid.UUID, workouts: int) -> None:
+    """Заполнить месяц тренировками пользователя"""
+    start = datetime(2025, 3, 1, 18, 0)
+    for i in range(workouts):
+        result = await session.execute(
+            insert(workout_table).values(
+                user_id=user_id,
+                date=start + timedelta(hours=(i * 720) // max(workouts, 1)),
+                total_weight=1000.0,
+                total_sets=15,
+                is_deleted=False,
+            )
+        )
+        workout_id = result.inserted_primary_key[0]
+        await session.execute(
+            insert(exercise_table),
+            [
+                {
+                    "workout_id": workout_id,
+                    "exercise_id": f"ex-{j}",
+                    "weight": 60.0,
+                    "sets": 3,
+                    "reps": 10,
+                    "order": j,
+                    "is_deleted": False,
+                }
+                for j in range(EXERCISES_PER_WORKOUT)
+            ],
+        )
+    await session.commit()
+
+
+async def legacy_monthly(session: AsyncSession, user_id: uuid.UUID) -> None:
+    """Прежняя схема: список тренировок + запрос упражнений на каждую"""
+    w, e = workout_table, exercise_table
+    workouts = (
+        await session.execute(
+            select(w.c.id).where(
+                (w.c.user_id == user_id)
+                & (w.c.date >= datetime(2025, 3, 1))
+                & (w.c.date < datetime(2025, 4, 1))
+                & (w.c.is_deleted == False)
+            )
+        )
+    ).all()
+    for workout in workouts:
+        await session.execute(
+            select(e).where((e.c.workout_id == workout.id) & (e.c.is_deleted == False))
+        )
+
+
+async def run_case(workouts: int) -> tuple:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    counter = QueryCounter(engine)
+    user_id = uuid.uuid4()
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await seed(session, user_id, workouts)
+        await DailyStatsService.rebuild_for_users(session, [user_id])
+        await session.commit()
+
+        counter.reset()
+        await legacy_monthly(session, user_id)
+        legacy_queries = counter.count
+
+        counter.reset()
+        started = time.perf_counter()
+        stats = await StatisticsService.get_monthly_statistics(session, user_id, 2025, 3)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        new_queries = counter.count
+
+    await engine.dispose()
+    assert stats["workout_count"] == workouts
+    assert stats["total_exercises"] == workouts * EXERCISES_PER_WORKOUT
+    return legacy_queries, new_queries, elapsed_ms
+
+
+async def main() -> None:
+    print(f"{'workouts':>10} {'legacy queries':>16} {'queries':>9} {'time, ms':>10}")
+    for workouts in WORKOUT_COUNTS:
+        legacy_queries, new_queries, elapsed_ms = await run_case(workouts)
+        print(f"{workouts:>10} {legacy_queries:>16} {new_queries:>9} {elapsed_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
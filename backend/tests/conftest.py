@@ -0,0 +1,37 @@
+"""
+Общие настройки тестов
+
+Запуск из папки backend:
+    pytest tests/
+
+Тесты не требуют Postgres и Redis: запросы к БД идут в in-memory SQLite
+(aiosqlite), кеш статистики без Redis деградирует до промахов.
+"""
+
+import logging
+import os
+
+# Настройки приложения обязательны при импорте сервисов. Engine приложения
+# (app.database) подключается лениво, тесты к нему не обращаются
+os.environ.setdefault("DATABASE_URL", "postgresql://test@localhost/test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.tables import metadata
+
+logging.getLogger("app.services.statistics_cache").setLevel(logging.ERROR)
+
+
+@pytest_asyncio.fixture
+async def session():
+    """Сессия на чистой in-memory SQLite с таблицами из metadata"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+    await engine.dispose()
@@ -0,0 +1,89 @@
+"""
+Векторная аналитика по истории подходов: нагрузка (ACWR) и недельный тоннаж
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.analytics import AnalyticsService, SetHistory
+
+
+def history(sets):
+    """sets: [(день, упражнение, вес, повторения)]"""
+    days, exercise_ids, weights, reps = zip(*sets) if sets else ([], [], [], [])
+    return SetHistory.from_columns(list(days), list(exercise_ids), list(weights), list(reps))
+
+
+def test_training_load_of_a_steady_month():
+    start = date(2025, 3, 1)
+    # Тоннаж 100 в каждый из 28 дней
+    load = AnalyticsService.training_load(
+        history([(start + timedelta(days=i), "bench", 10.0, 10) for i in range(28)]),
+        days=7,
+    )
+
+    assert [point["date"] for point in load["series"]] == [
+        str(start + timedelta(days=i)) for i in range(21, 28)
+    ]
+    last = load["series"][-1]
+    assert (last["load"], last["acute"], last["chronic"], last["acwr"]) == (100.0, 100.0, 100.0, 1.0)
+    assert load["current_acwr"] == 1.0
+
+
+def test_training_load_windows_and_padding_until_today():
+    first = date(2025, 3, 1)
+    sets = [(first, "bench", 100.0, 7), (first, "squat", 50.0, 14), (first + timedelta(days=3), "bench", 70.0, 10)]
+
+    load = AnalyticsService.training_load(history(sets), days=10, until=first + timedelta(days=9))
+    series = load["series"]
+
+    assert len(series) == 10
+    assert series[0] == {
+        "date": "2025-03-01",
+        "load": 1400.0,
+        "acute": 200.0,
+        "chronic": 50.0,
+        "acwr": 4.0,
+    }
+    # День без тренировок внутри диапазона и дни после последней тренировки — нули
+    assert series[1]["load"] == 0.0
+    assert series[3]["load"] == 700.0
+    # Через 7 дней первая тренировка выходит из острого окна, но не из хронического
+    assert series[7]["acute"] == 100.0
+    assert series[9]["chronic"] == 75.0
+    assert load["current_acwr"] == round(100.0 / 75.0, 3)
+
+
+def test_training_load_of_empty_history():
+    assert AnalyticsService.training_load(history([]), days=30) == {"current_acwr": None, "series": []}
+
+
+def test_training_load_with_empty_window():
+    load = AnalyticsService.training_load(history([(date(2025, 3, 1), "bench", 100.0, 5)]), days=0)
+
+    assert load == {"current_acwr": None, "series": []}
+
+
+def test_weekly_tonnage_aligns_to_mondays_and_fills_gaps():
+    # 2025-03-02 — воскресенье, 2025-03-03 — понедельник
+    sets = [
+        (date(2025, 3, 2), "bench", 100.0, 5),
+        (date(2025, 3, 3), "bench", 100.0, 5),
+        (date(2025, 3, 4), "squat", 50.0, 10),
+        (date(2025, 3, 17), "bench", 10.0, 1),
+    ]
+
+    assert AnalyticsService.weekly_tonnage(history(sets)) == [
+        {"week_start": "2025-02-24", "tonnage": 500.0, "sets": 1},
+        {"week_start": "2025-03-03", "tonnage": 1000.0, "sets": 2},
+        {"week_start": "2025-03-10", "tonnage": 0.0, "sets": 0},
+        {"week_start": "2025-03-17", "tonnage": 10.0, "sets": 1},
+    ]
+
+
+@pytest.mark.parametrize("weight, reps, expected", [(100.0, 1, 100.0), (100.0, 10, 133.33)])
+def test_estimate_one_rep_max(weight, reps, expected):
+    result = AnalyticsService.estimate_one_rep_max(np.array([weight]), np.array([reps]))
+    assert round(float(result[0]), 2) == expected
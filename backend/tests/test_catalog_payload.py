@@ -0,0 +1,146 @@
+"""
+Предрасчитанный ответ /batch/init: сборка, сжатие, выбор кодировки и ETag
+"""
+
+import dataclasses
+import gzip
+import hashlib
+import json
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from app.routes import directus as directus_routes
+from app.services.catalog_payload import CatalogPayloadService, build_batch_init, precompute
+
+brotli = pytest.importorskip("brotli")
+
+EXERCISES = {"data": [
+    {"id": 1, "name": "Жим штанги лёжа", "category": 10},
+    {"id": 2, "name": "Становая тяга", "category": "missing"},
+    {"id": 3, "name": "Планка", "category": {"id": 11, "name": "Кор"}},
+]}
+CATEGORIES = {"data": [{"id": 10, "name": "Грудь"}, {"id": 11, "name": "Кор"}]}
+
+
+@pytest.fixture
+def payload():
+    return precompute(build_batch_init(EXERCISES, CATEGORIES))
+
+
+def test_build_batch_init_expands_category_ids():
+    result = build_batch_init(EXERCISES, CATEGORIES)
+
+    assert [exercise["category"] for exercise in result["exercises"]] == [
+        {"id": 10, "name": "Грудь"},
+        {"id": "missing", "name": "Без категории"},
+        {"id": 11, "name": "Кор"},
+    ]
+    assert result["categories"] == CATEGORIES["data"]
+    # Ответы из кеша каталога не изменяются
+    assert EXERCISES["data"][0]["category"] == 10
+
+
+def test_build_batch_init_without_responses():
+    assert build_batch_init(None, None) == {"exercises": [], "categories": []}
+
+
+def test_precompute_encodings_hold_the_same_body(payload):
+    body = json.loads(payload.identity)
+
+    assert body == build_batch_init(EXERCISES, CATEGORIES)
+    assert "Жим".encode() in payload.identity  # ensure_ascii=False
+    assert gzip.decompress(payload.gzip) == payload.identity
+    assert brotli.decompress(payload.br) == payload.identity
+    assert payload.digest == hashlib.sha256(payload.identity).hexdigest()
+
+
+def test_precompute_is_deterministic(payload):
+    again = precompute(build_batch_init(EXERCISES, CATEGORIES))
+
+    assert again == payload
+
+
+def test_each_encoding_has_its_own_etag(payload):
+    etags = {payload.etag(encoding) for encoding in ("identity", "gzip", "br")}
+
+    assert payload.etag() == f'"{payload.digest}"'
+    assert len(etags) == 3
+    assert payload.encoded("identity") == payload.identity
+    assert payload.encoded("unknown") == payload.identity
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, "identity"),
+        ("", "identity"),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("BR;q=0.5", "br"),
+        ("gzip;q=0", "identity"),
+        ("gzip;q=bad", "identity"),
+        ("*", "br"),
+        ("deflate", "identity"),
+    ],
+)
+def test_accepted_encoding(payload, accept_encoding, expected):
+    assert directus_routes._accepted_encoding(accept_encoding, payload) == expected
+
+
+def test_accepted_encoding_without_brotli(payload):
+    payload = dataclasses.replace(payload, br=None)
+
+    assert directus_routes._accepted_encoding("br, gzip", payload) == "gzip"
+    assert directus_routes._accepted_encoding("br", payload) == "identity"
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch, payload):
+    async def get_batch_init():
+        return payload
+
+    monkeypatch.setattr(CatalogPayloadService, "get_batch_init", staticmethod(get_batch_init))
+    app = FastAPI()
+    app.include_router(directus_routes.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_batch_init_serves_the_negotiated_encoding(client, payload):
+    response = await client.get(f"{directus_routes.router.prefix}/batch/init", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == payload.etag("gzip")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == payload.identity
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("if_none_match_encoding", ["identity", "gzip", "br"])
+async def test_batch_init_not_modified_for_any_variant(client, payload, if_none_match_encoding):
+    response = await client.get(
+        f"{directus_routes.router.prefix}/batch/init",
+        headers={"Accept-Encoding": "br", "If-None-Match": f'"other", {payload.etag(if_none_match_encoding)}'},
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == payload.etag("br")
+
+
+@pytest.mark.asyncio
+async def test_batch_init_stale_etag_gets_the_body(client, payload):
+    response = await client.get(
+        f"{directus_routes.router.prefix}/batch/init",
+        headers={"Accept-Encoding": "identity", "If-None-Match": '"stale"'},
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == payload.identity
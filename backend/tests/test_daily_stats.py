@@ -0,0 +1,110 @@
+"""
+Дневные итоги: арифметика дельт и совпадение с расчётом по сырым таблицам
+"""
+
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.config import settings
+from app.models.tables import workout_table, exercise_table, user_daily_stats_table
+from app.services.daily_stats import DailyStatsService
+
+USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+async def rollup_rows(session) -> dict:
+    r = user_daily_stats_table
+    result = await session.execute(
+        select(r.c.day, r.c.workout_count, r.c.exercise_count, r.c.total_sets, r.c.total_reps, r.c.total_weight)
+        .where(r.c.user_id == USER_ID)
+        .order_by(r.c.day)
+    )
+    return {row.day: tuple(row[1:]) for row in result.all()}
+
+
+async def add_workout(session, day: datetime, total_weight: float, total_sets: int, reps: list) -> None:
+    result = await session.execute(
+        insert(workout_table).values(
+            user_id=USER_ID,
+            date=day,
+            total_weight=total_weight,
+            total_sets=total_sets,
+            is_deleted=False,
+        )
+    )
+    workout_id = result.inserted_primary_key[0]
+    for order, exercise_reps in enumerate(reps):
+        await session.execute(
+            insert(exercise_table).values(
+                workout_id=workout_id,
+                exercise_id=f"ex-{order}",
+                reps=exercise_reps,
+                order=order,
+                is_deleted=False,
+            )
+        )
+
+
+@pytest.mark.asyncio
+async def test_deltas_accumulate_per_day(session):
+    day = datetime(2025, 3, 1, 18, 0)
+    await DailyStatsService.apply_workout(session, USER_ID, day, 1000.0, 15, exercise_count=2, total_reps=20)
+    await DailyStatsService.apply_workout(session, USER_ID, day, 500.0, 5, exercise_count=1, total_reps=8)
+    await DailyStatsService.apply_delta(session, USER_ID, day.date(), total_weight=-100.0, total_sets=-1)
+
+    assert await rollup_rows(session) == {date(2025, 3, 1): (2, 3, 19, 28, 1400.0)}
+
+
+@pytest.mark.asyncio
+async def test_subtracting_a_workout_moves_it_between_days(session):
+    old_day = datetime(2025, 3, 1, 18, 0)
+    new_day = datetime(2025, 3, 2, 9, 0)
+    await DailyStatsService.apply_workout(session, USER_ID, old_day, 1000.0, 15, exercise_count=2, total_reps=20)
+
+    await DailyStatsService.apply_workout(
+        session, USER_ID, old_day, 1000.0, 15, sign=-1, exercise_count=2, total_reps=20
+    )
+    await DailyStatsService.apply_workout(session, USER_ID, new_day, 1000.0, 15, exercise_count=2, total_reps=20)
+
+    assert await rollup_rows(session) == {
+        date(2025, 3, 1): (0, 0, 0, 0, 0.0),
+        date(2025, 3, 2): (1, 2, 15, 20, 1000.0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_zero_delta_writes_nothing(session):
+    await DailyStatsService.apply_delta(session, USER_ID, date(2025, 3, 1), total_weight=0, total_sets=0)
+
+    assert await rollup_rows(session) == {}
+
+
+@pytest.mark.asyncio
+async def test_rollup_totals_match_raw_aggregate(session, monkeypatch):
+    await add_workout(session, datetime(2025, 3, 1, 18, 0), 1000.0, 15, [10, 8])
+    await add_workout(session, datetime(2025, 3, 1, 20, 0), 200.0, 3, [5])
+    await add_workout(session, datetime(2025, 3, 3, 7, 0), 700.0, 9, [])
+    # За пределами периода
+    await add_workout(session, datetime(2025, 3, 4, 0, 0), 999.0, 99, [1])
+
+    monkeypatch.setattr(settings, "STATISTICS_DAILY_ROLLUPS_ENABLED", False)
+    raw_totals = await DailyStatsService.get_period_totals(session, USER_ID, date(2025, 3, 1), date(2025, 3, 3))
+    raw_days = await DailyStatsService.get_daily_rows(session, USER_ID, date(2025, 3, 1), date(2025, 3, 3))
+
+    await DailyStatsService.rebuild_for_users(session, [USER_ID])
+    monkeypatch.setattr(settings, "STATISTICS_DAILY_ROLLUPS_ENABLED", True)
+    rollup_totals = await DailyStatsService.get_period_totals(session, USER_ID, date(2025, 3, 1), date(2025, 3, 3))
+    rollup_days = await DailyStatsService.get_daily_rows(session, USER_ID, date(2025, 3, 1), date(2025, 3, 3))
+
+    assert raw_totals == rollup_totals == {
+        "workout_count": 3,
+        "total_exercises": 3,
+        "total_weight": 1900.0,
+        "total_sets": 27,
+        "total_reps": 23,
+    }
+    assert [row.day for row in raw_days] == [row.day for row in rollup_days] == [date(2025, 3, 1), date(2025, 3, 3)]
+    assert [row.workout_count for row in raw_days] == [row.workout_count for row in rollup_days] == [2, 1]
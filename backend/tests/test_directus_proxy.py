@@ -0,0 +1,122 @@
+"""
+Прокси /items/{path} к Directus: сквозная передача ответа и закрытие
+соединения с Directus, в том числе при ошибке посреди потока
+"""
+
+import gzip
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from app.routes import directus as directus_routes
+
+BODY = b'{"data":[' + b",".join(b'{"id":%d}' % i for i in range(1000)) + b"]}"
+
+
+class UpstreamBody(httpx.AsyncByteStream):
+    """Тело ответа Directus; fail_after — оборвать поток после первого куска"""
+
+    def __init__(self, content: bytes, fail_after: bool = False):
+        self.content = content
+        self.fail_after = fail_after
+        self.closed = False
+
+    async def __aiter__(self):
+        yield self.content[:100]
+        if self.fail_after:
+            raise httpx.ReadTimeout("upstream stalled")
+        yield self.content[100:]
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest_asyncio.fixture
+async def proxy(monkeypatch):
+    upstream = {"requests": [], "bodies": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream["requests"].append(request)
+        body = upstream.pop("next_body", None) or UpstreamBody(gzip.compress(BODY))
+        upstream["bodies"].append(body)
+        return httpx.Response(
+            upstream.pop("next_status", 200),
+            headers={
+                "content-type": "application/json; charset=utf-8",
+                "content-encoding": "gzip",
+                "etag": '"v1"',
+                "cache-control": "max-age=60",
+                "x-powered-by": "Directus",
+            },
+            stream=body,
+        )
+
+    upstream_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(directus_routes, "get_directus_client", lambda: upstream_client)
+    monkeypatch.setattr(directus_routes.settings, "DIRECTUS_URL", "http://directus")
+
+    app = FastAPI()
+    app.include_router(directus_routes.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client, upstream
+    await upstream_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_response_is_passed_through_unchanged(proxy):
+    client, upstream = proxy
+
+    response = await client.get(
+        f"{directus_routes.router.prefix}/items/exercises?fields=id&fields=name",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": '"v0"'},
+    )
+
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == '"v1"'
+    assert response.headers["cache-control"] == "max-age=60"
+    assert "x-powered-by" not in response.headers
+
+    [request] = upstream["requests"]
+    assert str(request.url) == "http://directus/items/exercises?fields=id&fields=name"
+    assert request.headers["if-none-match"] == '"v0"'
+    assert upstream["bodies"][0].closed
+
+
+@pytest.mark.asyncio
+async def test_upstream_status_is_kept(proxy):
+    client, upstream = proxy
+    upstream["next_status"] = 404
+
+    response = await client.get(f"{directus_routes.router.prefix}/items/missing")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_request_body_is_forwarded(proxy):
+    client, upstream = proxy
+
+    await client.post(
+        f"{directus_routes.router.prefix}/items/exercises",
+        content='{"name":"Жим"}'.encode(),
+        headers={"Content-Type": "application/json"},
+    )
+
+    [request] = upstream["requests"]
+    assert request.method == "POST"
+    assert await request.aread() == '{"name":"Жим"}'.encode()
+
+
+@pytest.mark.asyncio
+async def test_upstream_is_closed_when_the_stream_fails(proxy):
+    client, upstream = proxy
+    upstream["next_body"] = UpstreamBody(BODY, fail_after=True)
+
+    with pytest.raises(Exception):
+        await client.get(f"{directus_routes.router.prefix}/items/exercises")
+
+    assert upstream["bodies"][0].closed
@@ -0,0 +1,70 @@
+"""
+Локальный поиск упражнений: нормализация, префиксы, опечатки и ранжирование
+"""
+
+import pytest
+
+from app.services.exercise_search import ExerciseSearchIndex, tokenize
+
+CATALOG = [
+    {"id": 1, "name": "Жим штанги лёжа"},
+    {"id": 2, "name": "Жим гантелей сидя"},
+    {"id": 3, "name": "Bench press"},
+    {"id": 4, "name": "Приседания со штангой"},
+    {"id": 5, "name": "Становая тяга"},
+    {"id": 6, "name": "Тяга штанги в наклоне"},
+    {"id": 7, "name": "Жим"},
+    {"id": 8, "name": None},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ExerciseSearchIndex(CATALOG)
+
+
+def ids(results):
+    return [exercise["id"] for exercise in results]
+
+
+def test_tokenize_lowercases_and_transliterates():
+    assert tokenize("Жим штанги ЛЁЖА, 90°") == ["zhim", "shtangi", "lezha", "90"]
+
+
+def test_exercises_without_name_are_not_indexed(index):
+    assert len(index) == 7
+
+
+@pytest.mark.parametrize("query", ["жим", "Жим", "zhim", "ЖИМ"])
+def test_cyrillic_and_latin_queries_match(index, query):
+    assert ids(index.search(query)) == [7, 1, 2]
+
+
+def test_exact_token_ranks_above_prefix_and_shorter_name_wins_ties(index):
+    # «жим» — точное совпадение во всех трёх; при равных баллах короче название
+    assert ids(index.search("жим"))[0] == 7
+    # «тяга» — точное совпадение, первое слово у «Тяга штанги…» даёт бонус
+    assert ids(index.search("тяга")) == [6, 5]
+
+
+def test_prefix_while_typing(index):
+    assert ids(index.search("прис")) == [4]
+    assert ids(index.search("бен")) == [3]
+
+
+def test_all_query_words_must_match(index):
+    assert ids(index.search("жим штанги")) == [1]
+    assert ids(index.search("жим тяга")) == []
+
+
+def test_typo_falls_back_to_trigrams(index):
+    assert ids(index.search("присидания")) == [4]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "!!!"])
+def test_empty_query_returns_nothing(index, query):
+    assert index.search(query) == []
+
+
+def test_limit(index):
+    assert len(index.search("жим", limit=2)) == 2
@@ -0,0 +1,96 @@
+"""
+Ряд итогов по периодам: раскладка дневных итогов по дням, неделям и месяцам
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.daily_stats import DailyStatsService
+from app.services.statistics import StatisticsService
+
+
+def daily_row(day: date, workouts: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        day=day,
+        workout_count=workouts,
+        exercise_count=2 * workouts,
+        total_sets=3 * workouts,
+        total_reps=30 * workouts,
+        total_weight=100.0 * workouts,
+    )
+
+
+@pytest.fixture
+def daily_rows(monkeypatch):
+    rows = []
+
+    async def get_daily_rows(session, user_id, start, end):
+        return [row for row in rows if start <= row.day <= end]
+
+    monkeypatch.setattr(DailyStatsService, "get_daily_rows", staticmethod(get_daily_rows))
+    return rows
+
+
+@pytest.mark.asyncio
+async def test_days_without_workouts_are_zero_filled(daily_rows):
+    daily_rows.append(daily_row(date(2025, 3, 2), workouts=2))
+
+    series = await StatisticsService.get_series(None, 1, date(2025, 3, 1), date(2025, 3, 3), "day")
+
+    assert [(b["period_start"], b["workout_count"]) for b in series["buckets"]] == [
+        (date(2025, 3, 1), 0),
+        (date(2025, 3, 2), 2),
+        (date(2025, 3, 3), 0),
+    ]
+    assert series["buckets"][1]["total_weight"] == 200.0
+    assert not any(b["partial"] for b in series["buckets"])
+
+
+@pytest.mark.asyncio
+async def test_weeks_start_on_monday_and_edges_are_clamped(daily_rows):
+    # 2025-03-05 — среда, 2025-03-31 — понедельник
+    daily_rows.extend([daily_row(date(2025, 3, 5)), daily_row(date(2025, 3, 9)), daily_row(date(2025, 3, 31))])
+
+    series = await StatisticsService.get_series(None, 1, date(2025, 3, 5), date(2025, 3, 31), "week")
+
+    assert [
+        (b["period_start"], b["period_end"], b["partial"], b["workout_count"])
+        for b in series["buckets"]
+    ] == [
+        (date(2025, 3, 5), date(2025, 3, 9), True, 2),
+        (date(2025, 3, 10), date(2025, 3, 16), False, 0),
+        (date(2025, 3, 17), date(2025, 3, 23), False, 0),
+        (date(2025, 3, 24), date(2025, 3, 30), False, 0),
+        (date(2025, 3, 31), date(2025, 3, 31), True, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_months_cross_the_year_boundary(daily_rows):
+    daily_rows.extend([daily_row(date(2024, 12, 31)), daily_row(date(2025, 1, 1)), daily_row(date(2025, 2, 28))])
+
+    series = await StatisticsService.get_series(None, 1, date(2024, 12, 1), date(2025, 2, 28), "month")
+
+    assert [
+        (b["period_start"], b["period_end"], b["partial"], b["workout_count"])
+        for b in series["buckets"]
+    ] == [
+        (date(2024, 12, 1), date(2024, 12, 31), False, 1),
+        (date(2025, 1, 1), date(2025, 1, 31), False, 1),
+        (date(2025, 2, 1), date(2025, 2, 28), False, 1),
+    ]
+
+
+@pytest.mark.parametrize(
+    "start, end, granularity, expected",
+    [
+        (date(2025, 3, 1), date(2025, 3, 1), "day", 1),
+        (date(2025, 3, 1), date(2025, 3, 31), "day", 31),
+        (date(2025, 3, 5), date(2025, 3, 31), "week", 5),
+        (date(2024, 11, 15), date(2025, 2, 1), "month", 4),
+    ],
+)
+def test_count_series_buckets(start, end, granularity, expected):
+    assert StatisticsService.count_series_buckets(start, end, granularity) == expected
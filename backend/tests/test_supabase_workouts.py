@@ -0,0 +1,214 @@
+"""
+Reconcile of workout updates: the row diff, the content hash and how
+failed upstream requests are handled. Supabase is replaced with a fake
+_make_request.
+"""
+
+import pytest
+
+from app.schemas.supabase_workout import ExerciseWithSetsRequest
+from app.services.supabase_workouts import (
+    SupabaseWorkoutService,
+    exercise_cache,
+    plan_exercise_changes,
+    request_content_hash,
+    workout_content_hash,
+)
+
+SESSION_ID = "session-1"
+
+
+def exercise(directus_id, *sets):
+    return ExerciseWithSetsRequest(
+        exercise_id=directus_id,
+        sets=[{"reps": reps, "weight": weight} for reps, weight in sets],
+    )
+
+
+def stored(row_id, directus_id, *sets):
+    """A stored exercise row as returned by get_workout_exercises_with_sets"""
+    return {
+        "id": row_id,
+        "exercise_id": f"uuid-{directus_id}",
+        "exercises": {"directus_id": directus_id},
+        "user_day_workout_exercise_sets": [
+            {"id": f"{row_id}-set-{order}", "reps": reps, "weight": weight, "set_order": order}
+            for order, (reps, weight) in enumerate(sets, start=1)
+        ],
+    }
+
+
+class FakeSupabase:
+    """Records requests; responses come from `responses` keyed by (method, endpoint)"""
+
+    def __init__(self, existing):
+        self.calls = []
+        self.responses = {
+            ("GET", "user_day_workout_exercises"): existing,
+            ("DELETE", "user_day_workout_exercises"): [{"id": "deleted"}],
+            ("DELETE", "user_day_workout_exercise_sets"): [{"id": "deleted"}],
+            ("POST", "user_day_workout_exercise_sets"): [{"id": "set"}],
+            ("PATCH", "user_day_workouts"): [{"id": SESSION_ID}],
+        }
+
+    async def __call__(self, method, endpoint, data=None, params=None, prefer=None):
+        self.calls.append((method, endpoint, data, params))
+        return self.responses.get((method, endpoint))
+
+    def methods(self):
+        return [(method, endpoint) for method, endpoint, _, _ in self.calls]
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    def install(existing):
+        fake = FakeSupabase(existing)
+        monkeypatch.setattr(SupabaseWorkoutService, "_make_request", staticmethod(fake))
+        return fake
+
+    exercise_cache.clear()
+    yield install
+    exercise_cache.clear()
+
+
+def test_plan_for_identical_content_is_empty():
+    existing = [stored("we-1", "bench", (5, 100.0), (5, 100.0))]
+
+    plan = plan_exercise_changes(existing, [exercise("bench", (5, 100), (5, 100))])
+
+    assert plan == {
+        "new_exercises": [],
+        "delete_exercise_ids": [],
+        "upsert_sets": [],
+        "delete_set_ids": [],
+        "changed_exercise_ids": [],
+    }
+
+
+def test_plan_touches_only_changed_sets():
+    existing = [
+        stored("we-1", "bench", (5, 100.0), (5, 100.0), (5, 100.0)),
+        stored("we-2", "squat", (5, 140.0)),
+    ]
+
+    plan = plan_exercise_changes(existing, [
+        exercise("bench", (5, 100), (6, 100)),
+        exercise("squat", (5, 140.004), (3, 150)),
+    ])
+
+    # Weight is compared as DECIMAL(10, 2): 140.004 equals the stored 140.00
+    assert [(s["id"], s["reps"], s["set_order"]) for s in plan["upsert_sets"][:1]] == [("we-1-set-2", 6, 2)]
+    new_set = plan["upsert_sets"][1]
+    assert (new_set["user_day_workout_exercise_id"], new_set["reps"], new_set["set_order"]) == ("we-2", 3, 2)
+    assert plan["delete_set_ids"] == ["we-1-set-3"]
+    assert plan["new_exercises"] == [] and plan["delete_exercise_ids"] == []
+    assert sorted(plan["changed_exercise_ids"]) == ["bench", "squat"]
+
+
+def test_plan_matches_repeated_exercises_in_order():
+    existing = [
+        stored("we-1", "bench", (5, 100.0)),
+        stored("we-2", "bench", (8, 80.0)),
+        stored("we-3", "row", (10, 60.0)),
+    ]
+
+    plan = plan_exercise_changes(existing, [
+        exercise("bench", (5, 100)),
+        exercise("bench", (8, 80)),
+        exercise("bench", (12, 60)),
+        exercise("press", (5, 50)),
+    ])
+
+    assert [ex.exercise_id for ex in plan["new_exercises"]] == ["bench", "press"]
+    assert plan["delete_exercise_ids"] == ["we-3"]
+    assert plan["upsert_sets"] == [] and plan["delete_set_ids"] == []
+    assert sorted(plan["changed_exercise_ids"]) == ["bench", "press", "row"]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_writes_only_the_diff(supabase):
+    fake = supabase([
+        stored("we-1", "bench", (5, 100.0), (5, 100.0)),
+        stored("we-2", "row", (10, 60.0)),
+    ])
+
+    result = await SupabaseWorkoutService.reconcile_workout_exercises(
+        SESSION_ID, [exercise("bench", (5, 100), (6, 100))]
+    )
+
+    assert fake.methods() == [
+        ("GET", "user_day_workout_exercises"),
+        ("DELETE", "user_day_workout_exercises"),
+        ("POST", "user_day_workout_exercise_sets"),
+    ]
+    assert fake.calls[1][3]["id"] == 'in.("we-2")'
+    assert result["sets_count"] == 2
+    assert (result["exercises_deleted"], result["sets_upserted"], result["sets_deleted"]) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failed_endpoint", ["user_day_workout_exercises", "user_day_workout_exercise_sets"])
+async def test_reconcile_stops_when_a_delete_fails(supabase, failed_endpoint):
+    fake = supabase([
+        stored("we-1", "bench", (5, 100.0), (5, 100.0)),
+        stored("we-2", "row", (10, 60.0)),
+    ])
+    fake.responses[("DELETE", failed_endpoint)] = None
+
+    # Drops the "row" exercise and the second bench set
+    with pytest.raises(RuntimeError):
+        await SupabaseWorkoutService.reconcile_workout_exercises(
+            SESSION_ID, [exercise("bench", (5, 100))], "hash"
+        )
+
+    assert ("PATCH", "user_day_workouts") not in fake.methods()
+
+
+def test_content_hash_ignores_exercise_order_and_weight_formatting():
+    hashes = {
+        request_content_hash([exercise("bench", (5, 100), (5, 100.5)), exercise("row", (10, 60))]),
+        request_content_hash([exercise("row", (10, 60.0)), exercise("bench", (5, 100.0), (5, 100.50))]),
+        workout_content_hash([("row", [(10, "60.00")]), ("bench", [(5, 100), (5, "100.5")])]),
+    }
+    assert len(hashes) == 1
+
+    assert request_content_hash([exercise("bench", (5, 100), (5, 100.5))]) != request_content_hash(
+        [exercise("bench", (5, 100.5), (5, 100))]
+    )
+
+
+@pytest.mark.asyncio
+async def test_reconcile_stores_the_hash_after_all_writes(supabase):
+    fake = supabase([stored("we-1", "bench", (5, 100.0), (5, 100.0))])
+
+    await SupabaseWorkoutService.reconcile_workout_exercises(
+        SESSION_ID, [exercise("bench", (5, 100), (6, 100))], "hash"
+    )
+
+    assert fake.methods()[-1] == ("PATCH", "user_day_workouts")
+    assert fake.calls[-1][2] == {"content_hash": "hash"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("patch_response", [None, []])
+async def test_reconcile_fails_when_the_hash_is_not_stored(supabase, patch_response):
+    fake = supabase([stored("we-1", "bench", (5, 100.0))])
+    fake.responses[("PATCH", "user_day_workouts")] = patch_response
+
+    with pytest.raises(RuntimeError):
+        await SupabaseWorkoutService.reconcile_workout_exercises(
+            SESSION_ID, [exercise("bench", (6, 100))], "hash"
+        )
+
+
+@pytest.mark.asyncio
+async def test_reconcile_skips_the_hash_when_exercises_are_unknown(supabase):
+    fake = supabase([])
+    fake.responses[("GET", "exercises")] = []
+
+    result = await SupabaseWorkoutService.reconcile_workout_exercises(
+        SESSION_ID, [exercise("unknown", (5, 100))], "hash"
+    )
+
+    assert result["sets_count"] == 0
+    assert ("PATCH", "user_day_workouts") not in fake.methods()
@@ -0,0 +1,202 @@
+"""
+Очередь отложенной записи: повторы, подтверждение (XACK) и порядок задач
+одного order_key. Redis заменён на fakeredis, воркер прогоняется вручную.
+"""
+
+import asyncio
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+import app.core.redis as app_redis
+from app.config import settings
+from app.services import write_queue
+from app.services.write_queue import WriteQueueService, STREAM_KEY, GROUP_NAME
+
+
+@pytest_asyncio.fixture
+async def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(app_redis, "_redis", client)
+    monkeypatch.setattr(settings, "WRITE_QUEUE_RETRY_DELAY_SECONDS", 0)
+    monkeypatch.setattr(settings, "WRITE_QUEUE_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "WRITE_QUEUE_BATCH_SIZE", 10)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """Обработчик типа "test": пишет (payload, job_id) в calls, ошибки берёт из failures"""
+    calls = []
+    failures = {}
+
+    async def apply(payload, job_id):
+        calls.append((payload["n"], job_id))
+        error = failures.get(payload["n"])
+        if error:
+            failures[payload["n"]] = error[1:]
+            raise error[0]
+        return {"n": payload["n"]}
+
+    monkeypatch.setitem(write_queue._handlers, "test", apply)
+    return calls, failures
+
+
+async def drain(rounds: int = 10) -> None:
+    """Прогнать цикл воркера, пока в стриме есть что читать"""
+    await WriteQueueService._ensure_group()
+    for _ in range(rounds):
+        batch = await WriteQueueService._read_batch("test-consumer")
+        if not batch:
+            return
+        await asyncio.gather(
+            *(WriteQueueService._process_chain(chain) for chain in write_queue._group_by_order_key(batch))
+        )
+
+
+async def pending(redis) -> int:
+    return (await redis.xpending(STREAM_KEY, GROUP_NAME))["pending"]
+
+
+@pytest.mark.asyncio
+async def test_applied_job_is_acked_and_removed(redis, handler):
+    calls, _ = handler
+    job_id = await WriteQueueService.enqueue("test", {"n": 1})
+
+    await drain()
+
+    job = await WriteQueueService.get_job(job_id)
+    assert (job["status"], job["attempts"], job["result"]) == ("done", 1, {"n": 1})
+    assert calls == [(1, job_id)]
+    assert await redis.xlen(STREAM_KEY) == 0
+    assert await pending(redis) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried(redis, handler):
+    calls, failures = handler
+    failures[1] = [RuntimeError("upstream down")]
+    job_id = await WriteQueueService.enqueue("test", {"n": 1})
+
+    await drain()
+
+    job = await WriteQueueService.get_job(job_id)
+    assert (job["status"], job["attempts"]) == ("done", 2)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_job_fails_after_max_attempts(redis, handler):
+    calls, failures = handler
+    failures[1] = [RuntimeError("upstream down")] * 5
+    job_id = await WriteQueueService.enqueue("test", {"n": 1})
+
+    await drain()
+
+    job = await WriteQueueService.get_job(job_id)
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 3, "upstream down")
+    assert len(calls) == 3
+    assert await redis.xlen(STREAM_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried(redis, handler):
+    calls, failures = handler
+    failures[1] = [HTTPException(status_code=404, detail="Workout session not found")]
+    job_id = await WriteQueueService.enqueue("test", {"n": 1})
+
+    await drain()
+
+    job = await WriteQueueService.get_job(job_id)
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 1, "Workout session not found")
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_redelivered_finished_job_is_not_applied_again(redis, handler):
+    calls, _ = handler
+    await WriteQueueService.enqueue("test", {"n": 1})
+    await WriteQueueService._ensure_group()
+    [(entry_id, fields)] = await WriteQueueService._read_batch("test-consumer")
+    await WriteQueueService._process(entry_id, fields)
+
+    # Повторная доставка той же записи (например, после падения до XACK)
+    await WriteQueueService._process(entry_id, fields)
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_one_key_run_in_stream_order(redis, handler):
+    calls, _ = handler
+    for n in range(5):
+        await WriteQueueService.enqueue("test", {"n": n}, order_key="session:1")
+    await WriteQueueService.enqueue("test", {"n": 100}, order_key="session:2")
+
+    await drain()
+
+    assert [n for n, _ in calls if n < 100] == [0, 1, 2, 3, 4]
+    assert 100 in [n for n, _ in calls]
+
+
+@pytest.mark.asyncio
+async def test_older_job_is_superseded_by_a_newer_applied_one(redis, handler):
+    calls, failures = handler
+    failures[1] = [RuntimeError("upstream down")]
+    older = await WriteQueueService.enqueue("test", {"n": 1}, order_key="session:1")
+    newer = await WriteQueueService.enqueue("test", {"n": 2}, order_key="session:1")
+
+    await drain()
+
+    assert (await WriteQueueService.get_job(older))["status"] == "superseded"
+    assert (await WriteQueueService.get_job(newer))["status"] == "done"
+    # Старая задача не выполнялась повторно после применения новой
+    assert [n for n, _ in calls] == [1, 2]
+    assert await redis.xlen(STREAM_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_job_waits_while_its_key_is_held(redis, handler):
+    calls, _ = handler
+    job_id = await WriteQueueService.enqueue("test", {"n": 1}, order_key="session:1")
+    await redis.set(write_queue._order_lock_key("session:1"), "other-job")
+
+    await drain(rounds=2)
+
+    job = await WriteQueueService.get_job(job_id)
+    assert (job["status"], job["attempts"]) == ("queued", 0)
+    assert calls == []
+    assert await pending(redis) == 1
+
+    await redis.delete(write_queue._order_lock_key("session:1"))
+    await drain()
+
+    assert (await WriteQueueService.get_job(job_id))["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_queued_save_passes_the_job_id_as_request_key(monkeypatch):
+    from app.routes import supabase_workouts as routes
+    from app.services.supabase_workouts import SupabaseWorkoutService
+
+    request_keys = []
+
+    async def save_workout_session(user_id, user_day_id, exercises, started_at=None, content_hash=None, request_key=None):
+        request_keys.append(request_key)
+        return {"session_id": "session-1", "date": None, "sets_count": 0, "missing_exercise_ids": [], "replayed": True}
+
+    async def invalidate_statistics(*args):
+        pass
+
+    monkeypatch.setattr(SupabaseWorkoutService, "save_workout_session", staticmethod(save_workout_session))
+    monkeypatch.setattr(routes, "invalidate_statistics", invalidate_statistics)
+
+    payload = {"user_id": "user-1", "user_day_id": "day-1", "exercises": []}
+    first = await routes._apply_queued_save(payload, "job-1")
+    retry = await routes._apply_queued_save(payload, "job-1")
+
+    assert request_keys == ["write_job:job-1", "write_job:job-1"]
+    assert first == retry == {"session_id": "session-1", "exercises_count": 0, "sets_count": 0}
@@ -0,0 +1,103 @@
+-- Personal records per (user, exercise), maintained at write time.
+-- exercise_id is the Directus exercise ID (exercises.directus_id), the same
+-- identifier the legacy backend stores in exercise.exercise_id.
+CREATE TABLE personal_records (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  exercise_id VARCHAR(255) NOT NULL,
+  max_weight DECIMAL(10, 2) NOT NULL,
+  max_weight_reps INTEGER NOT NULL,
+  best_e1rm DECIMAL(10, 2) NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id, exercise_id)
+);
+
+-- Epley estimated one-rep max
+CREATE OR REPLACE FUNCTION estimate_one_rep_max(p_weight NUMERIC, p_reps INTEGER)
+RETURNS NUMERIC
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT CASE
+    WHEN p_reps <= 1 THEN p_weight
+    ELSE round(p_weight * (1 + p_reps / 30.0), 2)
+  END;
+$$;
+
+-- Merge the best set of each (user, exercise) in the given rows into
+-- personal_records. Records only ever go up: the best weight keeps the most
+-- reps done at that weight, and the best e1RM is tracked separately.
+CREATE OR REPLACE FUNCTION merge_personal_records(p_sets JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+  WITH sets AS (
+    SELECT
+      (s->>'user_id')::UUID AS user_id,
+      s->>'exercise_id' AS exercise_id,
+      (s->>'weight')::NUMERIC AS weight,
+      (s->>'reps')::INTEGER AS reps
+    FROM jsonb_array_elements(p_sets) AS s
+  ),
+  best AS (
+    SELECT DISTINCT ON (user_id, exercise_id)
+      user_id,
+      exercise_id,
+      weight AS max_weight,
+      reps AS max_weight_reps,
+      max(estimate_one_rep_max(weight, reps)) OVER (PARTITION BY user_id, exercise_id) AS best_e1rm
+    FROM sets
+    ORDER BY user_id, exercise_id, weight DESC, reps DESC
+  )
+  INSERT INTO personal_records AS pr (user_id, exercise_id, max_weight, max_weight_reps, best_e1rm)
+  SELECT user_id, exercise_id, max_weight, max_weight_reps, best_e1rm FROM best
+  ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+    max_weight_reps = CASE
+      WHEN EXCLUDED.max_weight > pr.max_weight THEN EXCLUDED.max_weight_reps
+      WHEN EXCLUDED.max_weight = pr.max_weight THEN GREATEST(pr.max_weight_reps, EXCLUDED.max_weight_reps)
+      ELSE pr.max_weight_reps
+    END,
+    max_weight = GREATEST(pr.max_weight, EXCLUDED.max_weight),
+    best_e1rm = GREATEST(pr.best_e1rm, EXCLUDED.best_e1rm),
+    updated_at = CURRENT_TIMESTAMP;
+$$;
+
+-- Statement-level trigger: one merge per INSERT/UPDATE statement, so bulk
+-- inserts of a whole session cost a single upsert pass.
+CREATE OR REPLACE FUNCTION personal_records_on_sets_write()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM merge_personal_records(
+    COALESCE(
+      (
+        SELECT jsonb_agg(jsonb_build_object(
+          'user_id', w.user_id,
+          'exercise_id', e.directus_id,
+          'weight', n.weight,
+          'reps', n.reps
+        ))
+        FROM new_sets n
+        JOIN user_day_workout_exercises we ON we.id = n.user_day_workout_exercise_id
+        JOIN user_day_workouts w ON w.id = we.user_day_workout_id
+        JOIN exercises e ON e.id = we.exercise_id
+      ),
+      '[]'::JSONB
+    )
+  );
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_personal_records_sets_insert
+AFTER INSERT ON user_day_workout_exercise_sets
+REFERENCING NEW TABLE AS new_sets
+FOR EACH STATEMENT
+EXECUTE FUNCTION personal_records_on_sets_write();
+
+CREATE TRIGGER trg_personal_records_sets_update
+AFTER UPDATE ON user_day_workout_exercise_sets
+REFERENCING NEW TABLE AS new_sets
+FOR EACH STATEMENT
+EXECUTE FUNCTION personal_records_on_sets_write();
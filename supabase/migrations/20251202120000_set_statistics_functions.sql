@@ -0,0 +1,74 @@
+-- Set-level statistics for the Supabase data model, computed in the database
+-- and exposed through PostgREST RPC (POST /rest/v1/rpc/user_set_statistics).
+-- One call returns period totals, per-exercise maxima and per-day volume.
+CREATE OR REPLACE FUNCTION user_set_statistics(
+  p_user_id UUID,
+  p_start DATE DEFAULT NULL,
+  p_end DATE DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH sets AS (
+    SELECT
+      d.date,
+      w.id AS workout_id,
+      we.id AS workout_exercise_id,
+      e.directus_id AS exercise_id,
+      e.name AS exercise_name,
+      s.weight,
+      s.reps
+    FROM user_day_workouts w
+    JOIN user_days d ON d.id = w.user_day_id
+    JOIN user_day_workout_exercises we ON we.user_day_workout_id = w.id
+    JOIN exercises e ON e.id = we.exercise_id
+    JOIN user_day_workout_exercise_sets s ON s.user_day_workout_exercise_id = we.id
+    WHERE w.user_id = p_user_id
+      AND (p_start IS NULL OR d.date >= p_start)
+      AND (p_end IS NULL OR d.date <= p_end)
+  ),
+  totals AS (
+    SELECT jsonb_build_object(
+      'workout_count', count(DISTINCT workout_id),
+      'exercise_count', count(DISTINCT workout_exercise_id),
+      'total_sets', count(*),
+      'total_reps', COALESCE(sum(reps), 0),
+      'total_volume', COALESCE(sum(weight * reps), 0)
+    ) AS value
+    FROM sets
+  ),
+  per_exercise AS (
+    SELECT COALESCE(jsonb_agg(x ORDER BY x.volume DESC), '[]'::JSONB) AS value
+    FROM (
+      SELECT
+        exercise_id,
+        max(exercise_name) AS name,
+        count(*) AS sets,
+        sum(reps) AS reps,
+        sum(weight * reps) AS volume,
+        max(weight) AS max_weight,
+        max(reps) AS max_reps,
+        max(estimate_one_rep_max(weight, reps)) AS best_e1rm
+      FROM sets
+      GROUP BY exercise_id
+    ) x
+  ),
+  per_day AS (
+    SELECT COALESCE(jsonb_agg(x ORDER BY x.date), '[]'::JSONB) AS value
+    FROM (
+      SELECT
+        date,
+        count(*) AS sets,
+        sum(reps) AS reps,
+        sum(weight * reps) AS volume
+      FROM sets
+      GROUP BY date
+    ) x
+  )
+  SELECT totals.value || jsonb_build_object(
+    'exercises', per_exercise.value,
+    'days', per_day.value
+  )
+  FROM totals, per_exercise, per_day;
+$$;
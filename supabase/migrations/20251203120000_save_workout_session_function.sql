@@ -0,0 +1,74 @@
+-- Atomic workout save, called through PostgREST RPC
+-- (POST /rest/v1/rpc/save_workout_session).
+--
+-- p_session: {"user_id", "user_day_id", "started_at"?, "exercises": [
+--   {"exercise_id": <directus_id>, "sets": [{"reps", "weight"}, ...]}, ...]}
+--
+-- Creates the session, resolves Directus IDs and inserts all exercises and
+-- sets in the caller's transaction: either everything is written or nothing.
+-- Unknown Directus IDs are skipped and reported in missing_exercise_ids.
+CREATE OR REPLACE FUNCTION save_workout_session(p_session JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_session_id UUID;
+  v_date DATE;
+  v_exercises_count INTEGER;
+  v_sets_count INTEGER;
+  v_missing JSONB;
+BEGIN
+  INSERT INTO user_day_workouts (user_id, user_day_id, started_at)
+  VALUES (
+    (p_session->>'user_id')::UUID,
+    (p_session->>'user_day_id')::UUID,
+    COALESCE((p_session->>'started_at')::TIMESTAMPTZ, CURRENT_TIMESTAMP)
+  )
+  RETURNING id INTO v_session_id;
+
+  SELECT date INTO v_date FROM user_days WHERE id = (p_session->>'user_day_id')::UUID;
+
+  -- IDs are generated up front so that sets can reference their exercise
+  -- even when the same Directus exercise appears twice in one session
+  WITH input AS (
+    SELECT item.value AS exercise, item.position
+    FROM jsonb_array_elements(COALESCE(p_session->'exercises', '[]'::JSONB))
+      WITH ORDINALITY AS item(value, position)
+  ),
+  resolved AS MATERIALIZED (
+    SELECT uuid_generate_v4() AS id, i.position, e.id AS exercise_id, i.exercise->'sets' AS sets
+    FROM input i
+    JOIN exercises e ON e.directus_id = i.exercise->>'exercise_id'
+  ),
+  new_exercises AS (
+    INSERT INTO user_day_workout_exercises (id, user_day_workout_id, exercise_id)
+    SELECT id, v_session_id, exercise_id FROM resolved ORDER BY position
+    RETURNING id
+  ),
+  new_sets AS (
+    INSERT INTO user_day_workout_exercise_sets (user_day_workout_exercise_id, reps, weight, set_order)
+    SELECT r.id, (s.value->>'reps')::INTEGER, (s.value->>'weight')::NUMERIC, s.set_order
+    FROM resolved r
+    CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.sets, '[]'::JSONB))
+      WITH ORDINALITY AS s(value, set_order)
+    RETURNING id
+  )
+  SELECT
+    (SELECT count(*) FROM new_exercises),
+    (SELECT count(*) FROM new_sets)
+  INTO v_exercises_count, v_sets_count;
+
+  SELECT COALESCE(jsonb_agg(DISTINCT item->>'exercise_id'), '[]'::JSONB)
+  INTO v_missing
+  FROM jsonb_array_elements(COALESCE(p_session->'exercises', '[]'::JSONB)) AS item
+  WHERE NOT EXISTS (SELECT 1 FROM exercises e WHERE e.directus_id = item->>'exercise_id');
+
+  RETURN jsonb_build_object(
+    'session_id', v_session_id,
+    'date', v_date,
+    'exercises_count', v_exercises_count,
+    'sets_count', v_sets_count,
+    'missing_exercise_ids', v_missing
+  );
+END;
+$$;
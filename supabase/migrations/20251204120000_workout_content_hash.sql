@@ -0,0 +1,152 @@
+-- Canonical content hash of a workout session (exercises and sets), used as
+-- its ETag and to skip updates that would not change anything.
+--
+-- The backend computes the hash and stores it with every write. Any other
+-- change to the session's exercises or sets clears it through the triggers
+-- below, so a stored hash always describes the current rows; NULL just
+-- means "unknown" and the next update recomputes it.
+ALTER TABLE user_day_workouts ADD COLUMN content_hash TEXT;
+
+-- Statement-level triggers: one UPDATE per write statement, however many
+-- rows it touched.
+CREATE OR REPLACE FUNCTION clear_workout_content_hash_on_exercises()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE user_day_workouts w
+  SET content_hash = NULL
+  WHERE w.content_hash IS NOT NULL
+    AND w.id IN (SELECT user_day_workout_id FROM changed_rows);
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION clear_workout_content_hash_on_sets()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE user_day_workouts w
+  SET content_hash = NULL
+  WHERE w.content_hash IS NOT NULL
+    AND w.id IN (
+      SELECT we.user_day_workout_id
+      FROM changed_rows c
+      JOIN user_day_workout_exercises we ON we.id = c.user_day_workout_exercise_id
+    );
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_workout_content_hash_exercises_insert
+AFTER INSERT ON user_day_workout_exercises
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION clear_workout_content_hash_on_exercises();
+
+CREATE TRIGGER trg_workout_content_hash_exercises_update
+AFTER UPDATE ON user_day_workout_exercises
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION clear_workout_content_hash_on_exercises();
+
+CREATE TRIGGER trg_workout_content_hash_exercises_delete
+AFTER DELETE ON user_day_workout_exercises
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION clear_workout_content_hash_on_exercises();
+
+CREATE TRIGGER trg_workout_content_hash_sets_insert
+AFTER INSERT ON user_day_workout_exercise_sets
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION clear_workout_content_hash_on_sets();
+
+CREATE TRIGGER trg_workout_content_hash_sets_update
+AFTER UPDATE ON user_day_workout_exercise_sets
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION clear_workout_content_hash_on_sets();
+
+CREATE TRIGGER trg_workout_content_hash_sets_delete
+AFTER DELETE ON user_day_workout_exercise_sets
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION clear_workout_content_hash_on_sets();
+
+-- save_workout_session() now also stores p_session->>'content_hash' once
+-- the rows are written, unless some exercises were skipped as unknown
+-- (then the stored rows differ from the hashed payload).
+CREATE OR REPLACE FUNCTION save_workout_session(p_session JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_session_id UUID;
+  v_date DATE;
+  v_exercises_count INTEGER;
+  v_sets_count INTEGER;
+  v_missing JSONB;
+BEGIN
+  INSERT INTO user_day_workouts (user_id, user_day_id, started_at)
+  VALUES (
+    (p_session->>'user_id')::UUID,
+    (p_session->>'user_day_id')::UUID,
+    COALESCE((p_session->>'started_at')::TIMESTAMPTZ, CURRENT_TIMESTAMP)
+  )
+  RETURNING id INTO v_session_id;
+
+  SELECT date INTO v_date FROM user_days WHERE id = (p_session->>'user_day_id')::UUID;
+
+  -- IDs are generated up front so that sets can reference their exercise
+  -- even when the same Directus exercise appears twice in one session
+  WITH input AS (
+    SELECT item.value AS exercise, item.position
+    FROM jsonb_array_elements(COALESCE(p_session->'exercises', '[]'::JSONB))
+      WITH ORDINALITY AS item(value, position)
+  ),
+  resolved AS MATERIALIZED (
+    SELECT uuid_generate_v4() AS id, i.position, e.id AS exercise_id, i.exercise->'sets' AS sets
+    FROM input i
+    JOIN exercises e ON e.directus_id = i.exercise->>'exercise_id'
+  ),
+  new_exercises AS (
+    INSERT INTO user_day_workout_exercises (id, user_day_workout_id, exercise_id)
+    SELECT id, v_session_id, exercise_id FROM resolved ORDER BY position
+    RETURNING id
+  ),
+  new_sets AS (
+    INSERT INTO user_day_workout_exercise_sets (user_day_workout_exercise_id, reps, weight, set_order)
+    SELECT r.id, (s.value->>'reps')::INTEGER, (s.value->>'weight')::NUMERIC, s.set_order
+    FROM resolved r
+    CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.sets, '[]'::JSONB))
+      WITH ORDINALITY AS s(value, set_order)
+    RETURNING id
+  )
+  SELECT
+    (SELECT count(*) FROM new_exercises),
+    (SELECT count(*) FROM new_sets)
+  INTO v_exercises_count, v_sets_count;
+
+  SELECT COALESCE(jsonb_agg(DISTINCT item->>'exercise_id'), '[]'::JSONB)
+  INTO v_missing
+  FROM jsonb_array_elements(COALESCE(p_session->'exercises', '[]'::JSONB)) AS item
+  WHERE NOT EXISTS (SELECT 1 FROM exercises e WHERE e.directus_id = item->>'exercise_id');
+
+  -- After the inserts: their triggers clear the hash
+  IF jsonb_array_length(v_missing) = 0 THEN
+    UPDATE user_day_workouts
+    SET content_hash = p_session->>'content_hash'
+    WHERE id = v_session_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'session_id', v_session_id,
+    'date', v_date,
+    'exercises_count', v_exercises_count,
+    'sets_count', v_sets_count,
+    'missing_exercise_ids', v_missing
+  );
+END;
+$$;
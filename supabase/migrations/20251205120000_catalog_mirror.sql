@@ -0,0 +1,41 @@
+-- Local mirror of the Directus catalog (exercises, categories, muscle
+-- groups), kept up to date by the backend sync job
+-- (app/services/catalog_sync.py). Catalog reads are served from these
+-- tables; `data` holds the Directus item as returned by the API.
+
+ALTER TABLE exercises
+  ADD COLUMN data JSONB,
+  ADD COLUMN category_directus_id TEXT,
+  ADD COLUMN directus_date_updated TIMESTAMP WITH TIME ZONE,
+  ADD COLUMN synced_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX idx_exercises_category_directus_id ON exercises(category_directus_id);
+
+CREATE TABLE exercise_categories (
+  directus_id TEXT PRIMARY KEY,
+  name TEXT,
+  data JSONB NOT NULL,
+  directus_date_updated TIMESTAMP WITH TIME ZONE,
+  synced_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE muscle_groups (
+  directus_id TEXT PRIMARY KEY,
+  name TEXT,
+  data JSONB NOT NULL,
+  directus_date_updated TIMESTAMP WITH TIME ZONE,
+  synced_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per synced collection. `cursor` is the newest date_updated (or
+-- date_created) seen; the next run only fetches items changed since then.
+CREATE TABLE catalog_sync_state (
+  resource TEXT PRIMARY KEY,
+  cursor TIMESTAMP WITH TIME ZONE,
+  status TEXT NOT NULL DEFAULT 'never',
+  error TEXT,
+  items_synced INTEGER NOT NULL DEFAULT 0,
+  last_started_at TIMESTAMP WITH TIME ZONE,
+  last_finished_at TIMESTAMP WITH TIME ZONE,
+  last_success_at TIMESTAMP WITH TIME ZONE
+);
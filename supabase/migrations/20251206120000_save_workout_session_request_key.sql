@@ -0,0 +1,106 @@
+-- Idempotent save_workout_session(): an optional p_session->>'request_key'
+-- is stored on the session under a unique constraint. A call repeating a
+-- key that is already committed (e.g. a queued save retried after its RPC
+-- went through but before the job was acknowledged) creates nothing and
+-- returns the stored session with "replayed": true.
+ALTER TABLE user_day_workouts ADD COLUMN request_key TEXT UNIQUE;
+
+CREATE OR REPLACE FUNCTION save_workout_session(p_session JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_session_id UUID;
+  v_date DATE;
+  v_exercises_count INTEGER;
+  v_sets_count INTEGER;
+  v_missing JSONB;
+BEGIN
+  SELECT COALESCE(jsonb_agg(DISTINCT item->>'exercise_id'), '[]'::JSONB)
+  INTO v_missing
+  FROM jsonb_array_elements(COALESCE(p_session->'exercises', '[]'::JSONB)) AS item
+  WHERE NOT EXISTS (SELECT 1 FROM exercises e WHERE e.directus_id = item->>'exercise_id');
+
+  -- NULL keys never conflict; a concurrent call with the same key waits
+  -- for the first one to commit and then takes the replay branch
+  INSERT INTO user_day_workouts (user_id, user_day_id, started_at, request_key)
+  VALUES (
+    (p_session->>'user_id')::UUID,
+    (p_session->>'user_day_id')::UUID,
+    COALESCE((p_session->>'started_at')::TIMESTAMPTZ, CURRENT_TIMESTAMP),
+    p_session->>'request_key'
+  )
+  ON CONFLICT (request_key) DO NOTHING
+  RETURNING id INTO v_session_id;
+
+  IF v_session_id IS NULL THEN
+    SELECT w.id, d.date
+    INTO v_session_id, v_date
+    FROM user_day_workouts w
+    LEFT JOIN user_days d ON d.id = w.user_day_id
+    WHERE w.request_key = p_session->>'request_key';
+
+    SELECT count(DISTINCT we.id), count(s.id)
+    INTO v_exercises_count, v_sets_count
+    FROM user_day_workout_exercises we
+    LEFT JOIN user_day_workout_exercise_sets s ON s.user_day_workout_exercise_id = we.id
+    WHERE we.user_day_workout_id = v_session_id;
+
+    RETURN jsonb_build_object(
+      'session_id', v_session_id,
+      'date', v_date,
+      'exercises_count', v_exercises_count,
+      'sets_count', v_sets_count,
+      'missing_exercise_ids', v_missing,
+      'replayed', true
+    );
+  END IF;
+
+  SELECT date INTO v_date FROM user_days WHERE id = (p_session->>'user_day_id')::UUID;
+
+  -- IDs are generated up front so that sets can reference their exercise
+  -- even when the same Directus exercise appears twice in one session
+  WITH input AS (
+    SELECT item.value AS exercise, item.position
+    FROM jsonb_array_elements(COALESCE(p_session->'exercises', '[]'::JSONB))
+      WITH ORDINALITY AS item(value, position)
+  ),
+  resolved AS MATERIALIZED (
+    SELECT uuid_generate_v4() AS id, i.position, e.id AS exercise_id, i.exercise->'sets' AS sets
+    FROM input i
+    JOIN exercises e ON e.directus_id = i.exercise->>'exercise_id'
+  ),
+  new_exercises AS (
+    INSERT INTO user_day_workout_exercises (id, user_day_workout_id, exercise_id)
+    SELECT id, v_session_id, exercise_id FROM resolved ORDER BY position
+    RETURNING id
+  ),
+  new_sets AS (
+    INSERT INTO user_day_workout_exercise_sets (user_day_workout_exercise_id, reps, weight, set_order)
+    SELECT r.id, (s.value->>'reps')::INTEGER, (s.value->>'weight')::NUMERIC, s.set_order
+    FROM resolved r
+    CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.sets, '[]'::JSONB))
+      WITH ORDINALITY AS s(value, set_order)
+    RETURNING id
+  )
+  SELECT
+    (SELECT count(*) FROM new_exercises),
+    (SELECT count(*) FROM new_sets)
+  INTO v_exercises_count, v_sets_count;
+
+  -- After the inserts: their triggers clear the hash
+  IF jsonb_array_length(v_missing) = 0 THEN
+    UPDATE user_day_workouts
+    SET content_hash = p_session->>'content_hash'
+    WHERE id = v_session_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'session_id', v_session_id,
+    'date', v_date,
+    'exercises_count', v_exercises_count,
+    'sets_count', v_sets_count,
+    'missing_exercise_ids', v_missing
+  );
+END;
+$$;